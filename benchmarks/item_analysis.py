@@ -0,0 +1,142 @@
+"""
+Time of the item analysis of a large synthetic quiz.
+
+    python -m benchmarks.item_analysis --submissions 100000 --questions 200
+    python -m benchmarks.item_analysis --submissions 10000 --questions 50 --database
+
+Answers are generated like the rows `quizzes.items.load_answers` returns (one
+per submission and question, in random order), then timed through
+`correctness_matrix` and `item_statistics`. With `--database` the quiz is
+seeded by quizzes.seeding in a throwaway test database instead, and loading
+its answers with `load_answers` is timed too: that is the end to end cost of
+an uncached analysis, and seeding takes far longer than the analysis itself.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "operqaas.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from quizzes.items import (  # noqa: E402
+    correctness_matrix,
+    item_statistics,
+    load_answers,
+)
+from quizzes.models import Quiz, QuizQuestion  # noqa: E402
+from quizzes.seeding import Seeder  # noqa: E402
+
+
+def synthetic_answers(submissions, questions, seed=0):
+    """
+    Answers where participants of higher ability answer harder questions
+    correctly more often, so that discrimination and alpha are meaningful.
+    """
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(size=submissions)
+    hardness = rng.normal(size=questions)
+    chance = 1 / (1 + np.exp(hardness[None, :] - ability[:, None]))
+    correct = rng.random((submissions, questions)) < chance
+    submission_ids = np.repeat(np.arange(1, submissions + 1), questions)
+    question_ids = np.tile(np.arange(1, questions + 1) * 7, submissions)
+    order = rng.permutation(submission_ids.size)
+    return (
+        submission_ids[order],
+        question_ids[order],
+        correct.ravel()[order],
+        np.arange(1, questions + 1) * 7,
+    )
+
+
+def seeded_quiz(submissions, questions):
+    """
+    The id of a quiz answered in full by `submissions` participants, and a
+    loader of its `load_answers` arrays with its question ids.
+    """
+    Seeder(
+        owners=1,
+        participants=submissions,
+        quizzes=(1, 1),
+        questions=(questions, questions),
+        answers=(4, 4),
+        invites=(submissions, submissions),
+        acceptance=1,
+        completion=1,
+    ).run()
+    quiz_id = Quiz.objects.latest("id").id
+
+    def load():
+        all_question_ids = np.array(
+            QuizQuestion.objects.filter(quiz_id=quiz_id).values_list("id", flat=True),
+            dtype=np.int64,
+        )
+        return (*load_answers(quiz_id), all_question_ids)
+
+    return load
+
+
+def run(load, repeat):
+    """
+    The best of `repeat` runs, as `(load, matrix, statistics)` seconds, and
+    the last statistics.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        submission_ids, question_ids, correct, all_question_ids = load()
+        loaded = time.perf_counter()
+        matrix = correctness_matrix(
+            submission_ids, question_ids, correct, all_question_ids
+        )
+        built = time.perf_counter()
+        statistics = item_statistics(matrix)
+        timings.append((loaded - start, built - loaded, time.perf_counter() - built))
+    return min(timings, key=sum), statistics, correct.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--submissions", type=int, default=100000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--database",
+        action="store_true",
+        help="Seed the quiz in a test database and time loading its answers.",
+    )
+    args = parser.parse_args()
+
+    if args.database:
+        test_database = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            load = seeded_quiz(args.submissions, args.questions)
+            timings, statistics, answers = run(load, args.repeat)
+        finally:
+            connection.creation.destroy_test_db(test_database, verbosity=0)
+    else:
+        synthetic = synthetic_answers(args.submissions, args.questions)
+        timings, statistics, answers = run(lambda: synthetic, args.repeat)
+    load_time, matrix_time, stats_time = timings
+    _, discrimination, alpha = statistics
+    print(
+        f"{args.submissions} submissions x {args.questions} questions "
+        f"({answers} answers)"
+    )
+    if args.database:
+        print(f"  load:       {load_time * 1000:8.1f} ms")
+    print(f"  matrix:     {matrix_time * 1000:8.1f} ms")
+    print(f"  statistics: {stats_time * 1000:8.1f} ms")
+    print(
+        f"  alpha {alpha:.3f}, "
+        f"median discrimination {np.nanmedian(discrimination):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
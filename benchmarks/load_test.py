@@ -0,0 +1,376 @@
+"""
+Load test of a running server with a mix of API flows from concurrent users.
+
+    python manage.py runserver --noreload  # or gunicorn, in another shell
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --users 50
+
+Virtual users are threads, each with its own keep-alive connection, picking a
+flow at random (weighted by `--mix`) until `--seconds` have passed:
+
+* `create`: an owner creates a quiz with questions and answers, and invites
+  participants in bulk;
+* `take`: a participant fetches a quiz, posts an answer sheet and checks
+  their submission;
+* `poll`: an owner lists their quizzes and polls a leaderboard and an answer
+  distribution.
+
+Owners, participants and their sessions are created up front through the ORM,
+so the server must use the same database (`manage.py seed_load_data` fills it
+with more data to run against). They are deleted at the end of the run, with
+everything the flows created for them. Results, per URL name of quizzes.urls, are
+printed and saved as JSON together with the git commit, for comparisons.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import secrets
+import statistics
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "operqaas.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import (  # noqa: E402
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+)
+from django.contrib.auth.models import User  # noqa: E402
+from django.contrib.sessions.backends.db import SessionStore  # noqa: E402
+from django.contrib.sessions.models import Session  # noqa: E402
+from django.urls import Resolver404, resolve  # noqa: E402
+
+from quizzes.models import (  # noqa: E402
+    Owner,
+    Participant,
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+)
+
+FLOWS = ["create", "take", "poll"]
+
+
+def login(user):
+    """
+    Cookies of a session of `user`, with a CSRF token for unsafe requests.
+    """
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return {
+        settings.SESSION_COOKIE_NAME: session.session_key,
+        settings.CSRF_COOKIE_NAME: secrets.token_hex(16),  # an unmasked secret
+    }
+
+
+def prepare(owners, participants, questions, run_id):
+    """
+    `(owner sessions, [(participant session, participant id, quiz id), ...])`:
+    every owner has one quiz, to which the participants are invited.
+    """
+    owner_sessions, quiz_ids = [], []
+    for index in range(owners):
+        user = User.objects.create_user(f"load-{run_id}-owner{index}@example.com")
+        owner = Owner.objects.create(user=user)
+        quiz = Quiz.objects.create(owner=owner, name=f"Load {run_id} {index}")
+        for position in range(questions):
+            question = QuizQuestion.objects.create(
+                quiz=quiz, text=f"Question {position}?", position=position
+            )
+            QuizQuestionAnswer.objects.bulk_create(
+                QuizQuestionAnswer(
+                    question=question,
+                    text=f"Answer {answer}",
+                    position=answer,
+                    is_correct=answer == 0,
+                )
+                for answer in range(3)
+            )
+        owner_sessions.append((login(user), quiz.id))
+        quiz_ids.append(quiz.id)
+
+    takers = []
+    for index in range(participants):
+        user = User.objects.create_user(f"load-{run_id}-participant{index}@example.com")
+        participant = Participant.objects.create(user=user)
+        quiz_id = quiz_ids[index % len(quiz_ids)]
+        QuizSubmission.objects.create(quiz_id=quiz_id, participant=participant)
+        takers.append((login(user), participant.id, quiz_id))
+    return owner_sessions, takers
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, base_url, flows, owners, takers, deadline, seed, run_id):
+        super().__init__(daemon=True)
+        self.index = index
+        self.url = urlsplit(base_url)
+        self.flows = flows
+        self.owners = owners
+        self.takers = takers
+        self.deadline = deadline
+        self.random = random.Random(seed + index)
+        self.run_id = run_id
+        self.connection = None
+        self.samples = []  # (url name, status, seconds); status 0 on errors
+        self.created = 0
+
+    def connect(self):
+        connection_class = (
+            http.client.HTTPSConnection
+            if self.url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.connection = connection_class(self.url.netloc, timeout=30)
+
+    def request(self, cookies, method, path, body=None):
+        headers = {
+            "Cookie": "; ".join(f"{name}={value}" for name, value in cookies.items()),
+            "Accept": "application/json",
+        }
+        if method != "GET":
+            headers["X-CSRFToken"] = cookies[settings.CSRF_COOKIE_NAME]
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(body)
+        try:
+            url_name = resolve(path.split("?")[0]).url_name
+        except Resolver404:
+            url_name = path
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connect()
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            content, status = b"", 0
+        self.samples.append((url_name, status, time.perf_counter() - start))
+        if 200 <= status < 300 and content:
+            return json.loads(content)
+        return None
+
+    def run(self):
+        names, weights = zip(*self.flows.items())
+        while time.monotonic() < self.deadline:
+            getattr(self, self.random.choices(names, weights)[0])()
+        if self.connection is not None:
+            self.connection.close()
+
+    def create(self):
+        cookies, _ = self.random.choice(self.owners)
+        quiz = self.request(cookies, "POST", "/api/quizzes/", {"name": "Load quiz"})
+        if quiz is None:
+            return
+        for position in range(self.random.randint(3, 10)):
+            question = self.request(
+                cookies,
+                "POST",
+                f"/api/quizzes/{quiz['id']}/questions/",
+                {"text": f"Question {position}?", "position": position},
+            )
+            if question is None:
+                return
+            for answer in range(3):
+                self.request(
+                    cookies,
+                    "POST",
+                    f"/api/quizzes/{quiz['id']}/questions/{question['id']}/answers",
+                    {
+                        "text": f"Answer {answer}",
+                        "position": answer,
+                        "is_correct": not answer,
+                    },
+                )
+        invites = []
+        for _ in range(self.random.randint(5, 50)):
+            self.created += 1
+            email = f"load-{self.run_id}-invite{self.index}-{self.created}@example.com"
+            invites.append({"first_name": "Load", "last_name": "Test", "email": email})
+        self.request(
+            cookies, "POST", f"/api/quizzes/{quiz['id']}/invite/bulk/", invites
+        )
+
+    def take(self):
+        cookies, participant_id, quiz_id = self.random.choice(self.takers)
+        quiz = self.request(cookies, "GET", f"/api/quizzes/{quiz_id}/")
+        if quiz is None:
+            return
+        answers = [
+            self.random.choice(question["answers"])["id"]
+            for question in quiz["questions"]
+            if question["answers"]
+        ]
+        submission = f"/api/participant/{participant_id}/submissions/{quiz_id}/"
+        self.request(
+            cookies, "POST", submission + "answers/batch/", {"answers": answers}
+        )
+        self.request(cookies, "GET", submission)
+
+    def poll(self):
+        cookies, quiz_id = self.random.choice(self.owners)
+        self.request(cookies, "GET", "/api/quizzes/")
+        self.request(cookies, "GET", f"/api/quizzes/{quiz_id}/leaderboard/")
+        self.request(cookies, "GET", f"/api/quizzes/{quiz_id}/answers/distribution/")
+
+
+def cleanup(run_id, cookies):
+    """
+    Delete the users of a run, with what cascades from them (quizzes, invites,
+    answers, ...), and the sessions in `cookies`.
+    """
+    Session.objects.filter(
+        session_key__in=[jar[settings.SESSION_COOKIE_NAME] for jar in cookies]
+    ).delete()
+    User.objects.filter(username__startswith=f"load-{run_id}-").delete()
+
+
+def summarize(samples, seconds):
+    """
+    Count, throughput, error rate and latency percentiles (in milliseconds).
+    """
+    latencies = sorted(duration * 1000 for _, _, duration in samples)
+    errors = sum(1 for _, status, _ in samples if not 200 <= status < 400)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else None
+    return {
+        "requests": len(samples),
+        "per_second": round(len(samples) / seconds, 1),
+        "error_rate": round(errors / len(samples), 4) if samples else None,
+        "p50_ms": p50 and round(p50, 1),
+        "p95_ms": p95 and round(p95, 1),
+        "p99_ms": p99 and round(p99, 1),
+    }
+
+
+def cell(value, width, spec=""):
+    # "-" for the statistics of URL names without samples
+    return f"{'-' if value is None else format(value, spec):>{width}}"
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in FLOWS:
+            raise argparse.ArgumentTypeError(f"Unknown flow {name!r}, use {FLOWS}.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=50, help="Virtual users.")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("create=1,take=8,poll=2"),
+        help="Flow weights, e.g. create=1,take=8,poll=2.",
+    )
+    parser.add_argument("--owners", type=int, default=10)
+    parser.add_argument("--participants", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        default="load-test-{commit}-{time}.json",
+        help="JSON file of the results (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    run_id = secrets.token_hex(3)
+    owners, takers = [], []
+    try:
+        owners, takers = prepare(args.owners, args.participants, args.questions, run_id)
+        deadline = time.monotonic() + args.seconds
+        users = [
+            VirtualUser(
+                index, args.url, args.mix, owners, takers, deadline, args.seed, run_id
+            )
+            for index in range(args.users)
+        ]
+        start = time.monotonic()
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        seconds = time.monotonic() - start
+    finally:
+        cleanup(run_id, [jar for jar, _ in owners] + [jar for jar, _, _ in takers])
+
+    by_name = defaultdict(list)
+    for user in users:
+        for sample in user.samples:
+            by_name[sample[0]].append(sample)
+    results = {name: summarize(by_name[name], seconds) for name in sorted(by_name)}
+    results["all"] = summarize(
+        [sample for user in users for sample in user.samples], seconds
+    )
+
+    print(f"{args.users} users, {seconds:.1f}s, mix {args.mix}")
+    print(
+        f"{'url name':<36} {'requests':>9} {'req/s':>8} {'errors':>7}"
+        f" {'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for name, row in results.items():
+        print(
+            f"{name:<36} {row['requests']:>9} {row['per_second']:>8}"
+            f" {cell(row['error_rate'], 7, '.2%')} {cell(row['p50_ms'], 8)}"
+            f" {cell(row['p95_ms'], 8)} {cell(row['p99_ms'], 8)}"
+        )
+
+    commit = git_commit()
+    now = datetime.now(timezone.utc)
+    output = args.output.format(commit=commit, time=now.strftime("%Y%m%dT%H%M%S"))
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "commit": commit,
+                "time": now.isoformat(),
+                "url": args.url,
+                "users": args.users,
+                "seconds": round(seconds, 2),
+                "mix": args.mix,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Micro-benchmarks of the hot pieces of the API at several quiz sizes.
+
+    python -m benchmarks.micro --save benchmarks.json
+    python -m benchmarks.micro --compare benchmarks.json --tolerance 0.2
+
+Quizzes of each scale point are generated by quizzes.seeding in a throwaway
+test database. Every benchmark is timed over `--repeat` runs (median and
+minimum), and run once more to count its queries and once under tracemalloc
+for its peak allocations. With `--compare` the process exits with status 1
+when a benchmark got slower than the baseline by more than the tolerance, or
+runs more queries.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "operqaas.settings")
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from quizzes.cache import OWNER  # noqa: E402
+from quizzes.models import Quiz, QuizSubmission  # noqa: E402
+from quizzes.permissions import QuizPermission  # noqa: E402
+from quizzes.renderers import FastJSONParser, FastJSONRenderer  # noqa: E402
+from quizzes.rendering import (  # noqa: E402
+    QUIZ_COLUMNS,
+    SUBMISSION_COLUMNS,
+    render_quiz,
+    render_user_submissions,
+)
+from quizzes.seeding import Seeder  # noqa: E402
+from quizzes.serializers import QuizSerializer, QuizSubmissionSerializer  # noqa: E402
+from quizzes.views import (  # noqa: E402
+    ParticipantSubmissionsListAPIView,
+    QuizListCreateAPIView,
+)
+
+# questions per quiz, answers per question, invited (all answering) participants
+SCALES = {
+    "small": (5, 3, 10),
+    "medium": (20, 4, 200),
+    "huge": (100, 4, 500),
+}
+# below this, differences in time are noise
+NOISE_MS = 0.5
+
+Point = namedtuple("Point", ["quiz", "owner_user", "participant"])
+
+
+def seed_point(scale, seed):
+    questions, answers, invites = SCALES[scale]
+    Seeder(
+        seed=f"{seed}-{scale}",  # distinct uuids across scale points
+        owners=1,
+        participants=invites,
+        quizzes=(1, 1),
+        questions=(questions, questions),
+        answers=(answers, answers),
+        invites=(invites, invites),
+        acceptance=1,
+        completion=1,
+    ).run()
+    quiz = Quiz.objects.select_related("owner__user").latest("id")
+    participant = QuizSubmission.objects.filter(quiz=quiz).first().participant
+    return Point(quiz, quiz.owner.user, participant)
+
+
+def api_request(user, method="get", path="/", data=None):
+    request = Request(getattr(APIRequestFactory(), method)(path, data))
+    request.user = user
+    return request
+
+
+def quiz_serializer(point):
+    request = api_request(point.owner_user)
+
+    def run():
+        cache.clear()  # cold question tree
+        quiz = Quiz.objects.with_tree().get(id=point.quiz.id)
+        return QuizSerializer(quiz, context={"request": request}).data
+
+    return run
+
+
+def submission_serializer(point):
+    request = api_request(point.owner_user)
+
+    def run():
+        submissions = QuizSubmission.objects.filter(
+            quiz_id=point.quiz.id
+        ).prefetch_related("quiz__quizquestion_set", "answer_set")
+        return QuizSubmissionSerializer(
+            submissions, many=True, context={"request": request}
+        ).data
+
+    return run
+
+
+def quiz_rendering(point):
+    # the read-only path of QuizDetailAPIView, same output as quiz_serializer
+    def run():
+        cache.clear()  # cold question tree
+        quiz = Quiz.objects.values(*QUIZ_COLUMNS).get(id=point.quiz.id)
+        return render_quiz(quiz, OWNER)
+
+    return run
+
+
+def submission_rendering(point):
+    # same output as submission_serializer
+    def run():
+        return render_user_submissions(
+            QuizSubmission.objects.filter(quiz_id=point.quiz.id)
+            .with_questions_count()
+            .values(*SUBMISSION_COLUMNS, "questions_count")
+        )
+
+    return run
+
+
+def quiz_payload(point):
+    # an owner's quiz detail: the question tree and every submission
+    quiz = Quiz.objects.values(*QUIZ_COLUMNS).get(id=point.quiz.id)
+    return render_quiz(quiz, OWNER)
+
+
+def json_rendering(renderer_class):
+    def benchmark(point):
+        payload = quiz_payload(point)
+        renderer = renderer_class()
+
+        def run():
+            return renderer.render(payload, "application/json")
+
+        return run
+
+    return benchmark
+
+
+def json_parsing(parser_class):
+    def benchmark(point):
+        body = JSONRenderer().render(quiz_payload(point))
+        parser = parser_class()
+
+        def run():
+            return parser.parse(io.BytesIO(body), "application/json", {})
+
+        return run
+
+    return benchmark
+
+
+def quiz_with_tree(point):
+    def run():
+        return list(Quiz.objects.with_tree().filter(id=point.quiz.id))
+
+    return run
+
+
+def submission_drifted(point):
+    def run():
+        return list(QuizSubmission.objects.filter(quiz_id=point.quiz.id).drifted())
+
+    return run
+
+
+def quiz_permission(point):
+    # unsafe methods are the ones checking ownership
+    request = api_request(point.owner_user, "put")
+    permission = QuizPermission()
+
+    def run():
+        for _ in range(100):
+            permission.has_object_permission(request, None, point.quiz)
+
+    return run
+
+
+def quiz_list_filters(point):
+    request = api_request(
+        point.owner_user, path="/api/quizzes/", data={"search": point.quiz.name[:4]}
+    )
+    view = QuizListCreateAPIView(request=request, kwargs={}, format_kwarg=None)
+
+    def run():
+        return list(view.filter_queryset(view.get_queryset())[:25])
+
+    return run
+
+
+def submission_list_filters(point):
+    request = api_request(
+        point.participant.user,
+        data={
+            "owner_email": point.owner_user.email.upper(),
+            "search": point.quiz.name[:4],
+        },
+    )
+    kwargs = {"participant_id": point.participant.id}
+    view = ParticipantSubmissionsListAPIView(
+        request=request, kwargs=kwargs, format_kwarg=None
+    )
+
+    def run():
+        return list(view.filter_queryset(view.get_queryset())[:25])
+
+    return run
+
+
+BENCHMARKS = {
+    "quiz_serializer": quiz_serializer,
+    "submission_serializer": submission_serializer,
+    "quiz_rendering": quiz_rendering,
+    "submission_rendering": submission_rendering,
+    "quiz_json_render_stdlib": json_rendering(JSONRenderer),
+    "quiz_json_render_fast": json_rendering(FastJSONRenderer),
+    "quiz_json_parse_stdlib": json_parsing(JSONParser),
+    "quiz_json_parse_fast": json_parsing(FastJSONParser),
+    "quiz_with_tree": quiz_with_tree,
+    "submission_drifted": submission_drifted,
+    "quiz_permission_x100": quiz_permission,
+    "quiz_list_filters": quiz_list_filters,
+    "submission_list_filters": submission_list_filters,
+}
+
+
+def measure(run, repeat):
+    run()  # warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    with CaptureQueriesContext(connection) as queries:
+        run()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "queries": len(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Descriptions of the benchmarks worse than `baseline`.
+    """
+    worse = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slower = result["median_ms"] - base["median_ms"]
+        if slower > NOISE_MS and result["median_ms"] > base["median_ms"] * (
+            1 + tolerance
+        ):
+            worse.append(f"{name}: {base['median_ms']} -> {result['median_ms']} ms")
+        if result["queries"] > base["queries"]:
+            worse.append(f"{name}: {base['queries']} -> {result['queries']} queries")
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scales", default=",".join(SCALES), help="Comma separated, of %(default)s."
+    )
+    parser.add_argument(
+        "--only", help="Comma separated benchmark names, all of them by default."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    scales = args.scales.split(",")
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+
+    test_database = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        points = {scale: seed_point(scale, args.seed) for scale in scales}
+        results = {}
+        print(
+            f"{'benchmark':<40} {'median ms':>10} {'min ms':>10} "
+            f"{'queries':>8} {'peak KiB':>10}"
+        )
+        for name in names:
+            for scale, point in points.items():
+                key = f"{name}[{scale}]"
+                results[key] = measure(BENCHMARKS[name](point), args.repeat)
+                row = results[key]
+                print(
+                    f"{key:<40} {row['median_ms']:>10} {row['min_ms']:>10}"
+                    f" {row['queries']:>8} {row['peak_kib']:>10}"
+                )
+    finally:
+        connection.creation.destroy_test_db(test_database, verbosity=0)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            worse = regressions(results, json.load(file), args.tolerance)
+        for line in worse:
+            print(f"REGRESSION {line}")
+        if worse:
+            sys.exit(1)
+        print("No regression.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Read and write throughput of SQLite with several concurrent workers, with
+Django's stock sqlite3 backend and with the tuned `operqaas.sqlite3` backend.
+
+    python -m benchmarks.sqlite_profile --workers 8 --seconds 5
+
+Each worker is a process with its own connection. Writers insert rows inside
+`atomic()` after reading (like answering a question); readers run an indexed
+aggregate. Every "database is locked" error counts as a failed operation.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "operqaas.settings")
+django.setup()
+
+from django.db import OperationalError, connections, transaction  # noqa: E402
+from django.db.backends.sqlite3.base import (  # noqa: E402
+    DatabaseWrapper as StockWrapper,
+)
+from django.db.utils import ConnectionHandler  # noqa: E402
+
+from operqaas.sqlite3.base import DatabaseWrapper, is_locked_error  # noqa: E402
+
+BACKENDS = {"stock": StockWrapper, "tuned": DatabaseWrapper}
+
+
+def connect(backend, path):
+    settings_dict = ConnectionHandler(
+        {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": path}}
+    )["default"].settings_dict
+    wrapper = BACKENDS[backend](settings_dict, alias=backend)
+    connections[backend] = wrapper  # for transaction.atomic(using=...)
+    return wrapper
+
+
+def setup(backend, path):
+    wrapper = connect(backend, path)  # "tuned" leaves the file in WAL mode
+    with wrapper.cursor() as cursor:
+        cursor.execute(
+            "CREATE TABLE answer ("
+            " id INTEGER PRIMARY KEY, submission INTEGER NOT NULL, value INTEGER)"
+        )
+        cursor.execute("CREATE INDEX answer_submission ON answer (submission)")
+    wrapper.close()
+
+
+def work(backend, path, role, seconds, results):
+    wrapper = connect(backend, path)
+    done = failed = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        submission = done % 100
+        try:
+            if role == "writer":
+                with transaction.atomic(using=wrapper.alias), wrapper.cursor() as c:
+                    c.execute(
+                        "SELECT COUNT(*) FROM answer WHERE submission = %s",
+                        [submission],
+                    )
+                    c.execute(
+                        "INSERT INTO answer (submission, value) VALUES (%s, %s)",
+                        [submission, c.fetchone()[0]],
+                    )
+            else:
+                with wrapper.cursor() as c:
+                    c.execute(
+                        "SELECT COUNT(*), SUM(value) FROM answer WHERE submission = %s",
+                        [submission],
+                    )
+            done += 1
+        except OperationalError as exc:
+            if not is_locked_error(exc):
+                raise
+            failed += 1
+    wrapper.close()
+    results.put((role, done, failed))
+
+
+def run(backend, workers, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "bench.sqlite3"
+        setup(backend, path)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=work,
+                args=(backend, path, "writer" if i % 2 else "reader", seconds, results),
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {"reader": [0, 0], "writer": [0, 0]}
+        for _ in processes:
+            # a crashed worker never reports
+            role, done, failed = results.get(timeout=seconds + 60)
+            totals[role][0] += done
+            totals[role][1] += failed
+        for process in processes:
+            process.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    print(f"{args.workers} workers (half readers, half writers), {args.seconds}s")
+    print(f"{'backend':<8} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    for backend in BACKENDS:
+        totals = run(backend, args.workers, args.seconds)
+        reads, writes = totals["reader"][0], totals["writer"][0]
+        locked = totals["reader"][1] + totals["writer"][1]
+        print(
+            f"{backend:<8} {reads / args.seconds:>10.0f}"
+            f" {writes / args.seconds:>10.0f} {locked:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -53,8 +53,22 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "quizzes.timing.ServerTimingMiddleware",
+    "quizzes.metrics.MetricsMiddleware",
+    "quizzes.profiling.ProfilingMiddleware",
 ]
 
+# Server-Timing header and a log line with query, serializer and view times on
+# every response, see quizzes.timing.
+QUIZ_SERVER_TIMING = os.environ.get("QUIZ_SERVER_TIMING", "") == "1"
+
+# /metrics is served to superusers, to clients from these addresses and to
+# requests with an `Authorization: Bearer <QUIZ_METRICS_TOKEN>` header.
+QUIZ_METRICS_ALLOWED_IPS = os.environ.get(
+    "QUIZ_METRICS_ALLOWED_IPS", "127.0.0.1,::1"
+).split(",")
+QUIZ_METRICS_TOKEN = os.environ.get("QUIZ_METRICS_TOKEN", "")
+
 ROOT_URLCONF = "operqaas.urls"
 
 TEMPLATES = [
@@ -79,12 +93,62 @@ WSGI_APPLICATION = "operqaas.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# SQLite with WAL, tuned pragmas and IMMEDIATE transactions, see operqaas.sqlite3
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "operqaas.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "pragmas": {
+                "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+                "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -64000)),
+                "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 268435456)),
+            },
+            "transaction_mode": os.environ.get("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+            "lock_retries": int(os.environ.get("SQLITE_LOCK_RETRIES", 3)),
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# The default local memory cache is per process: a write only invalidates the
+# entries of the process that handled it. With several worker processes, set
+# CACHE_BACKEND (and CACHE_LOCATION) to a shared backend, e.g.
+# django.core.cache.backends.redis.RedisCache and redis://127.0.0.1:6379, or
+# django.core.cache.backends.db.DatabaseCache and a table created with
+# `manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
+CACHE_IS_SHARED = CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# Rendered quiz question/answer trees are cached per version (see quizzes.cache):
+# with a shared cache this only bounds how long unused entries are kept, with a
+# per-process one it is how long other processes may serve a changed quiz.
+QUIZ_CONTENT_CACHE_TIMEOUT = int(
+    os.environ.get("QUIZ_CONTENT_CACHE_TIMEOUT", 24 * 60 * 60 if CACHE_IS_SHARED else 5)
+)
+# Same for leaderboards and item analysis, cached until the next answer to the
+# quiz.
+QUIZ_SCORES_CACHE_TIMEOUT = int(
+    os.environ.get("QUIZ_SCORES_CACHE_TIMEOUT", 24 * 60 * 60 if CACHE_IS_SHARED else 5)
+)
+# Answer distributions are recomputed at most this often (in seconds) while
+# participants answer, whatever the number of owners polling them.
+QUIZ_DISTRIBUTION_CACHE_TIMEOUT = int(
+    os.environ.get("QUIZ_DISTRIBUTION_CACHE_TIMEOUT", 5)
+)
 
 
 # Password validation
@@ -128,6 +192,25 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "quizzes.timing": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 REST_FRAMEWORK = {
-    "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"]
+    "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    # orjson when installed, DRF's stdlib based classes otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "quizzes.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "quizzes.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
@@ -0,0 +1,71 @@
+"""
+SQLite backend tuned for concurrent readers and writers.
+
+Same as `django.db.backends.sqlite3`, plus two things configured through the
+database `OPTIONS`:
+
+* `pragmas`: applied to every new connection, on top of `DEFAULT_PRAGMAS`.
+* `transaction_mode` (default `IMMEDIATE`): `atomic()` blocks start with
+  `BEGIN IMMEDIATE`, taking the write lock up front. A deferred transaction
+  that reads then writes can otherwise fail with "database is locked" halfway
+  through, when another connection got the write lock first, and busy_timeout
+  cannot help because SQLite would deadlock waiting. Acquiring the lock is
+  retried `lock_retries` times (after busy_timeout expired) with a doubling
+  `lock_retry_delay`, before the error is raised.
+"""
+import time
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    # readers no longer block the writer and vice versa
+    "journal_mode": "WAL",
+    # with WAL, fsync at checkpoints only: safe against corruption, a power
+    # loss may roll back the last transactions
+    "synchronous": "NORMAL",
+    # milliseconds to wait for a lock before "database is locked"
+    "busy_timeout": 5000,
+    # negative values are KiB: 64 MiB of page cache per connection
+    "cache_size": -64000,
+    # read through memory-mapped I/O, up to 256 MiB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+TRANSACTION_MODES = {"DEFERRED", "IMMEDIATE", "EXCLUSIVE"}
+
+
+def is_locked_error(exc):
+    message = str(exc)
+    return "database is locked" in message or "database is busy" in message
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **params.pop("pragmas", {})}
+        self.transaction_mode = params.pop("transaction_mode", "IMMEDIATE").upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ValueError(f"Unknown transaction_mode {self.transaction_mode!r}")
+        self.lock_retries = params.pop("lock_retries", 3)
+        self.lock_retry_delay = params.pop("lock_retry_delay", 0.05)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        delay = self.lock_retry_delay
+        for attempt in range(self.lock_retries + 1):
+            try:
+                self.cursor().execute(f"BEGIN {self.transaction_mode}")
+                return
+            except OperationalError as exc:
+                if attempt == self.lock_retries or not is_locked_error(exc):
+                    raise
+            time.sleep(delay)
+            delay *= 2
@@ -0,0 +1,64 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase
+
+from operqaas.sqlite3.base import DatabaseWrapper
+
+
+class DatabaseWrapperTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "test.sqlite3"
+
+    def connect(self, **options):
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": self.path, "OPTIONS": options},
+            alias="sqlite3_test",
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        wrapper = self.connect(pragmas={"busy_timeout": 1234})
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 1234)
+        self.assertEqual(self.pragma(wrapper, "temp_store"), 2)  # MEMORY
+        self.assertEqual(self.pragma(wrapper, "foreign_keys"), 1)  # Django's own
+
+    def test_immediate_transactions_retry_then_fail(self):
+        options = {
+            "pragmas": {"busy_timeout": 0},
+            "lock_retries": 2,
+            "lock_retry_delay": 0.001,
+        }
+        writer, blocked = self.connect(**options), self.connect(**options)
+        with writer.cursor() as cursor:
+            cursor.execute("CREATE TABLE t (x INTEGER)")
+
+        blocked.ensure_connection()
+        writer.ensure_connection()
+        writer._start_transaction_under_autocommit()  # holds the write lock
+        self.addCleanup(writer.connection.rollback)
+        sleeps = []
+        with mock.patch("operqaas.sqlite3.base.time.sleep", sleeps.append):
+            with self.assertRaisesMessage(OperationalError, "database is locked"):
+                blocked._start_transaction_under_autocommit()
+        self.assertEqual(sleeps, [0.001, 0.002])
+
+    def test_deferred_mode(self):
+        writer = self.connect(transaction_mode="deferred")
+        writer.ensure_connection()
+        self.assertEqual(self.pragma(writer, "journal_mode"), "wal")
+        self.assertEqual(writer.transaction_mode, "DEFERRED")
+        with self.assertRaisesMessage(ValueError, "Unknown transaction_mode"):
+            self.connect(transaction_mode="sometimes").ensure_connection()
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from quizzes.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("quizzes.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -4,7 +4,13 @@ from django.forms import Textarea
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-from quizzes.models import Quiz, QuizQuestion, QuizQuestionAnswer
+from quizzes.models import (
+    DailyUsage,
+    OutboxEmail,
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+)
 
 TEXTFIELD_CONFIG = {
     models.TextField: {"widget": Textarea(attrs={"rows": 1, "cols": 40})},
@@ -49,5 +55,21 @@ class QuizAdmin(admin.ModelAdmin):
     inlines = [QuizQuestionInline]
 
 
+class DailyUsageAdmin(admin.ModelAdmin):
+    model = DailyUsage
+    list_display = ["day", "quiz", "invites", "acceptances", "answers"]
+    list_filter = ["day"]
+    raw_id_fields = ["owner", "quiz"]
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    model = OutboxEmail
+    list_display = ["subject", "to", "status", "attempts", "next_attempt_at"]
+    list_filter = ["status"]
+    readonly_fields = ["attempts", "last_error", "sent_on"]
+
+
+admin.site.register(DailyUsage, DailyUsageAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
 admin.site.register(Quiz, QuizAdmin)
 admin.site.register(QuizQuestion, QuizQuestionAdmin)
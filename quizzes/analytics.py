@@ -0,0 +1,73 @@
+"""
+Statistics on how participants answer the questions of a quiz.
+"""
+from django.conf import settings
+from django.db.models import Count
+
+from quizzes.cache import QUESTIONS, get_or_set_versioned
+from quizzes.models import QuizQuestion
+from quizzes.rendering import sorted_rows
+
+
+def answer_distribution(quiz_id):
+    """
+    For every question of the quiz, in order, how many participants picked each
+    of its answers and which share of the question's answers that is.
+
+    One GROUP BY over the questions of the quiz, left-joined to their answers
+    and to the participants' answers, so questions without answers and answers
+    nobody picked are included. Every join goes through a foreign key index;
+    rows are grouped in id order and put in position order here. Cached
+    briefly: owners may poll it during a live quiz, and a few seconds of
+    staleness is fine there.
+    """
+
+    def compute():
+        questions = {}
+        rows = sorted_rows(
+            QuizQuestion.objects.filter(quiz_id=quiz_id)
+            .values(
+                "id",
+                "text",
+                "position",
+                "quizquestionanswer__id",
+                "quizquestionanswer__text",
+                "quizquestionanswer__is_correct",
+                "quizquestionanswer__position",
+            )
+            .annotate(count=Count("quizquestionanswer__quizuseranswer")),
+            "position",
+            "quizquestionanswer__position",
+        )
+        for row in rows:
+            question = questions.setdefault(
+                row["id"],
+                {"id": row["id"], "text": row["text"], "answered": 0, "answers": []},
+            )
+            if row["quizquestionanswer__id"] is None:
+                continue  # no answers to pick from
+            question["answered"] += row["count"]
+            question["answers"].append(
+                {
+                    "id": row["quizquestionanswer__id"],
+                    "text": row["quizquestionanswer__text"],
+                    "is_correct": row["quizquestionanswer__is_correct"],
+                    "count": row["count"],
+                }
+            )
+        for question in questions.values():
+            for answer in question["answers"]:
+                answer["share"] = (
+                    round(answer["count"] / question["answered"], 4)
+                    if question["answered"]
+                    else None
+                )
+        return list(questions.values())
+
+    return get_or_set_versioned(
+        QUESTIONS,
+        quiz_id,
+        "distribution",
+        compute,
+        settings.QUIZ_DISTRIBUTION_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+
+OWNER = "owner"
+PARTICIPANT = "participant"
+
+QUESTIONS = "questions"
+SCORES = "scores"
+
+
+def audience(user):
+    # mirrors QuizQuestionAnswerSerializer.get_field_names
+    if user.is_superuser or hasattr(user, "owner"):
+        return OWNER
+    return PARTICIPANT
+
+
+def version_key(namespace, quiz_id):
+    return f"quiz:{quiz_id}:{namespace}:version"
+
+
+def get_versions(namespace, quiz_ids):
+    """
+    Current version token of `namespace` for each quiz. A missing token (never
+    set, or evicted) is replaced by a fresh one, so that entries cached under
+    an older token can never be served again.
+    """
+    keys = {quiz_id: version_key(namespace, quiz_id) for quiz_id in quiz_ids}
+    versions = cache.get_many(keys.values())
+    missing = {key: time.time_ns() for key in keys.values() if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {quiz_id: versions[key] for quiz_id, key in keys.items()}
+
+
+def bump_version(namespace, quiz_id):
+    """
+    Invalidate everything cached under `namespace` for a quiz. The version is
+    bumped again once the current transaction commits, so that a concurrent
+    reader that cached the pre-commit state under the first new version does
+    not keep serving it.
+    """
+
+    def bump():
+        cache.set(version_key(namespace, quiz_id), time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_or_set_versioned(namespace, quiz_id, name, compute, timeout):
+    """
+    The value cached as `name` under the current version of `namespace` for a
+    quiz, computed with `compute()` and cached for `timeout` seconds on a miss.
+    """
+    version = get_versions(namespace, [quiz_id])[quiz_id]
+    key = f"quiz:{quiz_id}:{namespace}:{version}:{name}"
+    return cache.get_or_set(key, compute, timeout=timeout)
+
+
+def get_question_trees(quiz_ids, role, render):
+    """
+    The rendered question/answer tree of each quiz as seen by `role`, keyed by
+    quiz id. Cached trees cost no queries; the others are rendered at once with
+    `render(quiz ids)`, which returns them keyed by quiz id.
+    """
+    versions = get_versions(QUESTIONS, quiz_ids)
+    keys = {
+        quiz_id: f"quiz:{quiz_id}:{QUESTIONS}:{versions[quiz_id]}:{role}"
+        for quiz_id in quiz_ids
+    }
+    payloads = cache.get_many(keys.values())
+    misses = [quiz_id for quiz_id in quiz_ids if keys[quiz_id] not in payloads]
+    if misses:
+        rendered = {keys[quiz_id]: tree for quiz_id, tree in render(misses).items()}
+        cache.set_many(rendered, timeout=settings.QUIZ_CONTENT_CACHE_TIMEOUT)
+        payloads.update(rendered)
+    return {quiz_id: payloads[keys[quiz_id]] for quiz_id in quiz_ids}
+
+
+def get_quiz_questions(quizzes, user, render):
+    """
+    `get_question_trees` for quiz instances: the trees that are not cached are
+    loaded with two queries in total and rendered with `render(quiz)`.
+    """
+    by_id = {quiz.id: quiz for quiz in quizzes}
+
+    def render_misses(quiz_ids):
+        misses = [by_id[quiz_id] for quiz_id in quiz_ids]
+        prefetch_related_objects(misses, "quizquestion_set__quizquestionanswer_set")
+        return {quiz.id: render(quiz) for quiz in misses}
+
+    return get_question_trees(list(by_id), audience(user), render_misses)
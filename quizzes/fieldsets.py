@@ -0,0 +1,61 @@
+"""
+Sparse fieldsets and expansion of quiz responses.
+
+* `?fields=id,name` keeps only these keys of each quiz;
+* `?expand=questions,submissions` embeds these relations (submissions are
+  only ever shown to owners and superusers).
+
+Naming a relation in `fields` expands it too. Without `expand`, lists embed
+no relation and a single quiz embeds all of them. Views read the fieldset
+before building their queryset, so that relations left out are not fetched.
+"""
+from collections import namedtuple
+
+from rest_framework.exceptions import ValidationError
+
+QUIZ_FIELDS = ("id", "submissions", "questions", "created", "modified", "name", "owner")
+QUIZ_RELATIONS = ("questions", "submissions")
+
+
+class Fieldset(namedtuple("Fieldset", ["fields", "expand"])):
+    """
+    `fields`: the keys to keep, None for all of them; `expand`: the relations
+    to embed.
+    """
+
+    def includes(self, name):
+        if name in QUIZ_RELATIONS:
+            return name in self.expand
+        return self.fields is None or name in self.fields
+
+
+def parse_names(request, param, allowed):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = sorted(names - set(allowed))
+    if unknown:
+        message = f"Unknown {', '.join(unknown)}, choose among {', '.join(allowed)}."
+        raise ValidationError({param: [message]})
+    return names
+
+
+def quiz_fieldset(request, expand_by_default):
+    """
+    The Fieldset that `?fields=` and `?expand=` ask for. Relations are expanded
+    by default if `expand_by_default`.
+    """
+    fields = parse_names(request, "fields", QUIZ_FIELDS)
+    expand = parse_names(request, "expand", QUIZ_RELATIONS)
+    if expand is None:
+        expand = set()
+        if expand_by_default and fields is None:
+            expand = set(QUIZ_RELATIONS)
+    if fields is not None:
+        expand |= fields & set(QUIZ_RELATIONS)
+    return Fieldset(fields, frozenset(expand))
+
+
+# the serializers' output, for requests that do not come with a fieldset
+ALL_FIELDS = Fieldset(None, frozenset(QUIZ_RELATIONS))
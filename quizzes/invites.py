@@ -0,0 +1,133 @@
+import csv
+import io
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from quizzes.metrics import INVITES
+from quizzes.models import OutboxEmail, Participant, QuizSubmission
+from quizzes.outbox import invite_email
+from quizzes.serializers import QuizInviteSerializer
+
+INVITED = "invited"
+ALREADY_INVITED = "already_invited"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+CSV_FIELDS = list(QuizInviteSerializer().fields)
+
+
+def read_csv_invites(uploaded_file):
+    """
+    Read invite rows from a CSV upload with a `first_name,last_name,email`
+    header. Raises ValueError when the file cannot be read as such.
+    """
+    try:
+        text = uploaded_file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV file must be UTF-8 encoded.")
+    reader = csv.DictReader(io.StringIO(text))
+    missing = set(CSV_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV file is missing column(s): {', '.join(sorted(missing))}")
+    return [{field: row[field] for field in CSV_FIELDS} for row in reader]
+
+
+def bulk_invite(quiz, rows):
+    """
+    Invite every participant in `rows` to `quiz`.
+
+    Rows are validated in one pass, deduplicated (by case-insensitive email)
+    against each other and against existing users, participants and
+    submissions, then the missing users, participants and submissions are
+    created with one INSERT each inside a single transaction, together with their
+    invitation emails in the outbox.
+
+    Returns one report entry per input row, in input order.
+    """
+    report = []
+    valid = {}  # email (lowercased) -> validated row, first occurrence wins
+    for index, row in enumerate(rows):
+        serializer = QuizInviteSerializer(data=row)
+        if not serializer.is_valid():
+            report.append({"row": index, "status": INVALID, **serializer.errors})
+            continue
+        data = serializer.validated_data
+        email = data["email"].lower()
+        entry = {"row": index, "email": data["email"]}
+        if email in valid:
+            entry["status"] = DUPLICATE
+        else:
+            valid[email] = (data, entry)
+        report.append(entry)
+
+    if not valid:
+        return report
+
+    with transaction.atomic():
+        users = {}  # email (lowercased) -> user
+        for user in (
+            User.objects.annotate(
+                email_lower=Lower("email"), username_lower=Lower("username")
+            )
+            .filter(Q(email_lower__in=valid) | Q(username_lower__in=valid))
+            .select_related("participant")
+        ):
+            users.setdefault(user.email.lower(), user)
+            users.setdefault(user.username.lower(), user)
+        participants = {
+            user.id: user.participant
+            for user in users.values()
+            if hasattr(user, "participant")  # cached by select_related
+        }
+
+        new_users = User.objects.bulk_create(
+            User(
+                username=data["email"],
+                email=data["email"],
+                first_name=data["first_name"],
+                last_name=data["last_name"],
+                password=make_password(None),
+            )
+            for email, (data, _) in valid.items()
+            if email not in users
+        )
+        users.update((user.email.lower(), user) for user in new_users)
+
+        new_participants = {
+            users[email].id: Participant(user=users[email])
+            for email in valid
+            if users[email].id not in participants
+        }
+        Participant.objects.bulk_create(new_participants.values())
+        participants.update(new_participants)
+
+        submissions = {
+            submission.participant_id: submission
+            for submission in QuizSubmission.objects.filter(
+                quiz=quiz, participant__in=participants.values()
+            )
+        }
+        new_submissions = {
+            participant.id: QuizSubmission(quiz=quiz, participant=participant)
+            for participant in participants.values()
+            if participant.id not in submissions
+        }
+        QuizSubmission.objects.bulk_create(new_submissions.values())
+        submissions.update(new_submissions)
+
+        outbox = []
+        for email, (data, entry) in valid.items():
+            participant_id = participants[users[email].id].id
+            entry["submission_id"] = submissions[participant_id].id
+            if new_submissions.pop(participant_id, None):
+                entry["status"] = INVITED
+                outbox.append(invite_email(quiz, data["email"]))
+            else:
+                entry["status"] = ALREADY_INVITED
+        OutboxEmail.objects.bulk_create(outbox)
+        transaction.on_commit(lambda: INVITES.inc(len(outbox)))
+    return report
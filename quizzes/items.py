@@ -0,0 +1,147 @@
+"""
+Item analysis of a quiz: how hard each question is, how well it separates
+strong from weak participants, and how consistent the quiz is as a whole.
+
+The answers of a quiz are loaded with one query into a submissions x questions
+correctness matrix, and every statistic is computed on it in vectorized form:
+
+* difficulty: share of participants who answered the question correctly;
+* discrimination: point-biserial correlation between answering the question
+  correctly and the score on the *other* questions (item-rest correlation);
+* Cronbach's alpha of the quiz.
+
+Only participants who answered at least one question take part; a question
+they left unanswered counts as wrong.
+"""
+import numpy as np
+
+from django.conf import settings
+
+from quizzes.cache import SCORES, get_or_set_versioned
+from quizzes.models import QuizQuestion, QuizUserAnswer
+
+CHUNK_SIZE = 10000
+
+
+def load_answers(quiz_id):
+    """
+    `(submission ids, question ids, correct)` arrays with one entry per answer
+    to a question of the quiz (single answers are not checked against the
+    submission's quiz, hence the filter on the question's).
+    """
+    rows = (
+        QuizUserAnswer.objects.filter(
+            submission__quiz_id=quiz_id, answer__question__quiz_id=quiz_id
+        )
+        .values_list("submission_id", "answer__question_id", "answer__is_correct")
+        .order_by()
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    flat = np.fromiter(
+        (value for row in rows for value in row), dtype=np.int64
+    ).reshape(-1, 3)
+    return flat[:, 0], flat[:, 1], flat[:, 2].astype(bool)
+
+
+def lookup_table(ids, positions, fill):
+    """
+    `(table, lowest)` where `table[id - lowest]` is the position of `id`.
+    Database ids are dense enough for this to be far cheaper than sorting
+    millions of answers.
+    """
+    lowest = ids.min()
+    table = np.full(ids.max() - lowest + 1, fill, dtype=np.int64)
+    table[ids - lowest] = positions
+    return table, lowest
+
+
+def correctness_matrix(submission_ids, question_ids, correct, all_question_ids):
+    """
+    A float matrix with one row per distinct submission, in id order, and one
+    column per question of `all_question_ids`, in that order, 1 where the
+    answer was correct. Answers to other questions are ignored.
+    """
+    if not submission_ids.size or not all_question_ids.size:
+        return np.zeros((0, len(all_question_ids)))
+    table, lowest = lookup_table(
+        all_question_ids, np.arange(len(all_question_ids)), fill=-1
+    )
+    offsets = question_ids - lowest
+    known = (offsets >= 0) & (offsets < len(table))
+    known[known] = table[offsets[known]] >= 0
+    submission_ids, correct = submission_ids[known], correct[known]
+    columns = table[offsets[known]]
+    if not submission_ids.size:
+        return np.zeros((0, len(all_question_ids)))
+    seen, lowest = lookup_table(submission_ids, 1, fill=0)
+    rows = (np.cumsum(seen) - 1)[submission_ids - lowest]
+    matrix = np.zeros((seen.sum(), len(all_question_ids)))
+    matrix[rows, columns] = correct
+    return matrix
+
+
+def item_statistics(matrix):
+    """
+    `(difficulty, discrimination, alpha)` of a correctness matrix: one value
+    per column for the first two, NaN where undefined (e.g. a question that
+    everybody got right does not discriminate, alpha of a single question).
+    """
+    submissions, questions = matrix.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difficulty = matrix.mean(axis=0)
+        totals = matrix.sum(axis=1)
+        item_var = difficulty * (1 - difficulty)  # variance of 0/1 columns
+        total_var = totals.var()
+        # cov(item, total) without centering the whole matrix
+        item_total_cov = matrix.T @ totals / submissions - difficulty * totals.mean()
+        # the rest score excludes the item itself
+        rest_cov = item_total_cov - item_var
+        rest_var = total_var - 2 * item_total_cov + item_var
+        discrimination = rest_cov / np.sqrt(item_var * rest_var)
+        if questions < 2:
+            alpha = np.nan  # no consistency between questions to measure
+        else:
+            alpha = questions / (questions - 1) * (1 - item_var.sum() / total_var)
+    return difficulty, discrimination, alpha
+
+
+def as_number(value, digits=4):
+    return None if not np.isfinite(value) else round(float(value), digits)
+
+
+def item_analysis(quiz_id):
+    """
+    The item analysis of a quiz, cached until the next answer to the quiz.
+    """
+
+    def compute():
+        questions = list(
+            QuizQuestion.objects.filter(quiz_id=quiz_id).values_list("id", "text")
+        )
+        all_question_ids = np.array([id_ for id_, _ in questions], dtype=np.int64)
+        matrix = correctness_matrix(*load_answers(quiz_id), all_question_ids)
+        submissions = matrix.shape[0]
+        if not submissions or not questions:
+            difficulty = discrimination = np.full(len(questions), np.nan)
+            alpha = np.nan
+        else:
+            difficulty, discrimination, alpha = item_statistics(matrix)
+        items = [
+            {
+                "question": question_id,
+                "text": text,
+                "difficulty": as_number(difficulty[index]),
+                "discrimination": as_number(discrimination[index]),
+            }
+            for index, (question_id, text) in enumerate(questions)
+        ]
+        return {
+            "quiz": quiz_id,
+            "submissions": submissions,
+            "alpha": as_number(alpha),
+            "items": items,
+        }
+
+    return get_or_set_versioned(
+        SCORES, quiz_id, "items", compute, settings.QUIZ_SCORES_CACHE_TIMEOUT
+    )
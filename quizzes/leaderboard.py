@@ -0,0 +1,102 @@
+"""
+Rankings of the participants of a quiz by score (correct answers).
+
+Everything derives from the score histogram of the quiz, a single GROUP BY over
+its submissions with at most one row per possible score. Statistics and the
+rank of any score follow from it without materializing the full ranking.
+Ranks are "1224" style: one plus the number of strictly better scores.
+"""
+from django.conf import settings
+from django.db.models import Count
+
+from quizzes.cache import SCORES, get_or_set_versioned
+from quizzes.models import QuizSubmission
+
+PERCENTILES = [25, 75, 90]
+
+
+def ranked_submissions(quiz_id):
+    # only participants who answered at least once take part
+    return QuizSubmission.objects.filter(quiz_id=quiz_id, answers_all_count__gt=0)
+
+
+def score_histogram(quiz_id):
+    """
+    `[(score, count), ...]` from the best score to the worst, cached until the
+    next answer to the quiz (see quizzes.signals).
+    """
+
+    def compute():
+        return list(
+            ranked_submissions(quiz_id)
+            .values_list("answers_correct_count")
+            .annotate(count=Count("id"))
+            .order_by("-answers_correct_count")
+        )
+
+    return get_or_set_versioned(
+        SCORES, quiz_id, "histogram", compute, settings.QUIZ_SCORES_CACHE_TIMEOUT
+    )
+
+
+def rank_of(histogram, score):
+    return 1 + sum(count for value, count in histogram if value > score)
+
+
+def nth_lowest(histogram, index):
+    seen = 0
+    for value, count in reversed(histogram):
+        seen += count
+        if index < seen:
+            return value
+
+
+def percentile(histogram, fraction):
+    """
+    The score below which `fraction` of the participants fall, interpolating
+    linearly between neighbours like `statistics.quantiles(method="inclusive")`.
+    """
+    total = sum(count for _, count in histogram)
+    position = fraction * (total - 1)
+    lower = int(position)
+    low = nth_lowest(histogram, lower)
+    high = nth_lowest(histogram, min(lower + 1, total - 1))
+    return round(low + (high - low) * (position - lower), 2)
+
+
+def summarize(histogram):
+    total = sum(count for _, count in histogram)
+    stats = {"participants": total, "mean": None, "median": None}
+    stats.update((f"p{p}", None) for p in PERCENTILES)
+    if total:
+        stats["mean"] = round(
+            sum(value * count for value, count in histogram) / total, 2
+        )
+        stats["median"] = percentile(histogram, 0.5)
+        stats.update((f"p{p}", percentile(histogram, p / 100)) for p in PERCENTILES)
+    return stats
+
+
+def top_submissions(quiz_id, limit):
+    """
+    The `limit` best submissions as `(score, participant id, email, first name,
+    last name)`, best first and earliest submission first among equals. Cached
+    like the histogram.
+    """
+
+    def compute():
+        return list(
+            ranked_submissions(quiz_id)
+            .order_by("-answers_correct_count", "id")
+            .values_list(
+                "answers_correct_count",
+                "participant_id",
+                "participant__user__email",
+                "participant__user__first_name",
+                "participant__user__last_name",
+            )[:limit]
+        )
+
+    return get_or_set_versioned(
+        SCORES, quiz_id, f"top:{limit}", compute, settings.QUIZ_SCORES_CACHE_TIMEOUT
+    )
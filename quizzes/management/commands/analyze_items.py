@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from quizzes.items import item_analysis
+from quizzes.models import Quiz
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Write the item analysis (difficulty, discrimination, Cronbach's alpha) "
+        "of quizzes as JSON Lines, one quiz per line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "quiz_ids",
+            nargs="*",
+            type=int,
+            help="Quizzes to analyze, all of them by default.",
+        )
+        parser.add_argument(
+            "--output", help="Path of the file to write, standard output by default."
+        )
+
+    def handle(self, *args, **options):
+        quiz_ids = options["quiz_ids"] or Quiz.objects.order_by("id").values_list(
+            "id", flat=True
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                count = self.write(output, quiz_ids)
+            self.stderr.write(f"Analyzed {count} quiz(zes).")
+        else:
+            self.write(self.stdout, quiz_ids)
+
+    def write(self, output, quiz_ids):
+        count = 0
+        for quiz_id in quiz_ids:
+            output.write(json.dumps(item_analysis(quiz_id)) + "\n")
+            count += 1
+        return count
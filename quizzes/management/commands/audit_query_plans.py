@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.query_plans import audit
+
+BASELINE = Path(__file__).resolve().parents[2] / "query_plan_baseline.json"
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Replay a canonical request to every API endpoint, EXPLAIN each query and "
+        "fail on full table scans or temporary B-trees missing from the baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--baseline",
+            default=str(BASELINE),
+            help="JSON file of the known findings (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the current findings to the baseline instead of failing.",
+        )
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options["baseline"])
+        known = set()
+        if baseline_path.exists():
+            known = set(json.loads(baseline_path.read_text()))
+
+        findings, new = set(), set()
+        for request, status_code, statements in audit():
+            self.stdout.write(
+                f"{request.name}: {request.method.upper()} {request.path} "
+                f"-> {status_code}, {len(statements)} quer(ies)"
+            )
+            for statement in statements:
+                for finding in statement.findings:
+                    key = f"{request.name}: {finding}"
+                    findings.add(key)
+                    if key not in known:
+                        new.add(key)
+                    marker = "NEW " if key not in known else ""
+                    self.stdout.write(f"  {marker}{finding}")
+                    if options["verbosity"] > 1:
+                        self.stdout.write(f"    {statement.sql}")
+
+        if options["update_baseline"]:
+            baseline_path.write_text(json.dumps(sorted(findings), indent=2) + "\n")
+            self.stdout.write(f"Wrote {len(findings)} finding(s) to {baseline_path}.")
+            return
+        fixed = known - findings
+        if fixed:
+            self.stdout.write(
+                f"{len(fixed)} baseline finding(s) no longer occur, "
+                "consider --update-baseline."
+            )
+        if new:
+            raise CommandError(
+                f"{len(new)} new full table scan(s) or temporary B-tree(s): "
+                + "; ".join(sorted(new))
+            )
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from quizzes.reports import DEFAULT_DAYS, FORMATS, usage_rows
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Write the daily usage report (quizzes, invites, acceptances, answers "
+        "and scores per day) to a file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the file to write.")
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help=f"First day (YYYY-MM-DD), {DEFAULT_DAYS} days up to --end by default.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day (YYYY-MM-DD), today by default.",
+        )
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+
+    def handle(self, *args, **options):
+        end = options["end"] or timezone.localdate()
+        start = options["start"] or end - timedelta(days=DEFAULT_DAYS - 1)
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+        render, _ = FORMATS[options["format"]]
+        with open(options["output"], "w", newline="", encoding="utf-8") as output:
+            output.writelines(render(usage_rows(start, end)))
+        days = (end - start).days + 1
+        self.stdout.write(f"Wrote {days} day(s) to {options['output']}.")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quizzes.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Rebuild the full-text search index of quizzes, e.g. after loading "
+        "fixtures or writing to the database outside the ORM."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(f"Indexed {count} quiz(zes).")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.models import QuizSubmission
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Find submissions whose denormalized answer counters drifted from their "
+        "answers and recompute them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of submissions recomputed per UPDATE.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted submissions.",
+        )
+
+    def handle(self, *args, **options):
+        drifted_ids = list(
+            QuizSubmission.objects.drifted().values_list("id", flat=True)
+        )
+        if not options["dry_run"]:
+            batch_size = options["batch_size"]
+            for start in range(0, len(drifted_ids), batch_size):
+                end = start + batch_size
+                QuizSubmission.objects.filter(
+                    id__in=drifted_ids[start:end]
+                ).refresh_answer_counts()
+        verb = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(f"{verb} {len(drifted_ids)} drifted submission(s).")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.rollups import catch_up_daily_usage
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Bring the DailyUsage rollup up to date with the submissions and answers "
+        "modified since the previous run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute every row from scratch, e.g. after deleting old data.",
+        )
+
+    def handle(self, *args, **options):
+        written = catch_up_daily_usage(rebuild=options["rebuild"])
+        self.stdout.write(f"Wrote {written} daily usage row(s).")
@@ -0,0 +1,118 @@
+import argparse
+
+from django.core.management.base import BaseCommand
+
+from quizzes.seeding import seed
+
+
+def int_range(value):
+    """
+    `"5:20"` as `(5, 20)`, `"7"` as `(7, 7)`.
+    """
+    try:
+        low, _, high = value.partition(":")
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected LOW:HIGH, got {value!r}.")
+    if not 0 <= low <= high:
+        raise argparse.ArgumentTypeError(f"Expected 0 <= LOW <= HIGH, got {value!r}.")
+    return low, high
+
+
+def positive_int_range(value):
+    # every question needs a correct answer
+    low, high = int_range(value)
+    if low < 1:
+        raise argparse.ArgumentTypeError(f"Expected 1 <= LOW <= HIGH, got {value!r}.")
+    return low, high
+
+
+def rate(value):
+    try:
+        value = float(value)
+    except ValueError:
+        value = -1
+    if not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError("Expected a number between 0 and 1.")
+    return value
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Generate synthetic owners, quizzes, participants, invites and answers "
+        "with bulk inserts, for load and scale testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--owners", type=int, default=100)
+        parser.add_argument(
+            "--participants",
+            type=int,
+            default=10000,
+            help="Size of the pool of participants invited to quizzes.",
+        )
+        parser.add_argument(
+            "--quizzes", type=int_range, default=(1, 10), help="Per owner, LOW:HIGH."
+        )
+        parser.add_argument(
+            "--questions", type=int_range, default=(5, 20), help="Per quiz."
+        )
+        parser.add_argument(
+            "--answers", type=positive_int_range, default=(2, 5), help="Per question."
+        )
+        parser.add_argument(
+            "--invites", type=int_range, default=(10, 200), help="Per quiz."
+        )
+        parser.add_argument(
+            "--acceptance", type=rate, default=0.8, help="Share of invites accepted."
+        )
+        parser.add_argument(
+            "--completion",
+            type=rate,
+            default=0.7,
+            help="Share of accepted invites answering every question.",
+        )
+        parser.add_argument(
+            "--correctness",
+            type=rate,
+            default=0.6,
+            help="Mean probability of a correct answer.",
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Spread the data over that many days."
+        )
+        parser.add_argument(
+            "--password", help="Password of every generated user (unusable by default)."
+        )
+        parser.add_argument("--batch-size", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        written, seconds = seed(
+            **{
+                name: options[name]
+                for name in [
+                    "seed",
+                    "owners",
+                    "participants",
+                    "quizzes",
+                    "questions",
+                    "answers",
+                    "invites",
+                    "acceptance",
+                    "completion",
+                    "correctness",
+                    "days",
+                    "password",
+                    "batch_size",
+                ]
+            }
+        )
+        for model, count in written.items():
+            self.stdout.write(f"{model}: {count} row(s)")
+        total = sum(written.values())
+        self.stdout.write(
+            f"Wrote {total} row(s) in {seconds:.1f} s "
+            f"({total / seconds:.0f} rows/s). Run rollup_daily_usage --rebuild "
+            "to include them in usage reports."
+        )
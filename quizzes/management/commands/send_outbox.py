@@ -0,0 +1,45 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from quizzes.outbox import claim_batch, send_batch
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Deliver queued emails in batches, reusing one connection per batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Failed attempts after which an email is marked dead.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new emails instead of exiting once drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to sleep between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        sent = 0
+        while True:
+            batch = claim_batch(options["batch_size"])
+            if batch:
+                sent += send_batch(batch, options["max_attempts"], connection)
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(f"Sent {sent} email(s).")
@@ -1,18 +1,81 @@
+from django.apps import apps
 from django.db import models
-from django.db.models import Count, Q
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 
-class QuizSubmissionManager(models.Manager):
-    def get_queryset(self):
-        return (
-            super()
-            .get_queryset()
-            .annotate(
-                answers_all_count=Count("answer_set"),
-                answers_correct_count=Count(
-                    "answer_set",
-                    filter=Q(answer_set__answer__is_correct=True),
-                    distinct=True,
+class QuizQuerySet(models.QuerySet):
+    def with_tree(self, submissions=True):
+        """
+        Prefetch every submission with its answers (if asked for) so that
+        rendering a page of quizzes costs a fixed number of queries, whatever
+        the size of the quizzes. The question/answer tree is loaded through
+        `quizzes.cache.get_quiz_questions`, only for quizzes not cached yet.
+        """
+        if not submissions:
+            return self
+        return self.annotate(questions_count=Count("quizquestion")).prefetch_related(
+            "quizsubmission_set__answer_set"
+        )
+
+
+class QuizSubmissionQuerySet(models.QuerySet):
+    def with_questions_count(self):
+        """
+        Annotate the number of questions of each submission's quiz (for its
+        progress) with a subquery, instead of prefetching the questions.
+        """
+        QuizQuestion = apps.get_model("quizzes", "QuizQuestion")
+        return self.annotate(
+            questions_count=Coalesce(
+                Subquery(
+                    QuizQuestion.objects.filter(quiz=OuterRef("quiz"))
+                    .order_by()
+                    .values("quiz")
+                    .annotate(count=Count("pk"))
+                    .values("count")
                 ),
+                0,
             )
         )
+
+    def refresh_answer_counts(self):
+        """
+        Recompute the denormalized answer counters from `answer_set` in a single
+        UPDATE. Used wherever answers are written in bulk (bypassing signals)
+        and to repair drift.
+        """
+        QuizUserAnswer = apps.get_model("quizzes", "QuizUserAnswer")
+        user_answers = (
+            QuizUserAnswer.objects.filter(submission=OuterRef("pk"))
+            .order_by()
+            .values("submission")
+        )
+        return self.update(
+            answers_all_count=Coalesce(
+                Subquery(user_answers.annotate(count=Count("pk")).values("count")),
+                0,
+            ),
+            answers_correct_count=Coalesce(
+                Subquery(
+                    user_answers.filter(answer__is_correct=True)
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            ),
+        )
+
+    def drifted(self):
+        """
+        Submissions whose stored answer counters disagree with `answer_set`.
+        """
+        return self.annotate(
+            actual_all_count=Count("answer_set"),
+            actual_correct_count=Count(
+                "answer_set", filter=Q(answer_set__answer__is_correct=True)
+            ),
+        ).exclude(
+            answers_all_count=F("actual_all_count"),
+            answers_correct_count=F("actual_correct_count"),
+        )
@@ -0,0 +1,111 @@
+"""
+Prometheus metrics, scraped from `/metrics`.
+
+Request latency and query count histograms per route of quizzes.urls, error
+counts, and business counters. With several worker processes set the
+PROMETHEUS_MULTIPROC_DIR environment variable to an empty directory shared by
+the workers (before they start): each process then writes its values to files
+there and `/metrics` reports them merged, whichever worker serves the scrape.
+
+`/metrics` is only served to superusers, to the addresses in
+QUIZ_METRICS_ALLOWED_IPS and with the QUIZ_METRICS_TOKEN bearer token.
+"""
+import hmac
+import os
+from time import perf_counter
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+
+REQUEST_LATENCY = Histogram(
+    "quizzes_request_duration_seconds",
+    "Time to respond to a request, by route.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "quizzes_request_queries",
+    "Database queries run to respond to a request, by route.",
+    ["route", "method"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_ERRORS = Counter(
+    "quizzes_request_errors_total",
+    "Responses with a 4xx or 5xx status, by route.",
+    ["route", "method", "status"],
+)
+INVITES = Counter("quizzes_invites_total", "Participants invited to quizzes.")
+ANSWERS = Counter("quizzes_answers_total", "Answers recorded by participants.")
+
+# any other request method is labelled "other", so that clients cannot create
+# label values at will
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE"}
+
+
+def quiz_routes():
+    from quizzes.urls import urlpatterns
+
+    return {pattern.name for pattern in urlpatterns}
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.routes = quiz_routes()
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        duration = perf_counter() - start
+
+        match = request.resolver_match
+        if match is not None and match.url_name in self.routes:
+            method = request.method if request.method in METHODS else "other"
+            labels = (match.url_name, method)
+            REQUEST_LATENCY.labels(*labels).observe(duration)
+            REQUEST_QUERIES.labels(*labels).observe(queries)
+            if response.status_code >= 400:
+                REQUEST_ERRORS.labels(*labels, response.status_code).inc()
+        return response
+
+
+def may_scrape(request):
+    if request.user.is_superuser:
+        return True
+    if request.META.get("REMOTE_ADDR") in settings.QUIZ_METRICS_ALLOWED_IPS:
+        return True
+    token = settings.QUIZ_METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(
+        authorization.encode(), f"Bearer {token}".encode()
+    )
+
+
+def metrics_view(request):
+    if not may_scrape(request):
+        return HttpResponseForbidden()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,29 @@
+# Generated by Django 4.1 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(fields=["name", "id"], name="quiz_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="quiz",
+            index=models.Index(
+                fields=["owner", "name", "id"], name="quiz_owner_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quizsubmission",
+            index=models.Index(
+                fields=["participant", "created", "id"], name="participant_created_idx"
+            ),
+        ),
+    ]
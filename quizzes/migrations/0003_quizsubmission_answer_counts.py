@@ -0,0 +1,49 @@
+# Generated by Django 4.1 on 2026-10-18 10:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_answer_counts(apps, schema_editor):
+    QuizSubmission = apps.get_model("quizzes", "QuizSubmission")
+    QuizUserAnswer = apps.get_model("quizzes", "QuizUserAnswer")
+    user_answers = (
+        QuizUserAnswer.objects.filter(submission=OuterRef("pk"))
+        .order_by()
+        .values("submission")
+    )
+    QuizSubmission.objects.update(
+        answers_all_count=Coalesce(
+            Subquery(user_answers.annotate(count=Count("pk")).values("count")), 0
+        ),
+        answers_correct_count=Coalesce(
+            Subquery(
+                user_answers.filter(answer__is_correct=True)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0002_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quizsubmission",
+            name="answers_all_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="quizsubmission",
+            name="answers_correct_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_answer_counts, migrations.RunPython.noop),
+    ]
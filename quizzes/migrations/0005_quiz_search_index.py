@@ -0,0 +1,41 @@
+# Generated by Django 4.1 on 2026-10-18 10:53
+
+from django.db import migrations
+
+# FTS5 index of quizzes, see quizzes.search
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE quizzes_quiz_search USING fts5(
+    name, questions, owner_email, tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+# a match on the name counts more than one on the owner, or in the questions
+CONFIGURE_RANK = """
+INSERT INTO quizzes_quiz_search (quizzes_quiz_search, rank)
+VALUES ('rank', 'bm25(10.0, 1.0, 5.0)')
+"""
+
+BACKFILL_INDEX = """
+INSERT INTO quizzes_quiz_search (rowid, name, questions, owner_email)
+SELECT quiz.id, quiz.name, COALESCE(group_concat(question.text, ' '), ''),
+       COALESCE(auth_user.email, '')
+FROM quizzes_quiz quiz
+INNER JOIN quizzes_owner owner ON owner.id = quiz.owner_id
+INNER JOIN auth_user ON auth_user.id = owner.user_id
+LEFT OUTER JOIN quizzes_quizquestion question ON question.quiz_id = quiz.id
+GROUP BY quiz.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0004_outboxemail"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [CREATE_INDEX, CONFIGURE_RANK, BACKFILL_INDEX],
+            "DROP TABLE quizzes_quiz_search",
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.1 on 2026-10-18 10:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0005_quiz_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                (
+                    "modified",
+                    django_extensions.db.fields.ModificationDateTimeField(
+                        auto_now=True, verbose_name="modified"
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("invites", models.PositiveIntegerField(default=0)),
+                ("acceptances", models.PositiveIntegerField(default=0)),
+                ("answers", models.PositiveIntegerField(default=0)),
+                ("answers_correct", models.PositiveIntegerField(default=0)),
+                ("submissions_completed", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Daily usage",
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=64, unique=True)),
+                ("processed_until", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="quizsubmission",
+            index=models.Index(fields=["modified"], name="submission_modified_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="quizuseranswer",
+            index=models.Index(fields=["modified"], name="user_answer_modified_idx"),
+        ),
+        migrations.AddField(
+            model_name="dailyusage",
+            name="owner",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="quizzes.owner"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyusage",
+            name="quiz",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="quizzes.quiz"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailyusage",
+            index=models.Index(fields=["quiz", "day"], name="usage_quiz_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyusage",
+            constraint=models.UniqueConstraint(
+                fields=("day", "owner", "quiz"), name="one_usage_per_day_per_quiz"
+            ),
+        ),
+    ]
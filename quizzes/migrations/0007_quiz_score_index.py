@@ -0,0 +1,21 @@
+# Generated by Django 4.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0006_daily_usage"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="quizsubmission",
+            index=models.Index(
+                condition=models.Q(("answers_all_count__gt", 0)),
+                fields=["quiz", "-answers_correct_count", "id"],
+                name="quiz_score_idx",
+            ),
+        ),
+    ]
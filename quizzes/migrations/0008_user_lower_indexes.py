@@ -0,0 +1,26 @@
+# Generated by Django 4.1 on 2026-10-18 12:00
+
+from django.db import migrations
+
+# bulk invites look existing users up by lowercased email or username, see
+# quizzes.invites; auth_user belongs to django.contrib.auth, hence raw SQL
+CREATE_INDEXES = [
+    "CREATE INDEX quizzes_user_email_lower_idx ON auth_user (LOWER(email))",
+    "CREATE INDEX quizzes_user_username_lower_idx ON auth_user (LOWER(username))",
+]
+DROP_INDEXES = [
+    "DROP INDEX quizzes_user_email_lower_idx",
+    "DROP INDEX quizzes_user_username_lower_idx",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("quizzes", "0007_quiz_score_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEXES, DROP_INDEXES),
+    ]
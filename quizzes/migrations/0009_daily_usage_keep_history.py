@@ -0,0 +1,32 @@
+# Generated by Django 4.1 on 2026-10-18 12:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0008_user_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dailyusage",
+            name="owner",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="quizzes.owner",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="dailyusage",
+            name="quiz",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="quizzes.quiz",
+            ),
+        ),
+    ]
@@ -5,8 +5,9 @@ from django_extensions.db.models import TimeStampedModel
 from django.conf import settings
 from django.db import models
 from django.db.models import Q, UniqueConstraint
+from django.utils import timezone
 
-from quizzes.managers import QuizSubmissionManager
+from quizzes.managers import QuizQuerySet, QuizSubmissionQuerySet
 
 User = settings.AUTH_USER_MODEL
 
@@ -23,7 +24,14 @@ class Quiz(TimeStampedModel):
     owner = models.ForeignKey(Owner, on_delete=models.CASCADE)
     name = models.CharField(max_length=32)
 
+    objects = QuizQuerySet.as_manager()
+
     class Meta:
+        indexes = [
+            # keyset pagination, see quizzes.pagination.QuizPagination
+            models.Index(fields=["name", "id"], name="quiz_name_idx"),
+            models.Index(fields=["owner", "name", "id"], name="quiz_owner_name_idx"),
+        ]
         ordering = ["name"]
         verbose_name_plural = "Quizzes"
 
@@ -78,8 +86,11 @@ class QuizSubmission(TimeStampedModel):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
     uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     accepted_on = models.DateTimeField(blank=True, null=True)
+    # denormalized from answer_set, see quizzes.signals
+    answers_all_count = models.PositiveIntegerField(default=0, editable=False)
+    answers_correct_count = models.PositiveIntegerField(default=0, editable=False)
 
-    objects = QuizSubmissionManager()
+    objects = QuizSubmissionQuerySet.as_manager()
 
     class Meta:
         constraints = [
@@ -88,6 +99,21 @@ class QuizSubmission(TimeStampedModel):
                 name="one_submission_per_participant_per_quiz",
             )
         ]
+        indexes = [
+            # keyset pagination, see quizzes.pagination.QuizSubmissionPagination
+            models.Index(
+                fields=["participant", "created", "id"],
+                name="participant_created_idx",
+            ),
+            # daily usage catch-up, see quizzes.rollups
+            models.Index(fields=["modified"], name="submission_modified_idx"),
+            # score histogram and top scores, see quizzes.leaderboard
+            models.Index(
+                fields=["quiz", "-answers_correct_count", "id"],
+                condition=Q(answers_all_count__gt=0),
+                name="quiz_score_idx",
+            ),
+        ]
 
 
 class QuizUserAnswer(TimeStampedModel):
@@ -103,3 +129,82 @@ class QuizUserAnswer(TimeStampedModel):
                 name="one_answer_per_question_per_submission",
             )
         ]
+        indexes = [
+            # daily usage catch-up, see quizzes.rollups
+            models.Index(fields=["modified"], name="user_answer_modified_idx"),
+        ]
+
+
+class OutboxEmail(TimeStampedModel):
+    """
+    An email queued for delivery by the `send_outbox` management command.
+
+    Rows are written in the same transaction as the change that triggers the
+    email, so an email is sent if and only if that change is committed.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENT = "sent"
+        DEAD = "dead"  # gave up after too many failed attempts
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.EmailField()
+    to = models.JSONField()
+    status = models.CharField(
+        max_length=8, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_on = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
+
+
+class DailyUsage(TimeStampedModel):
+    """
+    Usage of a quiz on a day, pre-aggregated by the `rollup_daily_usage`
+    management command, see quizzes.rollups. Outlives the quiz and its owner,
+    whose columns are then set to NULL.
+    """
+
+    day = models.DateField()
+    owner = models.ForeignKey(Owner, on_delete=models.SET_NULL, null=True)
+    quiz = models.ForeignKey(Quiz, on_delete=models.SET_NULL, null=True)
+    invites = models.PositiveIntegerField(default=0)
+    acceptances = models.PositiveIntegerField(default=0)
+    answers = models.PositiveIntegerField(default=0)
+    answers_correct = models.PositiveIntegerField(default=0)
+    submissions_completed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["day", "owner", "quiz"],
+                name="one_usage_per_day_per_quiz",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["quiz", "day"], name="usage_quiz_day_idx"),
+        ]
+        verbose_name_plural = "Daily usage"
+
+
+class RollupWatermark(models.Model):
+    """
+    The `modified` timestamp up to which a rollup has processed its sources.
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    processed_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} @ {self.processed_until}"
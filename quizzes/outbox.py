@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from quizzes.models import OutboxEmail
+
+# seconds before retrying a failed email: 30s, 1m, 2m, 4m, ... capped at 1h
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+# a claimed batch that is neither sent nor failed (e.g. the worker died) becomes
+# due again after this many seconds
+CLAIM_LEASE = 5 * 60
+
+
+def invite_email(quiz, email):
+    return OutboxEmail(
+        subject="Quiz Invite!",
+        body=f"You've been invited to {quiz.name}.",
+        from_email=quiz.owner.user.email,
+        to=[email],
+    )
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def claim_batch(batch_size):
+    """
+    Claim up to `batch_size` due emails by pushing their next attempt past the
+    lease, so that concurrent workers do not pick them up as well.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        OutboxEmail.objects.filter(id__in=[email.id for email in batch]).update(
+            next_attempt_at=now + timedelta(seconds=CLAIM_LEASE)
+        )
+    return batch
+
+
+def send_batch(batch, max_attempts, connection=None):
+    """
+    Send `batch` over a single (reused) connection. Returns the number of emails
+    sent; failed emails are rescheduled with exponential backoff, or marked dead
+    once they reach `max_attempts`.
+    """
+    connection = connection or get_connection()
+    sent_ids = []
+    failed = []
+    try:
+        connection.open()
+    except Exception as exc:
+        failed = [(email, exc) for email in batch]
+    else:
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.to,
+                    connection=connection,
+                )
+                try:
+                    # one message at a time, so a failure is pinned to its email
+                    connection.send_messages([message])
+                except Exception as exc:
+                    failed.append((email, exc))
+                else:
+                    sent_ids.append(email.id)
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    OutboxEmail.objects.filter(id__in=sent_ids).update(
+        status=OutboxEmail.Status.SENT,
+        sent_on=now,
+        attempts=F("attempts") + 1,
+        modified=now,
+    )
+    for email, exc in failed:
+        email.attempts += 1
+        email.last_error = repr(exc)
+        if email.attempts >= max_attempts:
+            email.status = OutboxEmail.Status.DEAD
+        else:
+            email.next_attempt_at = now + backoff(email.attempts)
+        email.save(
+            update_fields=[
+                "attempts",
+                "last_error",
+                "status",
+                "next_attempt_at",
+                "modified",
+            ]
+        )
+    return len(sent_ids)
@@ -0,0 +1,243 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import date, datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a compound, unique ordering.
+
+    The cursor is an opaque token holding the ordering values of the row at the
+    page boundary. Fetching a page is a `WHERE (a, b) > (x, y) ORDER BY a, b
+    LIMIT n` query, so its cost does not depend on how deep into the list the
+    page is, and rows inserted before the boundary never shift later pages.
+
+    Unlike DRF's `CursorPagination` every ordering field takes part in the
+    comparison, hence the last field must be unique (e.g. `id`).
+
+    Search results (see quizzes.search) are paged by offset instead: their BM25
+    `search_rank` changes whenever the search index does, so a rank saved in a
+    cursor says nothing about where the next page starts.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("id",)
+    # when the queryset went through QuizSearchFilter: most relevant first
+    search_ordering = ("search_rank", "id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.offset = None
+        if "search_rank" in queryset.query.annotations:
+            return self.paginate_by_offset(queryset, request)
+
+        keys, reverse = self.decode_cursor(request)
+        if keys is not None:
+            keys = self.clean_keys(queryset, keys)
+        ordering = self.reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if keys is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, keys))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = keys is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, keys is not None
+        return self.page
+
+    def paginate_by_offset(self, queryset, request):
+        self.offset = start = self.decode_offset(request)
+        end = start + self.page_size + 1
+        rows = list(queryset.order_by(*self.ordering)[start:end])
+        self.page = rows[: self.page_size]
+        self.has_next, self.has_previous = len(rows) > self.page_size, self.offset > 0
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations:
+            return self.search_ordering
+        return self.ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        if self.offset is not None:
+            return self.offset_link(self.offset + self.page_size)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.offset is not None:
+            return self.offset_link(max(self.offset - self.page_size, 0))
+        if not self.page:
+            # stepped past the end of the list: restart from its last page
+            return replace_query_param(
+                remove_query_param(self.base_url, self.cursor_query_param),
+                self.cursor_query_param,
+                self.dump_cursor(None, reverse=True),
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        keys = [self.key_value(row, field.lstrip("-")) for field in self.ordering]
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.dump_cursor(keys, reverse)
+        )
+
+    def offset_link(self, offset):
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.dump({"o": offset})
+        )
+
+    def dump_cursor(self, keys, reverse):
+        return self.dump({"k": keys, "r": reverse})
+
+    def decode_cursor(self, request):
+        payload = self.load(request)
+        if payload is None:
+            return None, False
+        try:
+            keys, reverse = payload["k"], bool(payload["r"])
+        except KeyError:
+            raise NotFound(self.invalid_cursor_message)
+        if keys is not None and (
+            not isinstance(keys, list) or len(keys) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return keys, reverse
+
+    def decode_offset(self, request):
+        payload = self.load(request)
+        if payload is None:
+            return 0
+        try:
+            offset = payload["o"]
+        except KeyError:
+            raise NotFound(self.invalid_cursor_message)
+        if type(offset) is not int or offset < 0:
+            raise NotFound(self.invalid_cursor_message)
+        return offset
+
+    @staticmethod
+    def dump(payload):
+        payload = json.dumps(payload, separators=(",", ":"))
+        return b64encode(payload.encode("utf-8"), altchars=b"-_").decode("ascii")
+
+    def load(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(b64decode(encoded.encode("ascii"), altchars=b"-_"))
+        except (ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(payload, dict):
+            raise NotFound(self.invalid_cursor_message)
+        return payload
+
+    def clean_keys(self, queryset, keys):
+        """
+        Convert the cursor's keys with their ordering fields, so that a tampered
+        cursor is a 404 rather than a failing query.
+        """
+        cleaned = []
+        for field_name, key in zip(self.ordering, keys):
+            field_name = field_name.lstrip("-")
+            if field_name in queryset.query.annotations:
+                field = queryset.query.annotations[field_name].output_field
+            else:
+                field = queryset.model._meta.get_field(field_name)
+            try:
+                key = field.to_python(key)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            if key is None:
+                raise NotFound(self.invalid_cursor_message)
+            cleaned.append(key)
+        return cleaned
+
+    @staticmethod
+    def key_value(row, field_name):
+        # model instances, or dicts of a `.values()` queryset
+        value = row[field_name] if isinstance(row, dict) else getattr(row, field_name)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def reverse_ordering(ordering):
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+        )
+
+    @staticmethod
+    def keyset_filter(ordering, keys):
+        """
+        Expand the row-value comparison `(a, b, c) > (x, y, z)` into
+        `a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)`.
+        """
+        condition = Q()
+        equal = {}
+        for field, key in zip(ordering, keys):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": key})
+            equal[name] = key
+        return condition
+
+
+class QuizPagination(KeysetPagination):
+    # Quiz.Meta.ordering, made unique
+    ordering = ("name", "id")
+
+
+class QuizSubmissionPagination(KeysetPagination):
+    ordering = ("created", "id")
@@ -26,3 +26,8 @@ class IsParticipantPermission(BasePermission):
         if request.user.is_superuser:
             return True
         return hasattr(request.user, "participant")
+
+
+class IsSuperuserPermission(BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_superuser
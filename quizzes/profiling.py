@@ -0,0 +1,181 @@
+"""
+On-demand profiling of a single request, for superusers.
+
+A request with `?profile=1` or an `X-Profile: 1` header from a superuser runs
+under cProfile while a thread samples its stack, and the response is replaced
+by a zip file with:
+
+* `profile.pstats`: the cProfile stats, for `python -m pstats` or snakeviz;
+* `profile.txt`: the same, as text sorted by cumulative time;
+* `stacks.txt`: the sampled stacks, collapsed for flamegraph.pl or speedscope;
+* `queries.json`: every SQL statement with its parameters, duration and
+  `EXPLAIN QUERY PLAN`;
+* `response.txt`: the status, headers and body of the original response.
+
+cProfile allows a single active profiler per interpreter: while a request is
+profiled, other profiled requests get a 503 and should be retried.
+"""
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import zipfile
+from collections import Counter
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+
+SAMPLE_INTERVAL = 0.001  # seconds
+PROFILER_LOCK = threading.Lock()
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of `thread_id` every `interval` seconds until stopped.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def frame_name(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(str(settings.BASE_DIR)):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": None if many else params,
+                    "many": many,
+                    "ms": round((perf_counter() - start) * 1000, 3),
+                }
+            )
+
+    def explain(self):
+        for query in self.queries:
+            query["plan"] = None
+            if query["many"] or not query["sql"].lstrip().upper().startswith(
+                ("SELECT", "WITH")
+            ):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"], query["params"])
+                query["plan"] = [row[-1] for row in cursor.fetchall()]
+        return self.queries
+
+
+def wants_profile(request):
+    flag = request.GET.get("profile") or request.headers.get("X-Profile")
+    user = getattr(request, "user", None)
+    return flag == "1" and user is not None and user.is_superuser
+
+
+def describe(response):
+    lines = [f"HTTP {response.status_code} {response.reason_phrase}"]
+    lines += [f"{name}: {value}" for name, value in response.items()]
+    body = (
+        "<streamed>"
+        if response.streaming
+        else response.content.decode(response.charset, "replace")
+    )
+    return "\n".join(lines) + "\n\n" + body
+
+
+def busy():
+    response = JsonResponse(
+        {"detail": "Another request is being profiled, try again later."},
+        status=503,
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request):
+            return self.get_response(request)
+        if not PROFILER_LOCK.acquire(blocking=False):
+            return busy()
+        try:
+            return self.profile(request)
+        finally:
+            PROFILER_LOCK.release()
+
+    def profile(self, request):
+        queries = QueryLog()
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            with connection.execute_wrapper(queries):
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # profiled from outside this middleware, e.g. by a debugger
+                    return busy()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+        finally:
+            sampler.stop()
+
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text)
+        stats.sort_stats("cumulative").print_stats()
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            # what stats.dump_stats() writes, without a temporary file
+            zip_file.writestr("profile.pstats", marshal.dumps(stats.stats))
+            zip_file.writestr("profile.txt", text.getvalue())
+            zip_file.writestr("stacks.txt", sampler.collapsed())
+            zip_file.writestr(
+                "queries.json", json.dumps(queries.explain(), indent=2, default=str)
+            )
+            zip_file.writestr("response.txt", describe(response))
+        profile = HttpResponse(archive.getvalue(), content_type="application/zip")
+        profile["Content-Disposition"] = 'attachment; filename="profile.zip"'
+        return profile
@@ -0,0 +1,243 @@
+"""
+Audit of the query plans of the API.
+
+A canonical request to every endpoint is replayed against a small set of
+quizzes created for the purpose (and rolled back afterwards); every SQL
+statement it runs goes through `EXPLAIN QUERY PLAN`, and plan steps that read
+a whole table or sort into a temporary B-tree are reported as findings.
+"""
+from collections import namedtuple
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.urls import resolve
+
+from quizzes.models import (
+    Owner,
+    Participant,
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+    QuizUserAnswer,
+)
+
+Replay = namedtuple("Replay", ["name", "role", "method", "path", "data"])
+Statement = namedtuple("Statement", ["sql", "plan", "findings"])
+
+
+def create_fixtures():
+    """
+    An owner with a two question quiz, a participant who answered one of
+    them, and a superuser.
+    """
+    users = {
+        role: User.objects.create_user(
+            username=f"audit-{role}@example.com",
+            email=f"audit-{role}@example.com",
+            first_name="Audit",
+            last_name=role.title(),
+        )
+        for role in ["owner", "participant", "superuser"]
+    }
+    User.objects.filter(id=users["superuser"].id).update(is_superuser=True)
+    users["superuser"].is_superuser = True
+    owner = Owner.objects.create(user=users["owner"])
+    participant = Participant.objects.create(user=users["participant"])
+    quiz = Quiz.objects.create(owner=owner, name="Capital cities")
+    answers = []
+    for position, (text, right, wrong) in enumerate(
+        [("CH capital city?", "Bern", "Zurich"), ("FR capital city?", "Paris", "Lyon")]
+    ):
+        question = QuizQuestion.objects.create(quiz=quiz, text=text, position=position)
+        answers.append(
+            [
+                QuizQuestionAnswer.objects.create(
+                    question=question, text=right, position=0, is_correct=True
+                ),
+                QuizQuestionAnswer.objects.create(
+                    question=question, text=wrong, position=1, is_correct=False
+                ),
+            ]
+        )
+    submission = QuizSubmission.objects.create(quiz=quiz, participant=participant)
+    QuizUserAnswer.objects.create(submission=submission, answer=answers[0][0])
+    return users, quiz, participant, answers
+
+
+def canonical_requests(quiz, participant, answers):
+    question_id = answers[1][0].question_id
+    submissions = f"/api/participant/{participant.id}/submissions"
+    invitee = {"first_name": "Ada", "last_name": "Lovelace"}
+    return [
+        Replay("quiz list", "owner", "get", "/api/quizzes/", {}),
+        Replay(
+            "quiz list (expanded)",
+            "owner",
+            "get",
+            "/api/quizzes/",
+            {"expand": "questions,submissions"},
+        ),
+        Replay("quiz search", "owner", "get", "/api/quizzes/", {"search": "capital"}),
+        Replay("quiz list (participant)", "participant", "get", "/api/quizzes/", {}),
+        Replay("quiz detail", "owner", "get", f"/api/quizzes/{quiz.id}/", {}),
+        Replay(
+            "quiz detail (participant)",
+            "participant",
+            "get",
+            f"/api/quizzes/{quiz.id}/",
+            {},
+        ),
+        Replay(
+            "answer distribution",
+            "owner",
+            "get",
+            f"/api/quizzes/{quiz.id}/answers/distribution/",
+            {},
+        ),
+        Replay("item analysis", "owner", "get", f"/api/quizzes/{quiz.id}/items/", {}),
+        Replay(
+            "leaderboard", "owner", "get", f"/api/quizzes/{quiz.id}/leaderboard/", {}
+        ),
+        Replay(
+            "leaderboard (participant)",
+            "participant",
+            "get",
+            f"/api/quizzes/{quiz.id}/leaderboard/",
+            {},
+        ),
+        Replay(
+            "question create",
+            "owner",
+            "post",
+            f"/api/quizzes/{quiz.id}/questions/",
+            {"text": "DE capital city?", "position": 2},
+        ),
+        Replay(
+            "answer create",
+            "owner",
+            "post",
+            f"/api/quizzes/{quiz.id}/questions/{question_id}/answers",
+            {"text": "Marseille", "position": 2, "is_correct": False},
+        ),
+        Replay(
+            "invite",
+            "owner",
+            "post",
+            f"/api/quizzes/{quiz.id}/invite/",
+            {**invitee, "email": "audit-ada@example.com"},
+        ),
+        Replay(
+            "bulk invite",
+            "owner",
+            "post",
+            f"/api/quizzes/{quiz.id}/invite/bulk/",
+            [{**invitee, "email": "audit-bulk@example.com"}],
+        ),
+        Replay("participant submissions", "participant", "get", f"{submissions}/", {}),
+        Replay(
+            "participant submissions by owner email",
+            "participant",
+            "get",
+            f"{submissions}/",
+            {"owner_email": "AUDIT-OWNER@example.com"},
+        ),
+        Replay(
+            "participant submission",
+            "participant",
+            "get",
+            f"{submissions}/{quiz.id}/",
+            {},
+        ),
+        Replay(
+            "answer",
+            "participant",
+            "post",
+            f"{submissions}/{quiz.id}/answers/",
+            {"answer": answers[1][0].id},
+        ),
+        Replay(
+            "answer sheet",
+            "participant",
+            "post",
+            f"{submissions}/{quiz.id}/answers/batch/",
+            {"answers": [answers[0][1].id, answers[1][1].id]},
+        ),
+        Replay("usage report", "superuser", "get", "/api/reports/usage.csv", {}),
+    ]
+
+
+def plan_findings(plan):
+    """
+    The steps of a query plan that read a whole table or sort into a
+    temporary B-tree. Scans of an index or of a virtual (FTS) table are fine.
+    """
+    return [
+        detail
+        for detail in plan
+        if detail.startswith("USE TEMP B-TREE")
+        or (
+            detail.startswith("SCAN ")
+            and " USING " not in detail
+            and "VIRTUAL TABLE" not in detail
+            and detail != "SCAN CONSTANT ROW"
+        )
+    ]
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def replay(replay, user):
+    """
+    `(status code, [Statement, ...])` of one request, with one statement per
+    distinct SQL string it ran.
+    """
+    queries = {}
+
+    def capture(execute, sql, params, many, context):
+        if not many:
+            queries.setdefault(sql, params)
+        return execute(sql, params, many, context)
+
+    factory = APIRequestFactory()
+    if replay.method == "get":
+        request = factory.get(replay.path, replay.data)
+    else:
+        request = factory.post(replay.path, replay.data, format="json")
+    force_authenticate(request, user=user)
+    match = resolve(replay.path)
+    with connection.execute_wrapper(capture):
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        else:
+            response.render()
+    statements = []
+    for sql, params in queries.items():
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            plan = explain(sql, params)
+            statements.append(Statement(sql, plan, plan_findings(plan)))
+    return response.status_code, statements
+
+
+def audit():
+    """
+    `[(Replay, status code, [Statement, ...]), ...]` for every canonical
+    request. Nothing is left in the database.
+    """
+    results = []
+    # request.build_absolute_uri() checks the host of the replayed requests
+    with override_settings(ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+        users, quiz, participant, answers = create_fixtures()
+        for request in canonical_requests(quiz, participant, answers):
+            status_code, statements = replay(request, users[request.role])
+            results.append((request, status_code, statements))
+        transaction.set_rollback(True)
+    return results
@@ -0,0 +1,72 @@
+"""
+JSON renderer and parser on top of orjson when it is installed, with DRF's
+stdlib `json` based classes as the fallback.
+
+The output is what DRF's `JSONRenderer` gives: the same compact separators,
+UTF-8 with U+2028/U+2029 escaped, and datetimes, dates, times, decimals, UUIDs,
+lazy strings, querysets, ... converted by DRF's `JSONEncoder` (orjson passes
+them to it). Only floats may be spelled differently (`1e-6` for `1e-06`), and
+NaN or infinities render as `null` instead of failing. Whatever orjson cannot
+render exactly (indented output, integers beyond 64 bits, ...) goes through
+the stdlib renderer.
+
+The parser differs from DRF's only for integers beyond 64 bits, which orjson
+parses into floats: none is valid anywhere in this API (ids and counters are
+64-bit columns), and serializer fields reject them either way.
+"""
+import io
+
+from rest_framework import parsers, renderers
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits: let the stdlib encoder deal with it
+            return super().render(data, accepted_media_type, renderer_context)
+        # invalid in JavaScript strings, escaped like DRF does
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower().replace("_", "-") != "utf-8"
+        ):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # reported by the stdlib parser, with its usual message
+            return super().parse(io.BytesIO(body), media_type, parser_context)
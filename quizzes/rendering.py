@@ -0,0 +1,223 @@
+"""
+Read-only rendering of quizzes and submissions straight from `.values()` rows.
+
+The output is exactly what `QuizSerializer` and `QuizSubmissionSerializer`
+produce (same keys in the same order, same formats, hence the same JSON
+bytes), without a serializer instance per row: the fields each role sees are
+resolved once, at import, into plans of `(key, column, convert)`. A `None`
+column marks a key computed by the caller (nested lists, score, ...).
+
+Superusers see what owners see, as in the serializers' `get_field_names`.
+Rendering is timed as `serializer` in Server-Timing, like the serializers.
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from django.utils import timezone
+
+from quizzes.cache import OWNER, PARTICIPANT, get_question_trees
+from quizzes.fieldsets import ALL_FIELDS
+from quizzes.models import (
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+    QuizUserAnswer,
+)
+from quizzes.timing import serializing
+
+
+def datetime_field(value):
+    # rest_framework.fields.DateTimeField.to_representation, ISO 8601 output
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def uuid_field(value):
+    return str(value)  # "hex_verbose"
+
+
+ANSWER_PLANS = {
+    OWNER: (
+        ("id", "id", None),
+        ("created", "created", datetime_field),
+        ("modified", "modified", datetime_field),
+        ("text", "text", None),
+        ("position", "position", None),
+        ("is_correct", "is_correct", None),
+        ("question", "question_id", None),
+    ),
+}
+ANSWER_PLANS[PARTICIPANT] = tuple(
+    field for field in ANSWER_PLANS[OWNER] if field[0] != "is_correct"
+)
+QUESTION_PLAN = (
+    ("id", "id", None),
+    ("answers", None, None),
+    ("created", "created", datetime_field),
+    ("modified", "modified", datetime_field),
+    ("text", "text", None),
+    ("position", "position", None),
+    ("quiz", "quiz_id", None),
+)
+QUIZ_PLANS = {
+    OWNER: (
+        ("id", "id", None),
+        ("submissions", None, None),
+        ("questions", None, None),
+        ("created", "created", datetime_field),
+        ("modified", "modified", datetime_field),
+        ("name", "name", None),
+        ("owner", "owner_id", None),
+    ),
+}
+QUIZ_PLANS[PARTICIPANT] = tuple(
+    field for field in QUIZ_PLANS[OWNER] if field[0] != "submissions"
+)
+SUBMISSION_PLAN = (
+    ("id", "id", None),
+    ("score", None, None),
+    ("progress", None, None),
+    ("answers", None, None),
+    ("created", "created", datetime_field),
+    ("modified", "modified", datetime_field),
+    ("uuid", "uuid", uuid_field),
+    ("accepted_on", "accepted_on", datetime_field),
+    ("participant", "participant_id", None),
+    ("quiz", "quiz_id", None),
+)
+USER_ANSWER_PLAN = (
+    ("id", "id", None),
+    ("created", "created", datetime_field),
+    ("modified", "modified", datetime_field),
+    ("submission", "submission_id", None),
+    ("answer", "answer_id", None),
+)
+
+
+def columns(plan, *extra):
+    return [column for _, column, _ in plan if column is not None] + list(extra)
+
+
+QUIZ_COLUMNS = columns(QUIZ_PLANS[OWNER])
+# the counters behind score and progress
+SUBMISSION_COLUMNS = columns(
+    SUBMISSION_PLAN, "answers_all_count", "answers_correct_count"
+)
+
+
+def render(row, plan, computed=None):
+    output = {}
+    for key, column, convert in plan:
+        if column is None:
+            output[key] = computed[key]
+        elif convert is None:
+            output[key] = row[column]
+        else:
+            output[key] = convert(row[column])
+    return output
+
+
+def sorted_rows(queryset, *keys):
+    # sorting (nearly sorted) rows here is cheaper than a temporary B-tree for
+    # an ORDER BY the join cannot take from an index
+    return sorted(queryset.order_by(), key=itemgetter(*keys))
+
+
+def render_question_trees(quiz_ids, role):
+    """
+    `{quiz id: rendered questions}`, with two queries in total.
+    """
+    plan = ANSWER_PLANS[role]
+    answers = defaultdict(list)
+    for row in sorted_rows(
+        QuizQuestionAnswer.objects.filter(question__quiz_id__in=quiz_ids).values(
+            *columns(plan)
+        ),
+        "question_id",
+        "position",
+    ):
+        answers[row["question_id"]].append(render(row, plan))
+    trees = {quiz_id: [] for quiz_id in quiz_ids}
+    for row in QuizQuestion.objects.filter(quiz_id__in=quiz_ids).values(
+        *columns(QUESTION_PLAN)
+    ):
+        trees[row["quiz_id"]].append(
+            render(row, QUESTION_PLAN, {"answers": answers[row["id"]]})
+        )
+    return trees
+
+
+def render_submissions(rows, user_answers, questions_count):
+    """
+    Render submission `rows` (with `SUBMISSION_COLUMNS`) with their answers
+    among the `user_answers` queryset. `questions_count(row)` is the number of
+    questions of the row's quiz.
+    """
+    answers = defaultdict(list)
+    for row in sorted_rows(
+        user_answers.values(*columns(USER_ANSWER_PLAN)), "submission_id", "id"
+    ):
+        answers[row["submission_id"]].append(render(row, USER_ANSWER_PLAN))
+    rendered = []
+    for row in rows:
+        answered = row["answers_all_count"]
+        computed = {
+            "score": f"{row['answers_correct_count']} / {answered}",
+            "progress": f"{answered} / {questions_count(row)}",
+            "answers": answers[row["id"]],
+        }
+        rendered.append(render(row, SUBMISSION_PLAN, computed))
+    return rendered
+
+
+def render_quiz(quiz, role, fieldset=ALL_FIELDS):
+    """
+    Render a quiz row (with `QUIZ_COLUMNS`) as seen by `role`, restricted to
+    `fieldset`: its question tree comes from the cache, and owners may also
+    get its submissions.
+    """
+    with serializing():
+        computed = {}
+        if fieldset.includes("questions"):
+            trees = get_question_trees(
+                [quiz["id"]],
+                role,
+                lambda quiz_ids: render_question_trees(quiz_ids, role),
+            )
+            computed["questions"] = trees[quiz["id"]]
+        if role == OWNER and fieldset.includes("submissions"):
+            if "questions" in computed:
+                questions_count = len(computed["questions"])
+            else:
+                questions_count = QuizQuestion.objects.filter(
+                    quiz_id=quiz["id"]
+                ).count()
+            computed["submissions"] = render_submissions(
+                QuizSubmission.objects.filter(quiz_id=quiz["id"])
+                .order_by("id")
+                .values(*SUBMISSION_COLUMNS),
+                QuizUserAnswer.objects.filter(submission__quiz_id=quiz["id"]),
+                lambda row: questions_count,
+            )
+        plan = [field for field in QUIZ_PLANS[role] if fieldset.includes(field[0])]
+        return render(quiz, plan, computed)
+
+
+def render_user_submissions(rows):
+    """
+    Render submission rows annotated with `questions_count` (see
+    `QuizSubmissionQuerySet.with_questions_count`).
+    """
+    with serializing():
+        rows = list(rows)
+        return render_submissions(
+            rows,
+            QuizUserAnswer.objects.filter(
+                submission_id__in=[row["id"] for row in rows]
+            ),
+            lambda row: row["questions_count"],
+        )
@@ -0,0 +1,136 @@
+"""
+Daily usage report of the service, streamed row by row.
+
+Every metric is one GROUP BY day query, read through `.iterator()` in chunks
+and merged by day, so memory use does not depend on the length of the range.
+Submission and answer metrics are read from the DailyUsage rollup up to the
+day before the last `rollup_daily_usage` run, and from the source tables from
+that day on, so that the report is never stale.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from quizzes.models import DailyUsage, Quiz
+
+COLUMNS = [
+    "day",
+    "quizzes_created",
+    "invites_sent",
+    "invitations_accepted",
+    "answers_recorded",
+    "answers_correct",
+    "submissions_completed",
+    "score_percent",  # answers_correct out of answers_recorded
+]
+
+CHUNK_SIZE = 1000
+DEFAULT_DAYS = 30
+
+
+def day_bounds(start, end):
+    """
+    Aware datetimes of the first instant of `start` and the first instant
+    after `end`, so that range filters can use plain comparisons.
+    """
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def per_day(queryset, field, start, end, **aggregates):
+    lower, upper = day_bounds(start, end)
+    return (
+        queryset.filter(**{f"{field}__gte": lower, f"{field}__lt": upper})
+        .annotate(day=TruncDate(field))
+        .values("day")
+        .annotate(**aggregates)
+        .order_by("day")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+# DailyUsage counts -> report columns
+USAGE_COLUMNS = {
+    "invites": "invites_sent",
+    "acceptances": "invitations_accepted",
+    "answers": "answers_recorded",
+    "answers_correct": "answers_correct",
+    "submissions_completed": "submissions_completed",
+}
+
+
+def usage_rows(start, end):
+    """
+    One dict per day from `start` to `end` (inclusive) with the COLUMNS, days
+    without any activity included.
+    """
+    # quizzes.rollups imports day_bounds from here
+    from quizzes.rollups import live_daily_usage, rolled_up_until
+
+    live_start = max(start, rolled_up_until() or start)
+    live = live_daily_usage(live_start, end) if live_start <= end else []
+    streams = [
+        per_day(Quiz.objects.all(), "created", start, end, quizzes_created=Count("id")),
+        DailyUsage.objects.filter(
+            day__range=(start, min(end, live_start - timedelta(days=1)))
+        )
+        .values("day")
+        .annotate(**{column: Sum(name) for name, column in USAGE_COLUMNS.items()})
+        .order_by("day")
+        .iterator(chunk_size=CHUNK_SIZE),
+        (
+            {
+                "day": counts["day"],
+                **{column: counts[name] for name, column in USAGE_COLUMNS.items()},
+            }
+            for counts in live
+        ),
+    ]
+    heads = [next(rows, None) for rows in streams]
+    day = start
+    while day <= end:
+        row = dict.fromkeys(COLUMNS, 0)
+        row["day"] = day
+        for index, head in enumerate(heads):
+            if head is not None and head["day"] == day:
+                row.update(head)
+                heads[index] = next(streams[index], None)
+        recorded = row["answers_recorded"]
+        row["score_percent"] = (
+            round(100 * row["answers_correct"] / recorded, 1) if recorded else None
+        )
+        yield row
+        day += timedelta(days=1)
+
+
+class Echo:
+    """File-like object whose write() hands back what it is given."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=COLUMNS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def render_jsonl(rows):
+    for row in rows:
+        yield json.dumps({**row, "day": row["day"].isoformat()}) + "\n"
+
+
+# format -> (renderer, content type)
+FORMATS = {
+    "csv": (render_csv, "text/csv"),
+    "jsonl": (render_jsonl, "application/jsonl"),
+}
@@ -0,0 +1,226 @@
+"""
+Incremental rollup of quiz usage into DailyUsage rows.
+
+A (day, quiz) row is always recomputed as a whole from the source tables, so
+processing the same source rows twice is harmless. A catch-up run only looks
+at submissions and answers whose `modified` is newer than the watermark of the
+previous run (minus an overlap, for transactions that committed late), and
+recomputes the days they touch for the quizzes they belong to.
+
+Deleted rows leave nothing behind to catch up on: after deleting data that is
+not from the last few days (or changing the questions of a quiz, which changes
+which submissions are complete), rebuild the rollup from scratch. The rows of
+deleted quizzes (whose quiz and owner are NULL) are kept, also by a rebuild.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from quizzes.models import (
+    DailyUsage,
+    QuizQuestion,
+    QuizSubmission,
+    QuizUserAnswer,
+    RollupWatermark,
+)
+from quizzes.reports import day_bounds
+
+WATERMARK = "daily_usage"
+OVERLAP = timedelta(minutes=5)
+
+COUNTS = [
+    "invites",
+    "acceptances",
+    "answers",
+    "answers_correct",
+    "submissions_completed",
+]
+
+
+def completed_submissions():
+    """
+    Submissions with an answer to every question of their quiz, annotated
+    with `completed`: when their last answer was given.
+    """
+    questions_count = (
+        QuizQuestion.objects.filter(quiz=OuterRef("quiz"))
+        .order_by()
+        .values("quiz")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    last_answer = (
+        QuizUserAnswer.objects.filter(submission=OuterRef("pk"))
+        .order_by("-created")
+        .values("created")[:1]
+    )
+    return (
+        QuizSubmission.objects.annotate(
+            questions_count=Subquery(questions_count),
+            completed=Subquery(last_answer),
+        )
+        .filter(answers_all_count__gt=0)
+        .filter(answers_all_count__gte=F("questions_count"))
+    )
+
+
+def aggregate_usage(submissions, user_answers, window):
+    """
+    Usage counts keyed by (day, owner id, quiz id), from the given sources and
+    within `window`, a pair of datetimes or None for all time.
+    """
+
+    def per_day(queryset, field, quiz_path, **aggregates):
+        if window is not None:
+            lower, upper = window
+            queryset = queryset.filter(
+                **{f"{field}__gte": lower, f"{field}__lt": upper}
+            )
+        else:
+            queryset = queryset.filter(**{f"{field}__isnull": False})
+        return (
+            queryset.annotate(
+                day=TruncDate(field),
+                bucket_quiz=F(quiz_path),
+                bucket_owner=F(f"{quiz_path}__owner"),
+            )
+            .values("day", "bucket_owner", "bucket_quiz")
+            .annotate(**aggregates)
+            .order_by()
+        )
+
+    usage = defaultdict(dict)
+    for rows in [
+        per_day(submissions, "created", "quiz", invites=Count("id")),
+        per_day(submissions, "accepted_on", "quiz", acceptances=Count("id")),
+        per_day(
+            user_answers,
+            "created",
+            "submission__quiz",
+            answers=Count("id"),
+            answers_correct=Count("id", filter=Q(answer__is_correct=True)),
+        ),
+        per_day(
+            completed_submissions().filter(id__in=submissions.values("id")),
+            "completed",
+            "quiz",
+            submissions_completed=Count("id"),
+        ),
+    ]:
+        for row in rows.iterator():
+            key = (row.pop("day"), row.pop("bucket_owner"), row.pop("bucket_quiz"))
+            usage[key].update(row)
+    return usage
+
+
+def rebuild_daily_usage(quizzes=None, first_day=None, last_day=None):
+    """
+    Recompute the DailyUsage rows of `quizzes` (a queryset of quiz ids, or None
+    for all quizzes) from `first_day` to `last_day` (both None for all days).
+    Returns the number of rows written.
+    """
+    submissions = QuizSubmission.objects.all()
+    user_answers = QuizUserAnswer.objects.all()
+    rollup = DailyUsage.objects.filter(quiz__isnull=False)
+    if quizzes is not None:
+        submissions = submissions.filter(quiz__in=quizzes)
+        user_answers = user_answers.filter(submission__quiz__in=quizzes)
+        rollup = rollup.filter(quiz__in=quizzes)
+    window = None
+    if first_day is not None:
+        window = day_bounds(first_day, last_day)
+        rollup = rollup.filter(day__range=(first_day, last_day))
+
+    usage = aggregate_usage(submissions, user_answers, window)
+    with transaction.atomic():
+        rollup.delete()
+        DailyUsage.objects.bulk_create(
+            (
+                DailyUsage(
+                    day=day,
+                    owner_id=owner_id,
+                    quiz_id=quiz_id,
+                    **{**dict.fromkeys(COUNTS, 0), **counts},
+                )
+                for (day, owner_id, quiz_id), counts in usage.items()
+            ),
+            batch_size=500,
+        )
+    return len(usage)
+
+
+def catch_up_daily_usage(rebuild=False):
+    """
+    Bring DailyUsage up to date with the submissions and answers modified
+    since the last run (or with everything, when `rebuild` is true or there was
+    no previous run). Returns the number of rows written.
+    """
+    started = timezone.now()
+    watermark = RollupWatermark.objects.filter(name=WATERMARK).first()
+    if rebuild or watermark is None:
+        written = rebuild_daily_usage()
+    else:
+        since = watermark.processed_until - OVERLAP
+        submissions = QuizSubmission.objects.filter(modified__gt=since)
+        user_answers = QuizUserAnswer.objects.filter(modified__gt=since)
+        earliest = [
+            *submissions.aggregate(Min("created"), Min("accepted_on")).values(),
+            *user_answers.aggregate(Min("created")).values(),
+        ]
+        earliest = [value for value in earliest if value is not None]
+        if not earliest:
+            written = 0
+        else:
+            quizzes = QuizSubmission.objects.filter(
+                Q(id__in=submissions.values("id"))
+                | Q(id__in=user_answers.values("submission"))
+            ).values("quiz")
+            written = rebuild_daily_usage(
+                quizzes, timezone.localdate(min(earliest)), timezone.localdate(started)
+            )
+    if watermark is None:
+        RollupWatermark.objects.create(name=WATERMARK, processed_until=started)
+    else:
+        watermark.processed_until = started
+        watermark.save(update_fields=["processed_until"])
+    return written
+
+
+def rolled_up_until():
+    """
+    The first day whose DailyUsage rows may still be incomplete (the day of
+    the last run, less the overlap), or None if there was no run yet.
+    """
+    processed_until = (
+        RollupWatermark.objects.filter(name=WATERMARK)
+        .values_list("processed_until", flat=True)
+        .first()
+    )
+    if processed_until is None:
+        return None
+    return timezone.localdate(processed_until - OVERLAP)
+
+
+def live_daily_usage(first_day, last_day):
+    """
+    Usage counts of all quizzes per day from `first_day` to `last_day`, read
+    from the source tables instead of DailyUsage. One dict with the COUNTS and
+    the `day` per day with any activity, in day order.
+    """
+    window = day_bounds(first_day, last_day)
+    # whatever was created, accepted or answered in the window was modified in
+    # it too (or later): narrow the sources down through the modified indexes
+    user_answers = QuizUserAnswer.objects.filter(modified__gte=window[0])
+    submissions = QuizSubmission.objects.filter(
+        Q(modified__gte=window[0]) | Q(id__in=user_answers.values("submission"))
+    )
+    usage = aggregate_usage(submissions, user_answers, window)
+    days = defaultdict(lambda: dict.fromkeys(COUNTS, 0))
+    for (day, _, _), counts in usage.items():
+        for name, count in counts.items():
+            days[day][name] += count
+    return [{"day": day, **days[day]} for day in sorted(days)]
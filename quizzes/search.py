@@ -0,0 +1,124 @@
+"""
+Full-text search over quizzes, backed by an SQLite FTS5 table.
+
+`quizzes_quiz_search` holds one row per quiz (its rowid is the quiz id) with
+the quiz name, the text of its questions and its owner's email. The rows are
+rewritten by the signals in quizzes.signals whenever one of those changes, and
+can be rebuilt from scratch with the `rebuild_search_index` command.
+"""
+import re
+
+from rest_framework.filters import SearchFilter
+
+from django.db import connection
+from django.db.models import FloatField, Func, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = "quizzes_quiz_search"
+
+# one row per quiz, in the column order of SEARCH_TABLE
+INDEX_SELECT = """
+    SELECT quiz.id, quiz.name, COALESCE(group_concat(question.text, ' '), ''),
+           COALESCE(auth_user.email, '')
+    FROM quizzes_quiz quiz
+    INNER JOIN quizzes_owner owner ON owner.id = quiz.owner_id
+    INNER JOIN auth_user ON auth_user.id = owner.user_id
+    LEFT OUTER JOIN quizzes_quizquestion question ON question.quiz_id = quiz.id
+"""
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def index_quizzes(quiz_ids):
+    """
+    Rewrite the search rows of `quiz_ids` from the current data. Quizzes that
+    no longer exist are dropped from the index.
+    """
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(quiz_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", quiz_ids
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, questions, owner_email) "
+            f"{INDEX_SELECT} WHERE quiz.id IN ({placeholders}) GROUP BY quiz.id",
+            quiz_ids,
+        )
+
+
+def rebuild_index():
+    """
+    Reindex every quiz. Returns the number of indexed quizzes.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, questions, owner_email) "
+            f"{INDEX_SELECT} GROUP BY quiz.id"
+        )
+        return cursor.rowcount
+
+
+def match_expression(terms):
+    """
+    Translate search terms into an FTS5 query, or None when there is nothing to
+    search for. Every term must match; a term such as `owner@quiz.com` matches
+    as a phrase, and its last token as a prefix (`geo` finds "Geography").
+    User input never reaches the FTS5 query syntax unquoted.
+    """
+    phrases = []
+    for term in terms:
+        tokens = TOKEN_RE.findall(term)
+        if tokens:
+            phrases.append(" + ".join(f'"{token}"' for token in tokens) + "*")
+    return " ".join(phrases) or None
+
+
+def matching_quiz_ids(expression):
+    return RawSQL(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+        [expression],
+    )
+
+
+class SearchRank(Func):
+    """
+    BM25 rank of a quiz against an FTS5 query; lower is more relevant. Only
+    meant for rows already restricted to the matches, see `matching_quiz_ids`.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, quiz_id, expression):
+        super().__init__(quiz_id, Value(expression))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        quiz_id, expression = self.get_source_expressions()
+        quiz_sql, quiz_params = compiler.compile(quiz_id)
+        match_sql, match_params = compiler.compile(expression)
+        sql = (
+            f"(SELECT rank FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH {match_sql} AND rowid = {quiz_sql})"
+        )
+        return sql, (*match_params, *quiz_params)
+
+
+class QuizSearchFilter(SearchFilter):
+    """
+    `?search=` through the quiz search index instead of `LIKE '%term%'` scans.
+    Results are restricted to the matching quizzes and annotated with their
+    `search_rank`, which KeysetPagination orders on. `search_quiz_field` on the
+    view is the path from its model to the quiz id.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        expression = match_expression(self.get_search_terms(request))
+        if expression is None:
+            return queryset
+        quiz_field = getattr(view, "search_quiz_field", "id")
+        return queryset.filter(
+            **{f"{quiz_field}__in": matching_quiz_ids(expression)}
+        ).annotate(search_rank=SearchRank(quiz_field, expression))
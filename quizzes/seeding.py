@@ -0,0 +1,336 @@
+"""
+Synthetic data at production scale, for load and scale testing.
+
+Rows get explicit ids (following the current maximum of each table) so that
+foreign keys are known without reading anything back, and are written with
+one `executemany` per batch and table: no model instances, no signals and no
+password hashing. Counters that signals would maintain are computed while
+generating, and the search index is rebuilt at the end.
+
+Everything is drawn from `random.Random(seed)`, so the same options produce
+the same data on the same (e.g. empty) database.
+"""
+import random
+import string
+from collections import Counter, defaultdict
+from datetime import timedelta
+from time import perf_counter
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from quizzes.models import (
+    Owner,
+    Participant,
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+    QuizUserAnswer,
+)
+from quizzes.search import rebuild_index
+
+UNUSABLE_PASSWORD = UNUSABLE_PASSWORD_PREFIX + "seeded"
+
+# in dependency order, for foreign key checks
+FIELDS = {
+    User: [
+        "id",
+        "password",
+        "is_superuser",
+        "username",
+        "first_name",
+        "last_name",
+        "email",
+        "is_staff",
+        "is_active",
+        "date_joined",
+    ],
+    Owner: ["id", "created", "modified", "user"],
+    Participant: ["id", "created", "modified", "user"],
+    Quiz: ["id", "created", "modified", "owner", "name"],
+    QuizQuestion: ["id", "created", "modified", "quiz", "text", "position"],
+    QuizQuestionAnswer: [
+        "id",
+        "created",
+        "modified",
+        "question",
+        "text",
+        "position",
+        "is_correct",
+    ],
+    QuizSubmission: [
+        "id",
+        "created",
+        "modified",
+        "participant",
+        "quiz",
+        "uuid",
+        "accepted_on",
+        "answers_all_count",
+        "answers_correct_count",
+    ],
+    QuizUserAnswer: ["id", "created", "modified", "submission", "answer"],
+}
+
+TOPICS = [
+    "Geography",
+    "History",
+    "Science",
+    "Music",
+    "Art",
+    "Sports",
+    "Literature",
+    "Cinema",
+    "Maths",
+    "Nature",
+]
+WORDS = (
+    "capital river mountain planet element composer painter team novel film "
+    "equation forest ocean city century king battle atom symphony museum goal "
+    "author director prime island desert language border treaty star"
+).split()
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis", "Barbara"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton", "Ritchie"]
+
+
+class BulkWriter:
+    """
+    Buffers rows per model and writes all of them, in dependency order, once
+    `batch_size` rows are pending at a point where every pending row's parents
+    are pending or written (see `flush_if_full`).
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.pending_count = 0
+        self.written = Counter()
+        self.last_ids = {}
+
+    def next_id(self, model):
+        if model not in self.last_ids:
+            self.last_ids[model] = model.objects.aggregate(Max("id"))["id__max"] or 0
+        self.last_ids[model] += 1
+        return self.last_ids[model]
+
+    def add(self, model, row):
+        self.pending[model].append(row)
+        self.pending_count += 1
+
+    def flush_if_full(self):
+        if self.pending_count >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, fields in FIELDS.items():
+                rows = self.pending.pop(model, None)
+                if not rows:
+                    continue
+                columns = [model._meta.get_field(field).column for field in fields]
+                cursor.executemany(
+                    f"INSERT INTO {model._meta.db_table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['%s'] * len(columns))})",
+                    rows,
+                )
+                self.written[model] += len(rows)
+        self.pending_count = 0
+
+
+class Seeder:
+    """
+    Generates owners with quizzes, a pool of participants, and the invites
+    (submissions) and answers of those participants. Ranges are `(low, high)`
+    inclusive, rates are between 0 and 1:
+
+    * `acceptance`: share of invites that are accepted;
+    * `completion`: share of accepted invites answering every question, the
+      others answer a random subset of them (possibly none);
+    * `correctness`: mean probability of a correct answer, each participant's
+      ability varying around it.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        owners=100,
+        participants=10000,
+        quizzes=(1, 10),
+        questions=(5, 20),
+        answers=(2, 5),
+        invites=(10, 200),
+        acceptance=0.8,
+        completion=0.7,
+        correctness=0.6,
+        days=90,
+        password=None,
+        batch_size=20000,
+    ):
+        self.random = random.Random(seed)
+        self.owners = owners
+        self.participants = participants
+        self.quizzes = quizzes
+        self.questions = questions
+        self.answers = answers
+        self.invites = invites
+        self.acceptance = acceptance
+        self.completion = completion
+        self.correctness = correctness
+        self.days = days
+        # hashed once: every seeded user shares it
+        self.password = make_password(password) if password else UNUSABLE_PASSWORD
+        self.writer = BulkWriter(batch_size)
+        # naive UTC: adapting aware datetimes costs more than generating rows
+        self.now = timezone.now().replace(tzinfo=None)
+        self.adapt_datetime = connection.ops.adapt_datetimefield_value
+        self.participant_ids = []
+
+    def timestamp(self, value):
+        return self.adapt_datetime(min(value, self.now))
+
+    def user(self, when, role):
+        user_id = self.writer.next_id(User)
+        email = f"{role}{user_id}@example.com"
+        self.writer.add(
+            User,
+            (
+                user_id,
+                self.password,
+                False,
+                email,
+                self.random.choice(FIRST_NAMES),
+                self.random.choice(LAST_NAMES),
+                email,
+                False,
+                True,
+                self.timestamp(when),
+            ),
+        )
+        return user_id
+
+    def sentence(self, count):
+        return " ".join(self.random.choice(WORDS) for _ in range(count))
+
+    def run(self):
+        """
+        Generate everything and return `{model name: rows written}`.
+        """
+        start = self.now - timedelta(days=self.days)
+        for _ in range(self.participants):
+            joined = start + self.random.random() * (self.now - start)
+            when = self.timestamp(joined)
+            participant_id = self.writer.next_id(Participant)
+            user_id = self.user(joined, "participant")
+            self.writer.add(Participant, (participant_id, when, when, user_id))
+            self.participant_ids.append(participant_id)
+            self.writer.flush_if_full()
+
+        for _ in range(self.owners):
+            when = self.timestamp(start)
+            owner_id = self.writer.next_id(Owner)
+            self.writer.add(Owner, (owner_id, when, when, self.user(start, "owner")))
+            self.writer.flush_if_full()
+            for _ in range(self.random.randint(*self.quizzes)):
+                created = start + self.random.random() * (self.now - start)
+                self.quiz(owner_id, created)
+
+        self.writer.flush()
+        rebuild_index()
+        return {model.__name__: self.writer.written[model] for model in FIELDS}
+
+    def quiz(self, owner_id, created):
+        when = self.timestamp(created)
+        quiz_id = self.writer.next_id(Quiz)
+        topic = self.random.choice(TOPICS)
+        name = f"{topic} {''.join(self.random.choices(string.ascii_uppercase, k=3))}"
+        self.writer.add(Quiz, (quiz_id, when, when, owner_id, name))
+
+        questions = []  # (correct answer id, [wrong answer ids])
+        for position in range(self.random.randint(*self.questions)):
+            question_id = self.writer.next_id(QuizQuestion)
+            text = f"{topic}: {self.sentence(4)}?"
+            self.writer.add(
+                QuizQuestion, (question_id, when, when, quiz_id, text, position)
+            )
+            answer_ids = []
+            count = self.random.randint(*self.answers)
+            correct = self.random.randrange(count)
+            for answer_position in range(count):
+                answer_id = self.writer.next_id(QuizQuestionAnswer)
+                self.writer.add(
+                    QuizQuestionAnswer,
+                    (
+                        answer_id,
+                        when,
+                        when,
+                        question_id,
+                        self.sentence(2),
+                        answer_position,
+                        answer_position == correct,
+                    ),
+                )
+                answer_ids.append(answer_id)
+            questions.append((answer_ids.pop(correct), answer_ids))
+
+        invites = min(self.random.randint(*self.invites), len(self.participant_ids))
+        for participant_id in self.random.sample(self.participant_ids, invites):
+            self.submission(quiz_id, participant_id, created, questions)
+
+    def submission(self, quiz_id, participant_id, quiz_created, questions):
+        created = quiz_created + timedelta(days=self.random.random())
+        submission_id = self.writer.next_id(QuizSubmission)
+        accepted_on = modified = None
+        answered = correct = 0
+        if self.random.random() < self.acceptance:
+            accepted_on = modified = created + timedelta(hours=self.random.random())
+            if self.random.random() < self.completion:
+                to_answer = questions
+            else:
+                to_answer = self.random.sample(
+                    questions, self.random.randrange(len(questions) + 1)
+                )
+            ability = min(max(self.random.gauss(self.correctness, 0.15), 0), 1)
+            for right, wrong in to_answer:
+                modified += timedelta(seconds=self.random.randint(5, 120))
+                is_correct = not wrong or self.random.random() < ability
+                when = self.timestamp(modified)
+                self.writer.add(
+                    QuizUserAnswer,
+                    (
+                        self.writer.next_id(QuizUserAnswer),
+                        when,
+                        when,
+                        submission_id,
+                        right if is_correct else self.random.choice(wrong),
+                    ),
+                )
+                answered += 1
+                correct += is_correct
+        self.writer.add(
+            QuizSubmission,
+            (
+                submission_id,
+                self.timestamp(created),
+                self.timestamp(modified or created),
+                participant_id,
+                quiz_id,
+                "%032x" % self.random.getrandbits(128),
+                accepted_on and self.timestamp(accepted_on),
+                answered,
+                correct,
+            ),
+        )
+        self.writer.flush_if_full()
+
+
+def seed(**options):
+    """
+    Run a Seeder with `options` and return `(rows per model, seconds)`.
+    """
+    start = perf_counter()
+    written = Seeder(**options).run()
+    return written, perf_counter() - start
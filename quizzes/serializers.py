@@ -1,11 +1,28 @@
 from rest_framework import serializers
 
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Manager
 
 from quizzes import models
+from quizzes.cache import SCORES, bump_version, get_quiz_questions
+from quizzes.fieldsets import ALL_FIELDS
+from quizzes.metrics import ANSWERS
+from quizzes.timing import TimedSerializerMixin
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    def to_representation(self, data):
+        quizzes = list(data.all() if isinstance(data, Manager) else data)
+        if "questions" in self.child.fields:
+            # fetch the question trees of the whole page from the cache at once
+            self.child.quiz_questions = get_quiz_questions(
+                quizzes, self.context["request"].user, self.child.render_questions
+            )
+        return super().to_representation(quizzes)
+
+
+class QuizSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     submissions = serializers.SerializerMethodField()  # aka invites
     questions = serializers.SerializerMethodField()
 
@@ -13,6 +30,7 @@ class QuizSerializer(serializers.ModelSerializer):
         model = models.Quiz
         fields = "__all__"
         read_only_fields = ["owner"]
+        list_serializer_class = QuizListSerializer
 
     def create(self, validated_data):
         validated_data["owner_id"] = self.context["request"].user.owner.id
@@ -20,11 +38,17 @@ class QuizSerializer(serializers.ModelSerializer):
 
     def get_field_names(self, declared_fields, info):
         request = self.context["request"]
-        field_names = super().get_field_names(declared_fields, info)
+        fieldset = self.context.get("fieldset", ALL_FIELDS)
+        field_names = [
+            name
+            for name in super().get_field_names(declared_fields, info)
+            if fieldset.includes(name)
+        ]
         if request.user.is_superuser or hasattr(request.user, "owner"):
             return field_names
         # non superuser/owner
-        field_names.remove("submissions")
+        if "submissions" in field_names:
+            field_names.remove("submissions")
         return field_names
 
     def get_submissions(self, obj):
@@ -34,13 +58,21 @@ class QuizSerializer(serializers.ModelSerializer):
         ]
 
     def get_questions(self, obj):
+        quiz_questions = getattr(self, "quiz_questions", {})
+        if obj.id not in quiz_questions:
+            quiz_questions = get_quiz_questions(
+                [obj], self.context["request"].user, self.render_questions
+            )
+        return quiz_questions[obj.id]
+
+    def render_questions(self, obj):
         return [
             QuizQuestionSerializer(question, context=self.context).data
             for question in obj.quizquestion_set.all()
         ]
 
 
-class QuizQuestionSerializer(serializers.ModelSerializer):
+class QuizQuestionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     answers = serializers.SerializerMethodField()
 
     class Meta:
@@ -59,7 +91,7 @@ class QuizQuestionSerializer(serializers.ModelSerializer):
         ]
 
 
-class QuizQuestionAnswerSerializer(serializers.ModelSerializer):
+class QuizQuestionAnswerSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     def get_field_names(self, declared_fields, info):
         field_names = super().get_field_names(declared_fields, info)
         request = self.context["request"]
@@ -78,7 +110,7 @@ class QuizQuestionAnswerSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     first_name = serializers.CharField()
 
     class Meta:
@@ -86,7 +118,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "first_name", "last_name"]
 
 
-class ParticipantSerializer(serializers.ModelSerializer):
+class ParticipantSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
 
     class Meta:
@@ -94,7 +126,7 @@ class ParticipantSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class QuizUserAnswerSerializer(serializers.ModelSerializer):
+class QuizUserAnswerSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.QuizUserAnswer
         fields = "__all__"
@@ -108,14 +140,14 @@ class QuizUserAnswerSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class QuizSubmissionSerializer(serializers.ModelSerializer):
+class QuizSubmissionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     score = serializers.SerializerMethodField()
     progress = serializers.SerializerMethodField()
     answers = serializers.SerializerMethodField()
 
     class Meta:
         model = models.QuizSubmission
-        fields = "__all__"
+        exclude = ["answers_all_count", "answers_correct_count"]  # see score
 
     def get_answers(self, obj):
         return [
@@ -127,13 +159,84 @@ class QuizSubmissionSerializer(serializers.ModelSerializer):
         return f"{obj.answers_correct_count} / {obj.answers_all_count}"
 
     def get_progress(self, obj):
-        return f"{obj.answers_all_count} / {obj.quiz.quizquestion_set.count()}"
+        questions_count = getattr(obj.quiz, "questions_count", None)
+        if questions_count is None:
+            questions_count = obj.quiz.quizquestion_set.count()
+        return f"{obj.answers_all_count} / {questions_count}"
+
+
+class QuizAnswerSheetSerializer(TimedSerializerMixin, serializers.Serializer):
+    """
+    A participant's answers to (any subset of) a quiz's questions, written in
+    one go. Expects `{"answers": [<QuizQuestionAnswer id>, ...]}` and the target
+    `submission` in the context.
+    """
+
+    answers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+    def validate_answers(self, value):
+        submission = self.context["submission"]
+        question_ids = dict(
+            models.QuizQuestionAnswer.objects.filter(
+                id__in=value, question__quiz_id=submission.quiz_id
+            ).values_list("id", "question_id")
+        )
+        unknown = [answer_id for answer_id in value if answer_id not in question_ids]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Answers {unknown} do not belong to this quiz."
+            )
+        if len(set(question_ids.values())) < len(value):
+            raise serializers.ValidationError(
+                "At most one answer per question is allowed."
+            )
+        self.question_ids = question_ids
+        return value
+
+    def save(self):
+        """
+        Replace the submission's answers to the questions in the sheet: one
+        DELETE for changed answers, one SELECT of the unchanged ones, one
+        INSERT for new ones and one UPDATE for the score counters.
+        """
+        submission = self.context["submission"]
+        answer_ids = self.validated_data["answers"]
+        with transaction.atomic():
+            models.QuizUserAnswer.objects.filter(
+                submission=submission,
+                answer__question_id__in=self.question_ids.values(),
+            ).exclude(answer_id__in=answer_ids).delete()
+            unchanged = set(
+                models.QuizUserAnswer.objects.filter(
+                    submission=submission, answer_id__in=answer_ids
+                ).values_list("answer_id", flat=True)
+            )
+            models.QuizUserAnswer.objects.bulk_create(
+                [
+                    models.QuizUserAnswer(submission=submission, answer_id=answer_id)
+                    for answer_id in answer_ids
+                    if answer_id not in unchanged
+                ],
+                ignore_conflicts=True,  # answered concurrently
+            )
+            models.QuizSubmission.objects.filter(
+                id=submission.id
+            ).refresh_answer_counts()
+            bump_version(SCORES, submission.quiz_id)
+            recorded = len(answer_ids) - len(unchanged)
+            transaction.on_commit(lambda: ANSWERS.inc(recorded))
+        submission.refresh_from_db(
+            fields=["answers_all_count", "answers_correct_count"]
+        )
+        return submission
 
 
 # serializers used only for vaildation:
 
 
-class QuizInviteSerializer(serializers.Serializer):
+class QuizInviteSerializer(TimedSerializerMixin, serializers.Serializer):
     first_name = serializers.CharField(max_length=64)
     last_name = serializers.CharField(max_length=64)
     email = serializers.EmailField()
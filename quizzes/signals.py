@@ -0,0 +1,141 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, Exists, F, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from quizzes.cache import QUESTIONS, SCORES, bump_version
+from quizzes.metrics import ANSWERS
+from quizzes.models import (
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+    QuizUserAnswer,
+)
+from quizzes.search import index_quizzes
+
+# QuizSubmission.answers_all_count / answers_correct_count are kept in step with
+# QuizUserAnswer rows here. Every update is a single UPDATE statement using F()
+# expressions or subqueries, computed from the rows as they are when it runs,
+# so concurrent answers never lose an increment.
+
+
+def submission_quiz_id(user_answer):
+    # the submission is usually loaded already, otherwise only read its quiz id
+    if QuizUserAnswer.submission.is_cached(user_answer):
+        return user_answer.submission.quiz_id
+    return (
+        QuizSubmission.objects.filter(pk=user_answer.submission_id)
+        .values_list("quiz_id", flat=True)
+        .get()
+    )
+
+
+@receiver(post_save, sender=QuizUserAnswer)
+def count_saved_user_answer(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    bump_version(SCORES, submission_quiz_id(instance))
+    submissions = QuizSubmission.objects.filter(pk=instance.submission_id)
+    if not created:
+        # the chosen answer may have changed
+        submissions.refresh_answer_counts()
+        return
+    transaction.on_commit(ANSWERS.inc)  # not counted if rolled back
+    is_correct = QuizQuestionAnswer.objects.filter(
+        pk=instance.answer_id, is_correct=True
+    )
+    submissions.update(
+        answers_all_count=F("answers_all_count") + 1,
+        answers_correct_count=(
+            F("answers_correct_count")
+            + Case(When(Exists(is_correct), then=1), default=0)
+        ),
+    )
+
+
+@receiver(post_delete, sender=QuizUserAnswer)
+def count_deleted_user_answer(sender, instance, **kwargs):
+    bump_version(SCORES, submission_quiz_id(instance))
+    submissions = QuizSubmission.objects.filter(pk=instance.submission_id)
+    submissions.refresh_answer_counts()
+    # a deletion leaves no `modified` behind: touch the parent
+    submissions.update(modified=timezone.now())
+
+
+@receiver(post_save, sender=QuizQuestionAnswer)
+def recount_answer_key_change(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw or created:
+        return
+    if update_fields is not None and "is_correct" not in update_fields:
+        return
+    # the key may have changed: recount rather than apply a delta, which would
+    # be counted twice by concurrent saves of the same change
+    bump_version(SCORES, instance.question.quiz_id)
+    QuizSubmission.objects.filter(answer_set__answer=instance).refresh_answer_counts()
+
+
+# Rendered question/answer trees are cached per quiz version, see quizzes.cache.
+# So are leaderboards, whose version is bumped above whenever scores change.
+
+
+@receiver(post_save, sender=Quiz)
+def start_quiz_questions_version(sender, instance, created, **kwargs):
+    if created:  # a reused quiz id must never inherit a stale tree
+        bump_version(QUESTIONS, instance.id)
+
+
+@receiver(post_delete, sender=QuizSubmission)
+def invalidate_scores(sender, instance, **kwargs):
+    bump_version(SCORES, instance.quiz_id)
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def invalidate_question(sender, instance, **kwargs):
+    bump_version(QUESTIONS, instance.quiz_id)
+    bump_version(SCORES, instance.quiz_id)  # item analysis
+    if kwargs["signal"] is post_delete:
+        Quiz.objects.filter(pk=instance.quiz_id).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=QuizQuestionAnswer)
+@receiver(post_delete, sender=QuizQuestionAnswer)
+def invalidate_question_answer(sender, instance, **kwargs):
+    quiz_id = instance.question.quiz_id
+    bump_version(QUESTIONS, quiz_id)
+    if kwargs["signal"] is post_delete:
+        Quiz.objects.filter(pk=quiz_id).update(modified=timezone.now())
+
+
+# The full-text search index holds the quiz name, question texts and owner
+# email of each quiz, see quizzes.search.
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def index_quiz(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_quizzes([instance.id])
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def index_question(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_quizzes([instance.quiz_id])
+
+
+@receiver(post_save, sender=User)
+def index_owner_email(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw or created or (update_fields is not None and "email" not in update_fields):
+        return
+    index_quizzes(
+        Quiz.objects.filter(owner__user=instance).values_list("id", flat=True)
+    )
@@ -0,0 +1,108 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django.core.cache import cache
+
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class AnswerDistributionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner)
+        self.question = QuizQuestionFactory(quiz=self.quiz, text="CH capital city?")
+        self.bern = QuizQuestionAnswerFactory(
+            question=self.question, text="Bern", is_correct=True
+        )
+        self.zurich = QuizQuestionAnswerFactory(
+            question=self.question, text="Zurich", is_correct=False
+        )
+        self.geneva = QuizQuestionAnswerFactory(
+            question=self.question, text="Geneva", is_correct=False
+        )
+        for answer in [self.bern, self.zurich, self.zurich, self.bern]:
+            QuizUserAnswerFactory(
+                submission=QuizSubmissionFactory(quiz=self.quiz), answer=answer
+            )
+        self.url = f"/api/quizzes/{self.quiz.id}/answers/distribution/"
+
+    def test_distribution(self):
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "quiz": self.quiz.id,
+                "questions": [
+                    {
+                        "id": self.question.id,
+                        "text": "CH capital city?",
+                        "answered": 4,
+                        "answers": [
+                            {
+                                "id": self.bern.id,
+                                "text": "Bern",
+                                "is_correct": True,
+                                "count": 2,
+                                "share": 0.5,
+                            },
+                            {
+                                "id": self.zurich.id,
+                                "text": "Zurich",
+                                "is_correct": False,
+                                "count": 2,
+                                "share": 0.5,
+                            },
+                            {
+                                "id": self.geneva.id,
+                                "text": "Geneva",
+                                "is_correct": False,
+                                "count": 0,
+                                "share": 0.0,
+                            },
+                        ],
+                    }
+                ],
+            },
+        )
+
+    def test_question_without_answers(self):
+        empty = QuizQuestionFactory(quiz=self.quiz, text="Open question?")
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [question["id"] for question in response.data["questions"]],
+            [self.question.id, empty.id],
+        )
+        self.assertEqual(
+            response.data["questions"][1],
+            {"id": empty.id, "text": "Open question?", "answered": 0, "answers": []},
+        )
+
+    def test_cached_briefly(self):
+        self.client.force_login(user=self.owner.user)
+        self.client.get(self.url)
+        # session, user, owner, participant and quiz: no distribution query
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+        # editing the quiz invalidates it straight away
+        other = QuizQuestionFactory(quiz=self.quiz, text="FR capital city?")
+        QuizQuestionAnswerFactory(question=other, text="Paris", is_correct=True)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["questions"]), 2)
+        self.assertIsNone(response.data["questions"][1]["answers"][0]["share"])
+
+    def test_other_owners_quiz(self):
+        self.client.force_login(user=OwnerFactory().user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from quizzes.models import QuizSubmission
+from quizzes.tests.factories import (
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class ReconcileAnswerCountsTest(TestCase):
+    def test_reconcile(self):
+        quiz = QuizFactory()
+        question = QuizQuestionFactory(quiz=quiz, text="1 + 1?")
+        answer = QuizQuestionAnswerFactory(question=question, text="2", is_correct=True)
+        submission = QuizSubmissionFactory(quiz=quiz)
+        QuizUserAnswerFactory(submission=submission, answer=answer)
+        QuizSubmissionFactory(quiz=quiz)  # no drift
+        QuizSubmission.objects.filter(id=submission.id).update(answers_all_count=0)
+
+        out = StringIO()
+        call_command("reconcile_answer_counts", "--dry-run", stdout=out)
+        self.assertEqual(out.getvalue(), "Found 1 drifted submission(s).\n")
+        submission.refresh_from_db()
+        self.assertEqual(submission.answers_all_count, 0)
+
+        out = StringIO()
+        call_command("reconcile_answer_counts", stdout=out)
+        self.assertEqual(out.getvalue(), "Reconciled 1 drifted submission(s).\n")
+        submission.refresh_from_db()
+        self.assertEqual(submission.answers_all_count, 1)
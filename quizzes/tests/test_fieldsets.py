@@ -0,0 +1,109 @@
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from django.core.cache import cache
+
+from quizzes.cache import OWNER
+from quizzes.fieldsets import QUIZ_FIELDS, quiz_fieldset
+from quizzes.models import Quiz
+from quizzes.rendering import QUIZ_PLANS
+from quizzes.serializers import QuizSerializer
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+SCALARS = ["id", "created", "modified", "name", "owner"]
+
+
+class QuizFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner)
+        question = QuizQuestionFactory(quiz=self.quiz, text="CH capital city?")
+        answer = QuizQuestionAnswerFactory(
+            question=question, text="Bern", is_correct=True
+        )
+        QuizQuestionFactory(quiz=self.quiz, text="FR capital city?")
+        self.submission = QuizSubmissionFactory(quiz=self.quiz)
+        QuizUserAnswerFactory(submission=self.submission, answer=answer)
+        self.list_url = "/api/quizzes/"
+        self.detail_url = f"/api/quizzes/{self.quiz.id}/"
+
+    def get(self, url, user=None, **params):
+        self.client.force_login(user=user or self.owner.user)
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_fields_match_serializer(self):
+        self.assertEqual([key for key, _, _ in QUIZ_PLANS[OWNER]], list(QUIZ_FIELDS))
+
+    def test_list_collapsed_by_default(self):
+        self.client.force_login(user=self.owner.user)
+        # session, user, owner and the page of quizzes
+        with self.assertNumQueries(4):
+            quiz = self.client.get(self.list_url).data["results"][0]
+        self.assertEqual(list(quiz), SCALARS)
+
+        quiz = self.get(self.list_url, expand="questions")["results"][0]
+        self.assertEqual(list(quiz), ["id", "questions", *SCALARS[1:]])
+        self.assertEqual(len(quiz["questions"]), 2)
+
+    def test_detail_expanded_by_default(self):
+        self.assertEqual(list(self.get(self.detail_url)), list(QUIZ_FIELDS))
+        quiz = self.get(self.detail_url, expand="")
+        self.assertEqual(list(quiz), SCALARS)
+
+    def test_sparse_fields(self):
+        for url in [self.list_url, self.detail_url]:
+            data = self.get(url, fields="name,id")
+            quiz = data["results"][0] if url == self.list_url else data
+            self.assertEqual(quiz, {"id": self.quiz.id, "name": self.quiz.name})
+
+            # naming a relation expands it
+            data = self.get(url, fields="name,submissions")
+            quiz = data["results"][0] if url == self.list_url else data
+            self.assertEqual(list(quiz), ["submissions", "name"])
+            self.assertEqual(quiz["submissions"][0]["progress"], "1 / 2")
+
+    def test_submissions_stay_hidden(self):
+        participant = self.submission.participant.user
+        for url in [self.list_url, self.detail_url]:
+            data = self.get(url, participant, expand="submissions,questions")
+            quiz = data["results"][0] if url == self.list_url else data
+            self.assertNotIn("submissions", quiz)
+            self.assertIn("questions", quiz)
+
+    def test_unknown_names(self):
+        self.client.force_login(user=self.owner.user)
+        for url in [self.list_url, self.detail_url]:
+            response = self.client.get(url, {"fields": "id,secret"})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("secret", response.data["fields"][0])
+            response = self.client.get(url, {"expand": "owner"})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail_same_bytes_as_serializer(self):
+        self.client.force_login(user=self.owner.user)
+        factory = APIRequestFactory()
+        for params in [{"expand": "submissions"}, {"fields": "id,questions"}]:
+            request = Request(factory.get("/", params))
+            request.user = self.owner.user
+            context = {
+                "request": request,
+                "fieldset": quiz_fieldset(request, expand_by_default=True),
+            }
+            quiz = Quiz.objects.with_tree().get(id=self.quiz.id)
+            expected = JSONRenderer().render(QuizSerializer(quiz, context=context).data)
+            response = self.client.get(
+                self.detail_url, params, HTTP_ACCEPT="application/json"
+            )
+            self.assertEqual(response.content, expected)
@@ -0,0 +1,165 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from quizzes.items import correctness_matrix, item_statistics
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class ItemStatisticsTest(SimpleTestCase):
+    def test_matches_naive_computation(self):
+        matrix = (np.random.default_rng(1).random((50, 6)) < 0.6).astype(float)
+        difficulty, discrimination, alpha = item_statistics(matrix)
+
+        totals = matrix.sum(axis=1)
+        for column in range(matrix.shape[1]):
+            rest = totals - matrix[:, column]
+            expected = np.corrcoef(matrix[:, column], rest)[0, 1]
+            self.assertAlmostEqual(discrimination[column], expected)
+        np.testing.assert_allclose(difficulty, matrix.mean(axis=0))
+        items = matrix.shape[1]
+        expected_alpha = (
+            items / (items - 1) * (1 - matrix.var(axis=0).sum() / totals.var())
+        )
+        self.assertAlmostEqual(alpha, expected_alpha)
+
+    def test_undefined_discrimination(self):
+        matrix = np.array([[1.0, 1.0], [1.0, 0.0], [1.0, 0.0]])
+        _, discrimination, _ = item_statistics(matrix)
+        self.assertTrue(np.isnan(discrimination[0]))  # everybody got it right
+
+    def test_single_question(self):
+        difficulty, _, alpha = item_statistics(np.array([[1.0], [0.0], [1.0]]))
+        self.assertAlmostEqual(difficulty[0], 2 / 3)
+        self.assertTrue(np.isnan(alpha))
+
+    def test_correctness_matrix(self):
+        matrix = correctness_matrix(
+            np.array([12, 10, 12]),
+            np.array([7, 3, 3]),
+            np.array([True, True, False]),
+            np.array([7, 3]),
+        )
+        np.testing.assert_array_equal(matrix, [[0.0, 1.0], [1.0, 0.0]])
+
+    def test_correctness_matrix_other_questions(self):
+        # 2 is below the lowest question id, 9 above the highest, 5 in between
+        matrix = correctness_matrix(
+            np.array([10, 10, 11, 12, 13]),
+            np.array([3, 2, 9, 5, 7]),
+            np.array([True, True, True, True, False]),
+            np.array([7, 3]),
+        )
+        np.testing.assert_array_equal(matrix, [[0.0, 1.0], [0.0, 0.0]])
+
+
+class ItemAnalysisTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner)
+        self.questions, answers = [], []
+        for position in range(3):
+            question = QuizQuestionFactory(quiz=self.quiz, position=position)
+            answers.append(
+                (
+                    QuizQuestionAnswerFactory(
+                        question=question, position=0, is_correct=True
+                    ),
+                    QuizQuestionAnswerFactory(
+                        question=question, position=1, is_correct=False
+                    ),
+                )
+            )
+            self.questions.append(question)
+        for scores in [(1, 1, 1), (1, 1, 0), (1, 0, 0), (0, 0, None)]:
+            submission = QuizSubmissionFactory(quiz=self.quiz)
+            for (right, wrong), score in zip(answers, scores):
+                if score is not None:
+                    QuizUserAnswerFactory(
+                        submission=submission, answer=right if score else wrong
+                    )
+        self.url = f"/api/quizzes/{self.quiz.id}/items/"
+
+    def test_owner(self):
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["submissions"], 4)
+        self.assertEqual(
+            [item["question"] for item in response.data["items"]],
+            [question.id for question in self.questions],
+        )
+        self.assertEqual(
+            [item["difficulty"] for item in response.data["items"]],
+            [0.75, 0.5, 0.25],
+        )
+        self.assertEqual(response.data["alpha"], 0.75)
+
+    def test_other_owners_quiz(self):
+        self.client.force_login(user=OwnerFactory().user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_answer_from_another_quiz(self):
+        # the single answer endpoint accepts an answer to any quiz's question
+        other = QuizQuestionAnswerFactory(
+            question=QuizQuestionFactory(quiz=QuizFactory()), is_correct=True
+        )
+        QuizUserAnswerFactory(
+            submission=QuizSubmissionFactory(quiz=self.quiz), answer=other
+        )
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["submissions"], 4)
+        self.assertEqual(
+            [item["difficulty"] for item in response.data["items"]],
+            [0.75, 0.5, 0.25],
+        )
+
+    def test_single_question(self):
+        question = QuizQuestionFactory(quiz=QuizFactory(owner=self.owner))
+        answer = QuizQuestionAnswerFactory(question=question, is_correct=True)
+        QuizUserAnswerFactory(
+            submission=QuizSubmissionFactory(quiz=question.quiz), answer=answer
+        )
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get(f"/api/quizzes/{question.quiz_id}/items/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["submissions"], 1)
+        self.assertIsNone(response.data["alpha"])
+        self.assertEqual(response.data["items"][0]["difficulty"], 1.0)
+
+    def test_command(self):
+        empty = QuizFactory()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "items.jsonl"
+            call_command(
+                "analyze_items",
+                self.quiz.id,
+                empty.id,
+                output=str(path),
+                stderr=io.StringIO(),
+            )
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual([line["quiz"] for line in lines], [self.quiz.id, empty.id])
+        self.assertEqual(
+            lines[1], {"quiz": empty.id, "submissions": 0, "alpha": None, "items": []}
+        )
@@ -0,0 +1,128 @@
+import statistics
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from quizzes.leaderboard import percentile, rank_of, summarize
+from quizzes.models import QuizSubmission
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class HistogramTest(SimpleTestCase):
+    histogram = [(5, 1), (3, 3), (2, 1), (0, 2)]  # best first
+    scores = [5, 3, 3, 3, 2, 0, 0]
+
+    def test_stats_match_statistics_module(self):
+        stats = summarize(self.histogram)
+        self.assertEqual(stats["participants"], 7)
+        self.assertEqual(stats["mean"], round(statistics.mean(self.scores), 2))
+        self.assertEqual(stats["median"], statistics.median(self.scores))
+        quartiles = statistics.quantiles(self.scores, n=4, method="inclusive")
+        self.assertEqual(stats["p25"], quartiles[0])
+        self.assertEqual(stats["p75"], quartiles[2])
+        self.assertEqual(percentile(self.histogram, 0), min(self.scores))
+        self.assertEqual(percentile(self.histogram, 1), max(self.scores))
+
+    def test_ranks(self):
+        self.assertEqual(
+            [rank_of(self.histogram, score) for score in [5, 3, 2, 0]], [1, 2, 5, 6]
+        )
+        self.assertEqual(rank_of(self.histogram, 4), 2)
+
+    def test_empty(self):
+        self.assertEqual(
+            summarize([]),
+            {
+                "participants": 0,
+                "mean": None,
+                "median": None,
+                "p25": None,
+                "p75": None,
+                "p90": None,
+            },
+        )
+
+
+class LeaderboardViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner)
+        question = QuizQuestionFactory(quiz=self.quiz, text="1 + 1?")
+        self.right = QuizQuestionAnswerFactory(
+            question=question, text="2", is_correct=True
+        )
+        self.submissions = []
+        for all_count, correct_count in [(2, 1), (2, 2), (2, 1), (0, 0)]:
+            submission = QuizSubmissionFactory(quiz=self.quiz)
+            QuizSubmission.objects.filter(id=submission.id).update(
+                answers_all_count=all_count, answers_correct_count=correct_count
+            )
+            self.submissions.append(submission)
+        self.url = f"/api/quizzes/{self.quiz.id}/leaderboard/"
+
+    def test_owner(self):
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get(self.url + "?top=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["stats"]["participants"], 3)
+        self.assertEqual(response.data["stats"]["median"], 1)
+        self.assertEqual(
+            [(entry["rank"], entry["participant"]) for entry in response.data["top"]],
+            [
+                (1, self.submissions[1].participant_id),
+                (2, self.submissions[0].participant_id),
+            ],
+        )
+        self.assertIsNone(response.data["me"])
+
+        participant_id = self.submissions[2].participant_id
+        response = self.client.get(self.url + f"?participant={participant_id}")
+        self.assertEqual(
+            response.data["me"], {"participant": participant_id, "rank": 2, "score": 1}
+        )
+        self.assertEqual(len(response.data["top"]), 3)
+
+        response = self.client.get(self.url + "?top=none")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_participant(self):
+        participant = self.submissions[0].participant
+        self.client.force_login(user=participant.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("top", response.data)
+        self.assertEqual(
+            response.data["me"], {"participant": participant.id, "rank": 2, "score": 1}
+        )
+
+        response = self.client.get(f"/api/quizzes/{QuizFactory().id}/leaderboard/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_until_next_answer(self):
+        participant = self.submissions[3].participant
+        self.client.force_login(user=participant.user)
+        response = self.client.get(self.url)
+        self.assertIsNone(response.data["me"])  # not answered yet
+
+        # session, user, owner, participant, quiz visibility and own score
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["stats"]["participants"], 3)
+
+        QuizUserAnswerFactory(submission=self.submissions[3], answer=self.right)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["stats"]["participants"], 4)
+        self.assertEqual(
+            response.data["me"], {"participant": participant.id, "rank": 2, "score": 1}
+        )
@@ -53,3 +53,19 @@ class QuizSubmissionManagerTest(TestCase):
         quiz1sub3 = QuizSubmission.objects.get(id=quiz1sub3.id)  # from queryset
         self.assertEqual(quiz1sub3.answers_all_count, 3)
         self.assertEqual(quiz1sub3.answers_correct_count, 3)
+
+    def test_refresh_answer_counts(self):
+        quiz = QuizFactory()
+        question = QuizQuestionFactory(quiz=quiz, text="1 + 1?")
+        right = QuizQuestionAnswerFactory(question=question, text="2", is_correct=True)
+        submission = QuizSubmissionFactory(quiz=quiz)
+        QuizUserAnswerFactory(submission=submission, answer=right)
+        QuizSubmission.objects.update(answers_all_count=5, answers_correct_count=0)
+        self.assertEqual(QuizSubmission.objects.drifted().count(), 1)
+
+        QuizSubmission.objects.refresh_answer_counts()
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.answers_all_count, 1)
+        self.assertEqual(submission.answers_correct_count, 1)
+        self.assertEqual(QuizSubmission.objects.drifted().count(), 0)
@@ -0,0 +1,170 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.test import SimpleTestCase, override_settings
+
+from quizzes.models import QuizUserAnswer
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(APITestCase):
+    def test_requests_and_business_counters(self):
+        owner = OwnerFactory()
+        quiz = QuizFactory(owner=owner)
+        answer = QuizQuestionAnswerFactory(
+            question=QuizQuestionFactory(quiz=quiz), is_correct=True
+        )
+        submission = QuizSubmissionFactory(quiz=quiz)
+        labels = {"route": "quiz-list-create", "method": "GET"}
+        requests = sample("quizzes_request_duration_seconds_count", **labels)
+        queries = sample("quizzes_request_queries_sum", **labels)
+        not_found = sample(
+            "quizzes_request_errors_total",
+            route="quiz-detail",
+            method="GET",
+            status="404",
+        )
+        invites = sample("quizzes_invites_total")
+        answers = sample("quizzes_answers_total")
+
+        self.client.force_login(user=owner.user)
+        self.client.get("/api/quizzes/")
+        self.client.get("/api/quizzes/0/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/quizzes/{quiz.id}/invite/bulk/",
+                [{"first_name": "Ada", "last_name": "L", "email": "ada@example.com"}],
+                format="json",
+            )
+        self.client.force_login(user=submission.participant.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/participant/{submission.participant_id}/submissions/{quiz.id}"
+                "/answers/batch/",
+                {"answers": [answer.id]},
+                format="json",
+            )
+
+        self.assertEqual(
+            sample("quizzes_request_duration_seconds_count", **labels), requests + 1
+        )
+        self.assertGreater(sample("quizzes_request_queries_sum", **labels), queries)
+        self.assertEqual(
+            sample(
+                "quizzes_request_errors_total",
+                route="quiz-detail",
+                method="GET",
+                status="404",
+            ),
+            not_found + 1,
+        )
+        self.assertEqual(sample("quizzes_invites_total"), invites + 1)
+        self.assertEqual(sample("quizzes_answers_total"), answers + 1)
+
+        # posting the same sheet again records no answer
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/participant/{submission.participant_id}/submissions/{quiz.id}"
+                "/answers/batch/",
+                {"answers": [answer.id]},
+                format="json",
+            )
+        self.assertEqual(sample("quizzes_answers_total"), answers + 1)
+
+        response = self.client.get("/metrics")
+        self.assertIn(b"quizzes_request_duration_seconds_bucket", response.content)
+
+    def test_answers_counted_on_commit(self):
+        quiz = QuizFactory()
+        answer = QuizQuestionAnswerFactory(
+            question=QuizQuestionFactory(quiz=quiz), is_correct=True
+        )
+        submission = QuizSubmissionFactory(quiz=quiz)
+        answers = sample("quizzes_answers_total")
+        try:
+            with transaction.atomic():
+                QuizUserAnswer.objects.create(submission=submission, answer=answer)
+                raise DatabaseError("rolled back")
+        except DatabaseError:
+            pass
+        self.assertEqual(sample("quizzes_answers_total"), answers)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            QuizUserAnswer.objects.create(submission=submission, answer=answer)
+        self.assertEqual(sample("quizzes_answers_total"), answers + 1)
+
+    def test_unknown_method(self):
+        self.client.force_login(user=OwnerFactory().user)
+        other = sample(
+            "quizzes_request_duration_seconds_count",
+            route="quiz-list-create",
+            method="other",
+        )
+        self.client.generic("PROPFIND", "/api/quizzes/")
+        self.assertEqual(
+            sample(
+                "quizzes_request_duration_seconds_count",
+                route="quiz-list-create",
+                method="other",
+            ),
+            other + 1,
+        )
+        self.assertEqual(
+            sample(
+                "quizzes_request_duration_seconds_count",
+                route="quiz-list-create",
+                method="PROPFIND",
+            ),
+            0,
+        )
+
+    @override_settings(QUIZ_METRICS_ALLOWED_IPS=["10.0.0.1"], QUIZ_METRICS_TOKEN="s3")
+    def test_access(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s4")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, 200)
+        self.client.force_login(user=User.objects.create_superuser("admin"))
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+        self.client.force_login(user=OwnerFactory().user)
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+class MultiProcessTest(SimpleTestCase):
+    def test_merges_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory}
+            for count in [2, 3]:
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-c",
+                        f"from quizzes.metrics import INVITES; INVITES.inc({count})",
+                    ],
+                    env=env,
+                    check=True,
+                )
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+                response = self.client.get("/metrics")
+        self.assertIn(b"quizzes_invites_total 5.0", response.content)
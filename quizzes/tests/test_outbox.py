@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quizzes.models import OutboxEmail
+from quizzes.outbox import BACKOFF_BASE, claim_batch
+
+CONNECTIONS = []
+
+
+class CountingEmailBackend(EmailBackend):
+    def open(self):
+        CONNECTIONS.append(self)
+        return super().open()
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        if any("fail" in message.to[0] for message in email_messages):
+            raise ConnectionError("mailbox unavailable")
+        mail.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+def queue(*recipients):
+    return OutboxEmail.objects.bulk_create(
+        OutboxEmail(subject="Hi", body="!", from_email="a@test.com", to=[to])
+        for to in recipients
+    )
+
+
+class SendOutboxTest(TestCase):
+    def send(self, *args):
+        out = StringIO()
+        call_command("send_outbox", *args, stdout=out)
+        return out.getvalue()
+
+    @override_settings(EMAIL_BACKEND="quizzes.tests.test_outbox.CountingEmailBackend")
+    def test_batches_reuse_one_connection(self):
+        CONNECTIONS.clear()
+        queue(*[f"p{i}@test.com" for i in range(5)])
+        self.assertEqual(self.send("--batch-size=2"), "Sent 5 email(s).\n")
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len(CONNECTIONS), 3)  # one per batch
+        self.assertFalse(
+            OutboxEmail.objects.exclude(status=OutboxEmail.Status.SENT).exists()
+        )
+        self.assertEqual(self.send(), "Sent 0 email(s).\n")  # nothing is resent
+
+    @override_settings(EMAIL_BACKEND="quizzes.tests.test_outbox.FailingEmailBackend")
+    def test_retry_with_backoff_then_dead_letter(self):
+        good, bad = queue("ok@test.com", "fail@test.com")
+        self.assertEqual(self.send("--max-attempts=2"), "Sent 1 email(s).\n")
+
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn("mailbox unavailable", bad.last_error)
+        self.assertGreaterEqual(
+            bad.next_attempt_at,
+            timezone.now() + timedelta(seconds=BACKOFF_BASE - 5),
+        )
+        self.assertEqual(claim_batch(10), [])  # not due yet
+
+        OutboxEmail.objects.filter(id=bad.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(self.send("--max-attempts=2"), "Sent 0 email(s).\n")
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, OutboxEmail.Status.DEAD)
+        self.assertEqual(bad.attempts, 2)
+        self.assertEqual([message.to for message in mail.outbox], [["ok@test.com"]])
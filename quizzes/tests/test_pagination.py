@@ -0,0 +1,95 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from quizzes.pagination import KeysetPagination
+from quizzes.tests.factories import (
+    OwnerFactory,
+    ParticipantFactory,
+    QuizFactory,
+    QuizSubmissionFactory,
+)
+
+
+class QuizPaginationTest(APITestCase):
+    def setUp(self):
+        self.owner = OwnerFactory()
+        self.client.force_login(user=self.owner.user)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([quiz["id"] for quiz in response.data["results"]])
+            url = response.data["next"]
+        return pages
+
+    def test_pages_follow_name_then_id(self):
+        quizzes = [QuizFactory(owner=self.owner, name=name) for name in "BABCA"]
+        expected = [
+            quiz.id for quiz in sorted(quizzes, key=lambda quiz: (quiz.name, quiz.id))
+        ]
+        pages = self.walk("/api/quizzes/?page_size=2")
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_link(self):
+        for name in "ABCDE":
+            QuizFactory(owner=self.owner, name=name)
+        first = self.client.get("/api/quizzes/?page_size=2")
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+        self.assertIsNotNone(back.data["next"])
+
+    def test_stable_under_concurrent_inserts(self):
+        for name in "BDFH":
+            QuizFactory(owner=self.owner, name=name)
+        first = self.client.get("/api/quizzes/?page_size=2")
+        self.assertEqual([quiz["name"] for quiz in first.data["results"]], ["B", "D"])
+        # rows inserted before the page boundary do not shift the next page
+        QuizFactory(owner=self.owner, name="A")
+        QuizFactory(owner=self.owner, name="C")
+        second = self.client.get(first.data["next"])
+        self.assertEqual([quiz["name"] for quiz in second.data["results"]], ["F", "H"])
+        self.assertIsNone(second.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/quizzes/?cursor=garbage")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for keys in [["A", "one"], ["A", None], ["A", [1]], ["A", {"id": 1}]]:
+            cursor = KeysetPagination().dump_cursor(keys, reverse=False)
+            response = self.client.get(f"/api/quizzes/?cursor={cursor}")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QuizSubmissionPaginationTest(APITestCase):
+    def test_pages_follow_created_then_id(self):
+        participant = ParticipantFactory()
+        submissions = [
+            QuizSubmissionFactory(participant=participant, quiz=QuizFactory())
+            for _ in range(3)
+        ]
+        self.client.force_login(user=participant.user)
+        url = f"/api/participant/{participant.id}/submissions/?page_size=2"
+        first = self.client.get(url)
+        second = self.client.get(first.data["next"])
+        self.assertEqual(
+            [sub["id"] for sub in first.data["results"] + second.data["results"]],
+            [submission.id for submission in submissions],
+        )
+        self.assertIsNone(second.data["next"])
+
+    def test_invalid_cursor(self):
+        participant = ParticipantFactory()
+        self.client.force_login(user=participant.user)
+        url = f"/api/participant/{participant.id}/submissions/"
+        for keys in [["yesterday", 1], [5, 1], ["2022-05-01T12:00:00Z", "one"]]:
+            cursor = KeysetPagination().dump_cursor(keys, reverse=True)
+            response = self.client.get(url, {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        cursor = KeysetPagination().dump_cursor(["2022-05-01T12:00:00Z", 1], False)
+        response = self.client.get(url, {"cursor": cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
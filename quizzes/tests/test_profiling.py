@@ -0,0 +1,71 @@
+import io
+import json
+import marshal
+import zipfile
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from django.contrib.auth.models import User
+
+from quizzes.profiling import PROFILER_LOCK
+from quizzes.tests.factories import OwnerFactory, QuizFactory, QuizQuestionFactory
+
+
+class ProfilingTest(APITestCase):
+    def setUp(self):
+        self.quiz = QuizFactory()
+        QuizQuestionFactory(quiz=self.quiz)
+        self.url = f"/api/quizzes/{self.quiz.id}/"
+
+    def test_superuser(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "secret")
+        )
+        response = self.client.get(self.url, HTTP_X_PROFILE="1")
+        self.assertEqual(response["Content-Type"], "application/zip")
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        self.assertEqual(
+            sorted(archive.namelist()),
+            [
+                "profile.pstats",
+                "profile.txt",
+                "queries.json",
+                "response.txt",
+                "stacks.txt",
+            ],
+        )
+        stats = marshal.loads(archive.read("profile.pstats"))
+        self.assertTrue(any(name == "get" for _, _, name in stats))
+        self.assertIn("(retrieve)", archive.read("profile.txt").decode())
+
+        queries = json.loads(archive.read("queries.json"))
+        quiz_query = next(
+            query for query in queries if 'FROM "quizzes_quiz"' in query["sql"]
+        )
+        self.assertIsInstance(quiz_query["ms"], float)
+        self.assertTrue(quiz_query["plan"])
+        self.assertTrue(archive.read("response.txt").decode().startswith("HTTP 200 OK"))
+
+        response = self.client.get(self.url + "?profile=1")
+        self.assertEqual(response["Content-Type"], "application/zip")
+
+    def test_other_users(self):
+        self.client.force_login(OwnerFactory().user)
+        response = self.client.get(self.url + "?profile=1")
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_one_profile_at_a_time(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        with PROFILER_LOCK:
+            response = self.client.get(self.url + "?profile=1")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        with mock.patch(
+            "cProfile.Profile.enable",
+            side_effect=ValueError("Another profiling tool is already active"),
+        ):
+            response = self.client.get(self.url + "?profile=1")
+        self.assertEqual(response.status_code, 503)
+        response = self.client.get(self.url + "?profile=1")
+        self.assertEqual(response["Content-Type"], "application/zip")
@@ -0,0 +1,54 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from quizzes.query_plans import plan_findings
+
+
+class PlanFindingsTest(SimpleTestCase):
+    def test_findings(self):
+        plan = [
+            "SCAN auth_user",
+            "SCAN U0 USING COVERING INDEX quizzes_quiz_owner_id",
+            "SEARCH quizzes_quiz USING INTEGER PRIMARY KEY (rowid=?)",
+            "SCAN quizzes_quiz_search VIRTUAL TABLE INDEX 0:M1",
+            "SCAN CONSTANT ROW",
+            "USE TEMP B-TREE FOR ORDER BY",
+        ]
+        self.assertEqual(
+            plan_findings(plan), ["SCAN auth_user", "USE TEMP B-TREE FOR ORDER BY"]
+        )
+
+
+class AuditQueryPlansTest(TestCase):
+    def audit(self, baseline, **options):
+        stdout = io.StringIO()
+        call_command(
+            "audit_query_plans", baseline=str(baseline), stdout=stdout, **options
+        )
+        return stdout.getvalue()
+
+    def test_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / "baseline.json"
+            baseline.write_text("[]")
+            with self.assertRaisesMessage(
+                CommandError, "usage report: SCAN quizzes_quiz"
+            ):
+                self.audit(baseline)
+
+            self.audit(baseline, update_baseline=True)
+            findings = json.loads(baseline.read_text())
+            self.assertIn("usage report: SCAN quizzes_quiz", findings)
+            # users are looked up through the LOWER() indexes
+            self.assertNotIn("bulk invite: SCAN auth_user", findings)
+            output = self.audit(baseline)
+        self.assertIn("quiz detail: GET /api/quizzes/", output)
+        self.assertNotIn("NEW", output)
+        self.assertFalse(User.objects.exists())  # rolled back
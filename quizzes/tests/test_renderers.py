@@ -0,0 +1,92 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from quizzes.renderers import FastJSONParser, FastJSONRenderer
+from quizzes.tests.factories import OwnerFactory, QuizFactory
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    payload = {
+        "uuid": uuid.UUID("3af5fdb1-9877-bf29-1ed2-e814c67711d3"),
+        "utc": datetime(2022, 5, 1, 12, 30, tzinfo=dt_timezone.utc),
+        "offset": datetime(2022, 5, 1, 12, 30, 1, 5, dt_timezone(timedelta(hours=2))),
+        "naive": datetime(2022, 5, 1, 12, 30, 0, 500),
+        "date": date(2022, 5, 1),
+        "time": time(8, 15),
+        "duration": timedelta(minutes=90),
+        "decimal": Decimal("12.50"),
+        "lazy": gettext_lazy("This field is required."),
+        "error": ErrorDetail("Invalid", code="invalid"),
+        "text": "Zürich «quoted» \u2028\u2029 \U0001f600",
+        "numbers": [0, -1, 2**63 - 1, 0.5, True, None],
+        "nested": [{"id": 1, "answers": [{"id": 2}]}],
+        7: "integer key",
+    }
+
+    def test_same_bytes_as_drf(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        with mock.patch("quizzes.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+
+    def test_falls_back(self):
+        renderer = FastJSONRenderer()
+        for data, media_type in [
+            ({"big": 2**64}, None),
+            ({"indented": [1]}, "application/json; indent=4"),
+            (None, None),
+        ]:
+            self.assertEqual(
+                renderer.render(data, media_type),
+                JSONRenderer().render(data, media_type),
+            )
+        with self.assertRaises(TypeError):
+            renderer.render({"unknown": object()})
+
+
+class FastJSONParserTest(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body), "application/json", {})
+
+    def test_same_data_as_drf(self):
+        for body in [
+            b'{"answers": [1, 2, 3], "text": "Z\\u00fcrich", "ok": true}',
+            '["Zürich", 1.5, null, -0]'.encode("utf-8"),
+            b'{"nested": {"a": [1, {"b": -2.5e-3}]}, "empty": {}}',
+        ]:
+            self.assertEqual(
+                self.parse(FastJSONParser(), body), self.parse(JSONParser(), body)
+            )
+
+    def test_invalid(self):
+        for body in [b"", b"{", b'{"nan": NaN}', b"\xff"]:
+            with self.assertRaises(ParseError) as expected:
+                self.parse(JSONParser(), body)
+            with self.assertRaisesMessage(ParseError, str(expected.exception)):
+                self.parse(FastJSONParser(), body)
+
+
+class FastJSONSettingsTest(APITestCase):
+    def test_api_uses_fast_json(self):
+        owner = OwnerFactory()
+        self.client.force_login(user=owner.user)
+        response = self.client.post("/api/quizzes/", {"name": "Café"}, format="json")
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.json()["name"], "Café")
+        quiz = QuizFactory(owner=owner)
+        response = self.client.get(
+            f"/api/quizzes/{quiz.id}/", HTTP_ACCEPT="application/json"
+        )
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
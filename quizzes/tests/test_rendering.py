@@ -0,0 +1,123 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+
+from quizzes.models import Quiz, QuizSubmission
+from quizzes.serializers import QuizSerializer, QuizSubmissionSerializer
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class FastRenderingTest(APITestCase):
+    """
+    The read-only views render the same JSON bytes as the serializers.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner, name="Géographie")
+        answers = []
+        for position, text in enumerate(["Capitale de la Suisse?", "Ünïcødé?"]):
+            question = QuizQuestionFactory(
+                quiz=self.quiz, text=text, position=2 - position
+            )
+            answers.append(
+                [
+                    QuizQuestionAnswerFactory(
+                        question=question, text=f"«{index}»", is_correct=not index
+                    )
+                    for index in range(3)
+                ]
+            )
+        self.submissions = [QuizSubmissionFactory(quiz=self.quiz) for _ in range(3)]
+        self.submissions[0].accepted_on = timezone.now()
+        self.submissions[0].save()
+        for submission, picks in zip(self.submissions, [(0, 1), (2,), ()]):
+            for question_answers, pick in zip(answers, picks):
+                QuizUserAnswerFactory(
+                    submission=submission, answer=question_answers[pick]
+                )
+        # another quiz of the first participant, with no questions
+        self.submissions.append(
+            QuizSubmissionFactory(
+                quiz=QuizFactory(name="Géographie II"),
+                participant=self.submissions[0].participant,
+            )
+        )
+        self.participant = self.submissions[0].participant
+
+    def serialized(self, serializer_class, instance, user, **kwargs):
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user
+        data = serializer_class(instance, context={"request": request}, **kwargs).data
+        return JSONRenderer().render(data)
+
+    def assert_same_bytes(self, user, url, expected):
+        self.client.force_login(user=user)
+        for _ in range(2):  # with the question trees rendered here, then cached
+            response = self.client.get(url, HTTP_ACCEPT="application/json")
+            self.assertEqual(response.content, expected)
+
+    def test_quiz_detail(self):
+        superuser = User.objects.create_superuser(username="su")
+        url = f"/api/quizzes/{self.quiz.id}/"
+        for user, submissions in [
+            (self.owner.user, True),
+            (superuser, True),
+            (self.participant.user, False),
+        ]:
+            quiz = Quiz.objects.with_tree(submissions=submissions).get(id=self.quiz.id)
+            cache.clear()
+            expected = self.serialized(QuizSerializer, quiz, user)
+            cache.clear()
+            self.assert_same_bytes(user, url, expected)
+
+    def test_participant_submissions(self):
+        submissions = QuizSubmission.objects.filter(
+            participant=self.participant
+        ).prefetch_related("quiz__quizquestion_set", "answer_set")
+        expected = self.serialized(
+            QuizSubmissionSerializer,
+            submissions.order_by("created", "id"),
+            self.participant.user,
+            many=True,
+        )
+        url = f"/api/participant/{self.participant.id}/submissions/"
+        self.client.force_login(user=self.participant.user)
+        response = self.client.get(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(
+            response.content,
+            b'{"next":null,"previous":null,"results":' + expected + b"}",
+        )
+
+        expected = self.serialized(
+            QuizSubmissionSerializer,
+            submissions.get(quiz=self.quiz),
+            self.participant.user,
+        )
+        self.assert_same_bytes(self.participant.user, f"{url}{self.quiz.id}/", expected)
+
+    def test_participant_submissions_pages(self):
+        # the keyset cursor is read from rows, also when ordered by search rank
+        self.client.force_login(user=self.participant.user)
+        url = f"/api/participant/{self.participant.id}/submissions/"
+        for query in [{"page_size": 1}, {"page_size": 1, "search": "geographie"}]:
+            response = self.client.get(url, query)
+            seen = [response.data["results"][0]["id"]]
+            response = self.client.get(response.data["next"])
+            seen.append(response.data["results"][0]["id"])
+            self.assertIsNone(response.data["next"])
+            self.assertEqual(
+                sorted(seen), [self.submissions[0].id, self.submissions[3].id]
+            )
@@ -0,0 +1,155 @@
+import csv
+import json
+import tempfile
+from datetime import date, datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone as django_timezone
+
+from quizzes.models import (
+    DailyUsage,
+    Quiz,
+    QuizSubmission,
+    QuizUserAnswer,
+    RollupWatermark,
+)
+from quizzes.reports import usage_rows
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+DAY1 = datetime(2026, 3, 1, 23, 59, tzinfo=timezone.utc)
+DAY3 = datetime(2026, 3, 3, 8, 0, tzinfo=timezone.utc)
+
+
+class UsageReportTest(APITestCase):
+    def setUp(self):
+        quiz = QuizFactory()
+        question = QuizQuestionFactory(quiz=quiz, text="1 + 1?")
+        right = QuizQuestionAnswerFactory(question=question, text="2", is_correct=True)
+        wrong = QuizQuestionAnswerFactory(question=question, text="3", is_correct=False)
+        first = QuizSubmissionFactory(quiz=quiz)
+        second = QuizSubmissionFactory(quiz=quiz)
+        QuizUserAnswerFactory(submission=first, answer=right)
+        QuizUserAnswerFactory(submission=second, answer=wrong)
+        QuizFactory()  # created today, outside the reported range
+
+        Quiz.objects.filter(id=quiz.id).update(created=DAY1)
+        QuizSubmission.objects.update(created=DAY1)
+        QuizSubmission.objects.filter(id=first.id).update(accepted_on=DAY3)
+        QuizUserAnswer.objects.update(created=DAY3)
+        call_command("rollup_daily_usage", stdout=StringIO())
+
+        self.superuser = User.objects.create_superuser(username="su")
+        self.url = "/api/reports/usage.{}?start=2026-03-01&end=2026-03-03"
+
+    def test_csv(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get(self.url.format("csv"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="usage-2026-03-01-2026-03-03.csv"',
+        )
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertEqual(
+            list(csv.reader(StringIO(content))),
+            [
+                [
+                    "day",
+                    "quizzes_created",
+                    "invites_sent",
+                    "invitations_accepted",
+                    "answers_recorded",
+                    "answers_correct",
+                    "submissions_completed",
+                    "score_percent",
+                ],
+                ["2026-03-01", "1", "2", "0", "0", "0", "0", ""],
+                ["2026-03-02", "0", "0", "0", "0", "0", "0", ""],
+                ["2026-03-03", "0", "0", "1", "2", "1", "2", "50.0"],
+            ],
+        )
+
+    def test_jsonl(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get(self.url.format("jsonl"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            rows[2],
+            {
+                "day": "2026-03-03",
+                "quizzes_created": 0,
+                "invites_sent": 0,
+                "invitations_accepted": 1,
+                "answers_recorded": 2,
+                "answers_correct": 1,
+                "submissions_completed": 2,
+                "score_percent": 50.0,
+            },
+        )
+
+    def test_fresh(self):
+        # today is read from the source tables, not from the rollup
+        QuizSubmissionFactory(quiz=Quiz.objects.last())
+        today = django_timezone.localdate()
+        [row] = usage_rows(today, today)
+        self.assertEqual((row["quizzes_created"], row["invites_sent"]), (1, 1))
+
+        RollupWatermark.objects.all().delete()  # never rolled up
+        DailyUsage.objects.all().delete()
+        row = list(usage_rows(date(2026, 3, 1), date(2026, 3, 3)))[2]
+        self.assertEqual((row["answers_recorded"], row["answers_correct"]), (2, 1))
+
+    def test_invalid_requests(self):
+        self.client.force_login(OwnerFactory().user)
+        response = self.client.get(self.url.format("csv"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(self.superuser)
+        response = self.client.get(self.url.format("xlsx"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(
+            "/api/reports/usage.csv?start=2026-03-04&end=2026-03-03"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/reports/usage.csv?end=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"end": ["Expected a date as YYYY-MM-DD."]})
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "usage.jsonl"
+            out = StringIO()
+            call_command(
+                "export_usage_report",
+                str(path),
+                "--start=2026-03-01",
+                "--end=2026-03-03",
+                "--format=jsonl",
+                stdout=out,
+            )
+            self.assertEqual(out.getvalue(), f"Wrote 3 day(s) to {path}.\n")
+            rows = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual(
+            [row["day"] for row in rows], ["2026-03-01", "2026-03-02", "2026-03-03"]
+        )
+        self.assertEqual(rows[0]["invites_sent"], 2)
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from quizzes.models import DailyUsage, QuizSubmission, RollupWatermark
+from quizzes.rollups import WATERMARK, catch_up_daily_usage
+from quizzes.tests.factories import (
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class DailyUsageRollupTest(TestCase):
+    def setUp(self):
+        self.quiz = QuizFactory()
+        questions = [
+            QuizQuestionFactory(quiz=self.quiz, text=text)
+            for text in ["1 + 1?", "2 + 2?"]
+        ]
+        self.right = [
+            QuizQuestionAnswerFactory(question=question, text="ok", is_correct=True)
+            for question in questions
+        ]
+        self.wrong = QuizQuestionAnswerFactory(
+            question=questions[0], text="ko", is_correct=False
+        )
+        self.submission = QuizSubmissionFactory(quiz=self.quiz)
+        self.other = QuizSubmissionFactory(quiz=QuizFactory())
+
+    def usage(self, quiz):
+        row = DailyUsage.objects.get(quiz=quiz, day=timezone.localdate())
+        return {
+            "invites": row.invites,
+            "acceptances": row.acceptances,
+            "answers": row.answers,
+            "answers_correct": row.answers_correct,
+            "submissions_completed": row.submissions_completed,
+        }
+
+    def test_catch_up(self):
+        self.assertEqual(catch_up_daily_usage(), 2)  # first run: everything
+        self.assertEqual(
+            self.usage(self.quiz),
+            {
+                "invites": 1,
+                "acceptances": 0,
+                "answers": 0,
+                "answers_correct": 0,
+                "submissions_completed": 0,
+            },
+        )
+
+        # a quiz without changes since the last run is not recomputed
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        QuizSubmission.objects.update(modified=an_hour_ago - timedelta(hours=1))
+        RollupWatermark.objects.update(processed_until=an_hour_ago)
+        DailyUsage.objects.filter(quiz=self.other.quiz).update(invites=42)
+        self.submission.accepted_on = timezone.now()
+        self.submission.save()
+        QuizUserAnswerFactory(submission=self.submission, answer=self.wrong)
+        QuizUserAnswerFactory(submission=self.submission, answer=self.right[1])
+        with self.assertNumQueries(12):
+            self.assertEqual(catch_up_daily_usage(), 1)
+        self.assertEqual(
+            self.usage(self.quiz),
+            {
+                "invites": 1,
+                "acceptances": 1,
+                "answers": 2,
+                "answers_correct": 1,
+                "submissions_completed": 1,
+            },
+        )
+        self.assertEqual(self.usage(self.other.quiz)["invites"], 42)
+
+        # idempotent
+        before = list(DailyUsage.objects.values())
+        catch_up_daily_usage()
+        self.assertEqual(
+            [{**row, "id": None, "created": None, "modified": None} for row in before],
+            [
+                {**row, "id": None, "created": None, "modified": None}
+                for row in DailyUsage.objects.values()
+            ],
+        )
+
+    def test_nothing_to_catch_up(self):
+        catch_up_daily_usage()
+        RollupWatermark.objects.filter(name=WATERMARK).update(
+            processed_until=timezone.now() + timedelta(hours=1)
+        )
+        with self.assertNumQueries(4):
+            self.assertEqual(catch_up_daily_usage(), 0)
+
+    def test_rebuild_command(self):
+        catch_up_daily_usage()
+        QuizSubmission.objects.filter(id=self.submission.id).delete()
+        out = StringIO()
+        call_command("rollup_daily_usage", "--rebuild", stdout=out)
+        self.assertEqual(out.getvalue(), "Wrote 1 daily usage row(s).\n")
+        self.assertFalse(DailyUsage.objects.filter(quiz=self.quiz).exists())
+
+    def test_deleted_quiz_keeps_history(self):
+        catch_up_daily_usage()
+        self.other.quiz.owner.delete()  # and the quiz
+        usage = DailyUsage.objects.get(quiz=None)
+        self.assertEqual((usage.owner, usage.invites), (None, 1))
+        catch_up_daily_usage(rebuild=True)
+        self.assertEqual(DailyUsage.objects.get(quiz=None).invites, 1)
@@ -0,0 +1,125 @@
+from base64 import b64encode
+from io import StringIO
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from quizzes.models import Quiz
+from quizzes.search import SEARCH_TABLE, match_expression, matching_quiz_ids
+from quizzes.tests.factories import (
+    OwnerFactory,
+    ParticipantFactory,
+    QuizFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+)
+
+
+def search(*terms):
+    return set(
+        Quiz.objects.filter(
+            id__in=matching_quiz_ids(match_expression(terms))
+        ).values_list("name", flat=True)
+    )
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.owner = OwnerFactory(user__email="ann@example.com")
+        self.quiz = QuizFactory(owner=self.owner, name="Geography")
+
+    def test_match_expression(self):
+        self.assertEqual(match_expression(["geo"]), '"geo"*')
+        self.assertEqual(
+            match_expression(["ann@example.com", "Swiss"]),
+            '"ann" + "example" + "com"* "Swiss"*',
+        )
+        self.assertIsNone(match_expression(['"', "*", "-"]))
+
+    def test_query_syntax_is_not_interpreted(self):
+        QuizFactory(owner=self.owner, name="Rivers OR Lakes")
+        self.assertEqual(search("geography OR"), set())
+        self.assertEqual(search('"rivers*', "(lakes"), {"Rivers OR Lakes"})
+
+    def test_kept_in_sync(self):
+        self.assertEqual(search("geo"), {"Geography"})
+        self.assertEqual(search("ann@example"), {"Geography"})
+
+        self.quiz.name = "Capitals"
+        self.quiz.save()
+        self.assertEqual(search("geo"), set())
+        self.assertEqual(search("capitals"), {"Capitals"})
+
+        question = QuizQuestionFactory(quiz=self.quiz, text="Capital of Zürich?")
+        self.assertEqual(search("zurich"), {"Capitals"})
+        question.delete()
+        self.assertEqual(search("zurich"), set())
+
+        self.owner.user.email = "bob@example.com"
+        self.owner.user.save()
+        self.assertEqual(search("ann"), set())
+        self.assertEqual(search("bob", "capitals"), {"Capitals"})
+
+        self.quiz.delete()
+        self.assertEqual(search("capitals"), set())
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        self.assertEqual(search("geo"), set())
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertEqual(out.getvalue(), "Indexed 1 quiz(zes).\n")
+        self.assertEqual(search("geo"), {"Geography"})
+
+
+class SearchViewsTest(APITestCase):
+    def setUp(self):
+        self.owner = OwnerFactory(user__email="owner@quiz.com")
+        self.in_question = QuizFactory(owner=self.owner, name="Cities")
+        QuizQuestionFactory(quiz=self.in_question, text="Which river flows in Bern?")
+        self.in_name = QuizFactory(owner=self.owner, name="Rivers of Europe")
+        QuizFactory(owner=self.owner, name="Mountains")
+
+    def test_quizzes_ranked_by_relevance(self):
+        self.client.force_login(user=self.owner.user)
+        response = self.client.get("/api/quizzes/?search=river")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [quiz["id"] for quiz in response.data["results"]],
+            [self.in_name.id, self.in_question.id],
+        )
+
+        pages = []
+        url = "/api/quizzes/?search=quiz.com&page_size=2"
+        while url:
+            response = self.client.get(url)
+            pages.append([quiz["name"] for quiz in response.data["results"]])
+            url = response.data["next"]
+        self.assertEqual([len(page) for page in pages], [2, 1])
+
+        # paged by offset, as ranks change with the index
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([quiz["name"] for quiz in response.data["results"]], pages[0])
+        self.assertIsNone(response.data["previous"])
+        for payload in [b'{"o":-2}', b'{"o":"2"}', b'{"k":[1.5,1],"r":false}', b"1"]:
+            cursor = b64encode(payload, altchars=b"-_").decode()
+            response = self.client.get(f"/api/quizzes/?search=quiz.com&cursor={cursor}")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_participant_submissions(self):
+        participant = ParticipantFactory()
+        for quiz in Quiz.objects.all():
+            QuizSubmissionFactory(quiz=quiz, participant=participant)
+        self.client.force_login(user=participant.user)
+        url = f"/api/participant/{participant.id}/submissions/?search=bern"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [submission["quiz"] for submission in response.data["results"]],
+            [self.in_question.id],
+        )
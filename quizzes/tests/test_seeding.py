@@ -0,0 +1,79 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from quizzes.models import Quiz, QuizQuestion, QuizSubmission, QuizUserAnswer
+from quizzes.search import match_expression, matching_quiz_ids
+from quizzes.seeding import seed
+
+OPTIONS = {
+    "owners": 3,
+    "participants": 20,
+    "quizzes": (1, 2),
+    "questions": (2, 4),
+    "answers": (2, 3),
+    "invites": (5, 10),
+    "batch_size": 50,
+}
+
+
+def snapshot():
+    return (
+        # timestamps are relative to the time of seeding
+        list(Quiz.objects.order_by("id").values_list("id", "name")),
+        list(
+            QuizSubmission.objects.order_by("id").values_list(
+                "id", "participant_id", "answers_all_count", "answers_correct_count"
+            )
+        ),
+        list(QuizUserAnswer.objects.order_by("id").values_list("answer_id")),
+    )
+
+
+class SeedTest(TestCase):
+    def test_consistent_data(self):
+        written, _ = seed(seed=1, **OPTIONS)
+        self.assertEqual(written["Owner"], 3)
+        self.assertEqual(written["QuizUserAnswer"], QuizUserAnswer.objects.count())
+        self.assertEqual(User.objects.count(), 23)
+        self.assertFalse(User.objects.first().has_usable_password())
+        # counters that signals maintain are right, and the quizzes searchable
+        self.assertFalse(QuizSubmission.objects.drifted().exists())
+        self.assertEqual(
+            QuizQuestion.objects.filter(quizquestionanswer__is_correct=True).count(),
+            QuizQuestion.objects.count(),
+        )
+        quiz = Quiz.objects.first()
+        self.assertIn(
+            quiz.id,
+            Quiz.objects.filter(
+                id__in=matching_quiz_ids(match_expression(quiz.name.split()))
+            ).values_list("id", flat=True),
+        )
+
+    def test_deterministic(self):
+        seed(seed=7, **OPTIONS)
+        first = snapshot()
+        User.objects.all().delete()  # cascades to everything seeded
+        seed(seed=7, **OPTIONS)
+        self.assertEqual(snapshot(), first)
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command(
+            "seed_load_data",
+            owners=1,
+            participants=5,
+            quizzes=(1, 1),
+            invites=(5, 5),
+            stdout=stdout,
+        )
+        self.assertIn("QuizSubmission: 5 row(s)", stdout.getvalue())
+        self.assertIn("rows/s", stdout.getvalue())
+
+    def test_command_needs_answers(self):
+        with self.assertRaisesMessage(CommandError, "Expected 1 <= LOW <= HIGH"):
+            call_command("seed_load_data", "--answers", "0:3")
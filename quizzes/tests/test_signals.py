@@ -0,0 +1,71 @@
+from django.test import TestCase
+
+from quizzes.models import QuizUserAnswer
+from quizzes.tests.factories import (
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
+
+
+class AnswerCountSignalsTest(TestCase):
+    def setUp(self):
+        quiz = QuizFactory()
+        question = QuizQuestionFactory(quiz=quiz, text="CH capital city?")
+        self.wrong = QuizQuestionAnswerFactory(
+            question=question, text="Zurich", is_correct=False
+        )
+        self.right = QuizQuestionAnswerFactory(
+            question=question, text="Bern", is_correct=True
+        )
+        self.submission = QuizSubmissionFactory(quiz=quiz)
+
+    def assertCounts(self, all_count, correct_count):
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.answers_all_count, all_count)
+        self.assertEqual(self.submission.answers_correct_count, correct_count)
+
+    def test_create_and_delete_user_answer(self):
+        user_answer = QuizUserAnswerFactory(
+            submission=self.submission, answer=self.right
+        )
+        self.assertCounts(1, 1)
+        user_answer.delete()
+        self.assertCounts(0, 0)
+
+    def test_create_user_answer_by_ids(self):
+        # INSERT, SELECT of the quiz id and UPDATE of the counters
+        with self.assertNumQueries(3):
+            QuizUserAnswer.objects.create(
+                submission_id=self.submission.id, answer_id=self.right.id
+            )
+        self.assertCounts(1, 1)
+
+    def test_change_user_answer(self):
+        user_answer = QuizUserAnswerFactory(
+            submission=self.submission, answer=self.wrong
+        )
+        self.assertCounts(1, 0)
+        user_answer.answer = self.right
+        user_answer.save()
+        self.assertCounts(1, 1)
+
+    def test_change_answer_key(self):
+        QuizUserAnswerFactory(submission=self.submission, answer=self.wrong)
+        self.right.is_correct = False
+        self.right.save()
+        self.wrong.is_correct = True
+        self.wrong.save()
+        self.assertCounts(1, 1)
+        self.wrong.text = "Zürich"
+        self.wrong.save()  # no change to the key
+        self.assertCounts(1, 1)
+        with self.assertNumQueries(1):
+            self.wrong.save(update_fields=["text"])  # no recount
+
+    def test_delete_answer_key(self):
+        QuizUserAnswerFactory(submission=self.submission, answer=self.right)
+        self.right.delete()  # cascades to the user answer
+        self.assertCounts(0, 0)
@@ -0,0 +1,63 @@
+import re
+
+from rest_framework.test import APITestCase
+
+from django.test import override_settings
+
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+)
+
+HEADER = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r"serializer;dur=(?P<serializer>[\d.]+), view;dur=(?P<view>[\d.]+)"
+)
+
+
+class ServerTimingTest(APITestCase):
+    def setUp(self):
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner)
+        QuizQuestionFactory(quiz=self.quiz)
+        self.client.force_login(user=self.owner.user)
+
+    @override_settings(QUIZ_SERVER_TIMING=True)
+    def test_header_and_log(self):
+        with self.assertLogs("quizzes.timing", "INFO") as logs:
+            with self.assertNumQueries(7) as queries:
+                response = self.client.get(
+                    "/api/quizzes/", {"expand": "questions,submissions"}
+                )
+        timing = HEADER.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(timing)
+        self.assertEqual(int(timing["queries"]), len(queries.captured_queries))
+        self.assertGreater(float(timing["serializer"]), 0)
+        self.assertGreaterEqual(float(timing["view"]), float(timing["db"]))
+
+        record = logs.records[0]
+        self.assertEqual(record.timing["path"], "/api/quizzes/")
+        self.assertEqual(record.timing["status"], 200)
+        self.assertEqual(record.timing["queries"], 7)
+        self.assertIn("queries=7", record.getMessage())
+
+    @override_settings(QUIZ_SERVER_TIMING=True)
+    def test_rendered_from_rows(self):
+        submission = QuizSubmissionFactory(quiz=self.quiz)
+        participant = submission.participant
+        self.client.force_login(user=participant.user)
+        for url in [
+            f"/api/quizzes/{self.quiz.id}/",
+            f"/api/participant/{participant.id}/submissions/",
+            f"/api/participant/{participant.id}/submissions/{self.quiz.id}/",
+        ]:
+            with self.assertLogs("quizzes.timing", "INFO"):
+                response = self.client.get(url)
+            timing = HEADER.fullmatch(response["Server-Timing"])
+            self.assertGreater(float(timing["serializer"]), 0, url)
+
+    def test_disabled(self):
+        response = self.client.get("/api/quizzes/")
+        self.assertNotIn("Server-Timing", response)
@@ -1,17 +1,36 @@
-from unittest import mock
+from datetime import timedelta
+from io import StringIO
 
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.http import http_date
+
+from quizzes.models import (
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+    QuizUserAnswer,
+)
+from quizzes.tests.factories import (
+    OwnerFactory,
+    QuizFactory,
+    QuizQuestionAnswerFactory,
+    QuizQuestionFactory,
+    QuizSubmissionFactory,
+    QuizUserAnswerFactory,
+)
 
-from quizzes.models import Quiz, QuizQuestion, QuizSubmission, QuizUserAnswer
-from quizzes.tests.factories import OwnerFactory, QuizFactory, QuizSubmissionFactory
 
-
-@mock.patch("quizzes.views.send_mail")
 class IntegrationTest(APITestCase):
-    def test_flow(self, p_send_mail):
+    def test_flow(self):
         superuser1 = User.objects.create_superuser(username="su")
         user1 = User.objects.create_user(username="owner1", email="owner1@quiz.com")
         owner1 = OwnerFactory(user=user1)
@@ -26,7 +45,7 @@ class IntegrationTest(APITestCase):
         # no quizzes
         url = "/api/quizzes/"
         response = self.client.get(url)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data["results"]), 0)
 
         # create quiz
         data = {"name": "Test Quizzz"}
@@ -116,21 +135,18 @@ class IntegrationTest(APITestCase):
         self.assertEqual(submission2.participant.user.email, "jane.doe@test.com")
         jane_doe = submission2.participant
 
-        expected_calls = [
-            mock.call(
-                subject="Quiz Invite!",
-                message="You've been invited to Test Quiz.",
-                from_email="owner1@quiz.com",
-                recipient_list=["john.doe@test.com"],
-            ),
-            mock.call(
-                subject="Quiz Invite!",
-                message="You've been invited to Test Quiz.",
-                from_email="owner1@quiz.com",
-                recipient_list=["jane.doe@test.com"],
-            ),
-        ]
-        p_send_mail.assert_has_calls(expected_calls)
+        # invites are queued in the outbox, then delivered by the worker
+        self.assertEqual(len(mail.outbox), 0)
+        call_command("send_outbox", stdout=StringIO())
+        self.assertEqual(
+            [(message.from_email, message.to) for message in mail.outbox],
+            [
+                ("owner1@quiz.com", ["john.doe@test.com"]),
+                ("owner1@quiz.com", ["jane.doe@test.com"]),
+            ],
+        )
+        self.assertEqual(mail.outbox[0].subject, "Quiz Invite!")
+        self.assertEqual(mail.outbox[0].body, "You've been invited to Test Quiz.")
 
         # ===============================
         # sign in as participant john doe
@@ -181,6 +197,11 @@ class IntegrationTest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+        # no submission for a quiz that john.doe was not invited to
+        url = f"/api/participant/{john_doe.id}/submissions/{quiz2.id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
         # try to update quiz as participant
         url = f"/api/quizzes/{quiz1.id}/"
         response = self.client.patch(url, {"name": "lolz"})
@@ -230,49 +251,50 @@ class IntegrationTest(APITestCase):
         url = f"/api/participant/{jane_doe.id}/submissions/"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], submission2.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], submission2.id)
 
         # Add submission for another quiz
         submission3 = QuizSubmissionFactory(quiz=quiz2, participant=jane_doe)
         url = f"/api/participant/{jane_doe.id}/submissions/"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # 2 submissions
+        self.assertEqual(len(response.data["results"]), 2)  # 2 submissions
         self.assertEqual(
-            [sub["id"] for sub in response.data], [submission2.id, submission3.id]
+            [sub["id"] for sub in response.data["results"]],
+            [submission2.id, submission3.id],
         )
 
         # test filtering by quiz name
         url = f"/api/participant/{jane_doe.id}/submissions/?quiz_name=quiz+2"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 1 submission
-        self.assertEqual(response.data[0]["id"], submission3.id)
+        self.assertEqual(len(response.data["results"]), 1)  # 1 submission
+        self.assertEqual(response.data["results"][0]["id"], submission3.id)
 
         # test filtering by quiz owner email
         url = f"/api/participant/{jane_doe.id}/submissions/?owner_email=owner1@quiz.com"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 1 submission
-        self.assertEqual(response.data[0]["id"], submission2.id)
+        self.assertEqual(len(response.data["results"]), 1)  # 1 submission
+        self.assertEqual(response.data["results"][0]["id"], submission2.id)
         url = f"/api/participant/{jane_doe.id}/submissions/?owner_email=owner2@quiz.com"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 1 submission
-        self.assertEqual(response.data[0]["id"], submission3.id)
+        self.assertEqual(len(response.data["results"]), 1)  # 1 submission
+        self.assertEqual(response.data["results"][0]["id"], submission3.id)
 
         # test search by quiz name and quiz owner email
         url = f"/api/participant/{jane_doe.id}/submissions/?search=quiz+2"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 1 submission
-        self.assertEqual(response.data[0]["id"], submission3.id)
+        self.assertEqual(len(response.data["results"]), 1)  # 1 submission
+        self.assertEqual(response.data["results"][0]["id"], submission3.id)
         url = f"/api/participant/{jane_doe.id}/submissions/?search=owner2@quiz.com"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # 1 submission
-        self.assertEqual(response.data[0]["id"], submission3.id)
+        self.assertEqual(len(response.data["results"]), 1)  # 1 submission
+        self.assertEqual(response.data["results"][0]["id"], submission3.id)
 
         # ===============================
         # re-login as owner
@@ -280,9 +302,11 @@ class IntegrationTest(APITestCase):
 
         # fetch details about submissions for quiz
         url = "/api/quizzes/"
-        response = self.client.get(url)
-        self.assertEqual(len(response.data), 1)  # assert only one quiz returned
-        quiz_data = response.data[0]
+        response = self.client.get(url, {"expand": "submissions"})
+        self.assertEqual(
+            len(response.data["results"]), 1
+        )  # assert only one quiz returned
+        quiz_data = response.data["results"][0]
         self.assertEqual(
             [sub["id"] for sub in quiz_data["submissions"]],
             [submission1.id, submission2.id],
@@ -295,37 +319,353 @@ class IntegrationTest(APITestCase):
         # add another quiz by "owner"
         QuizFactory(owner=owner1, name="Another Quiz")
         response = self.client.get(url)
-        self.assertEqual(len(response.data), 2)  # only two quizzes returned
+        self.assertEqual(len(response.data["results"]), 2)  # only two quizzes returned
 
         # add another quiz by another owner
         another_owner = OwnerFactory()
         QuizFactory(owner=another_owner, name="Quiz by another owner")
         response = self.client.get(url)
         self.assertEqual(
-            len(response.data), 2
+            len(response.data["results"]), 2
         )  # still two quizzes returned for "owner"
 
         # filter quiz by name
         response = self.client.get(url + "?name=Test+Quiz")  # case sensitive
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
         response = self.client.get(url + "?name=test+QUIZ")  # case insensitive
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
         # seach quiz by name
         response = self.client.get(url + "?search=quiz")
-        self.assertEqual(len(response.data), 2)  # both quizzes match "name"
+        self.assertEqual(len(response.data["results"]), 2)  # both quizzes match "name"
         response = self.client.get(url + "?search=another")
-        self.assertEqual(len(response.data), 1)  # one quiz matches "another"
+        self.assertEqual(len(response.data["results"]), 1)  # one quiz matches "another"
         response = self.client.get(url + "?search=foobar")
-        self.assertEqual(len(response.data), 0)  # no quiz matches "foobar"
+        self.assertEqual(len(response.data["results"]), 0)  # no quiz matches "foobar"
 
         # login as superuser
         self.client.force_login(superuser1)
         url = "/api/quizzes/"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 4)  # see all quizzes created!
+        self.assertEqual(len(response.data["results"]), 4)  # see all quizzes created!
 
         url = f"/api/quizzes/{quiz1.id}/"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class QueryBudgetTest(APITestCase):
+    """
+    The quiz endpoints must render the whole question/answer/submission tree
+    with a fixed number of queries, regardless of the size of the quiz.
+    """
+
+    def build_quiz(self, owner, questions, answers, submissions):
+        quiz = QuizFactory(owner=owner)
+        answer_list = []
+        for _ in range(questions):
+            question = QuizQuestionFactory(quiz=quiz, text="?")
+            for i in range(answers):
+                answer_list.append(
+                    QuizQuestionAnswerFactory(
+                        question=question, text="!", is_correct=(i == 0)
+                    )
+                )
+        participants = []
+        for _ in range(submissions):
+            submission = QuizSubmissionFactory(quiz=quiz)
+            participants.append(submission.participant)
+            for answer in answer_list[::answers]:
+                QuizUserAnswerFactory(submission=submission, answer=answer)
+        return quiz, participants
+
+    def assert_budget(self, user, url, cold, warm):
+        self.client.force_login(user=user)
+        cache.clear()
+        with self.assertNumQueries(cold):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the question/answer tree now comes from the cache
+        with self.assertNumQueries(warm):
+            self.assertEqual(self.client.get(url).data, response.data)
+
+    def test_quiz_endpoints(self):
+        owner = OwnerFactory()
+        superuser = User.objects.create_superuser(username="su")
+        expand = "questions,submissions"
+        for size in [1, 5]:
+            quiz, participants = self.build_quiz(owner, size, size, size)
+            detail_url = f"/api/quizzes/{quiz.id}/"
+            self.assert_budget(owner.user, "/api/quizzes/", 4, 4)
+            self.assert_budget(owner.user, f"/api/quizzes/?expand={expand}", 8, 6)
+            self.assert_budget(owner.user, detail_url, 10, 8)
+            self.assert_budget(superuser, f"/api/quizzes/?expand={expand}", 8, 6)
+            self.assert_budget(superuser, detail_url, 8, 6)
+            self.assert_budget(participants[0].user, detail_url, 8, 6)
+
+            participant_id = participants[0].id
+            url = f"/api/participant/{participant_id}/submissions/"
+            self.assert_budget(participants[0].user, url, 6, 6)
+            self.assert_budget(participants[0].user, f"{url}{quiz.id}/", 6, 6)
+
+    def test_content_cache_invalidation(self):
+        owner = OwnerFactory()
+        quiz, participants = self.build_quiz(owner, 2, 2, 1)
+        url = f"/api/quizzes/{quiz.id}/"
+        self.client.force_login(user=participants[0].user)
+        response = self.client.get(url)
+        self.assertNotIn("is_correct", response.data["questions"][0]["answers"][0])
+
+        # owners get their own variant
+        self.client.force_login(user=owner.user)
+        response = self.client.get(url)
+        self.assertIn("is_correct", response.data["questions"][0]["answers"][0])
+
+        answer = QuizQuestionAnswer.objects.filter(question__quiz=quiz).first()
+        answer.text = "changed"
+        answer.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data["questions"][0]["answers"][0]["text"], "changed")
+
+        QuizQuestion.objects.filter(quiz=quiz).first().delete()
+        response = self.client.get(url)
+        self.assertEqual(len(response.data["questions"]), 1)
+
+
+class BulkInviteTest(APITestCase):
+    def setUp(self):
+        self.owner = OwnerFactory(user__email="owner@quiz.com")
+        self.quiz = QuizFactory(owner=self.owner, name="Geography")
+        self.url = f"/api/quizzes/{self.quiz.id}/invite/bulk/"
+        self.client.force_login(user=self.owner.user)
+
+    def invite(self, **kwargs):
+        response = self.client.post(self.url, **kwargs)
+        call_command("send_outbox", stdout=StringIO())
+        return response
+
+    def test_json(self):
+        already = QuizSubmissionFactory(
+            quiz=self.quiz, participant__user__email="already@test.com"
+        )
+        existing = User.objects.create_user("existing@test.com", "existing@test.com")
+        data = [
+            {"first_name": "John", "last_name": "Doe", "email": "john@test.com"},
+            {"first_name": "Dup", "last_name": "Doe", "email": "JOHN@test.com"},
+            {"first_name": "No", "last_name": "Email", "email": "nope"},
+            {"first_name": "A", "last_name": "B", "email": "already@test.com"},
+            {"first_name": "E", "last_name": "X", "email": "existing@test.com"},
+        ]
+        response = self.invite(data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data["summary"],
+            {"invited": 2, "duplicate": 1, "invalid": 1, "already_invited": 1},
+        )
+        results = response.data["results"]
+        self.assertEqual(
+            [entry["status"] for entry in results],
+            ["invited", "duplicate", "invalid", "already_invited", "invited"],
+        )
+        self.assertIn("email", results[2])
+        self.assertEqual(results[3]["submission_id"], already.id)
+        submission = QuizSubmission.objects.get(id=results[4]["submission_id"])
+        self.assertEqual(submission.participant.user, existing)
+        john = User.objects.get(email="john@test.com")
+        self.assertFalse(john.has_usable_password())
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["existing@test.com", "john@test.com"],
+        )
+        self.assertEqual(mail.outbox[0].from_email, "owner@quiz.com")
+
+    def test_existing_users_in_another_case(self):
+        by_email = User.objects.create_user("mixed", "Mixed@Test.com")
+        by_username = User.objects.create_user("Name@Test.com")
+        data = [
+            {"first_name": "M", "last_name": "X", "email": "mixed@test.com"},
+            {"first_name": "N", "last_name": "X", "email": "NAME@test.com"},
+        ]
+        response = self.invite(data=data, format="json")
+        self.assertEqual(response.data["summary"], {"invited": 2})
+        self.assertEqual(
+            [
+                QuizSubmission.objects.get(id=entry["submission_id"]).participant.user
+                for entry in response.data["results"]
+            ],
+            [by_email, by_username],
+        )
+        self.assertEqual(User.objects.count(), 3)
+
+    def test_csv(self):
+        upload = SimpleUploadedFile(
+            "invites.csv",
+            b"email,first_name,last_name\r\njane@test.com,Jane,Doe\r\n",
+            content_type="text/csv",
+        )
+        response = self.invite(data={"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["results"][0]["status"], "invited")
+        self.assertEqual(len(mail.outbox), 1)
+
+        upload = SimpleUploadedFile("invites.csv", b"email\r\njane@test.com\r\n")
+        response = self.invite(data={"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow(self):
+        for size in [1, 50]:
+            data = [
+                {"first_name": "F", "last_name": "L", "email": f"{size}.{i}@test.com"}
+                for i in range(size)
+            ]
+            with self.assertNumQueries(12):
+                response = self.client.post(self.url, data=data, format="json")
+            self.assertEqual(response.data["summary"], {"invited": size})
+
+    def test_other_owners_quiz(self):
+        self.client.force_login(user=OwnerFactory().user)
+        response = self.invite(data=[], format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AnswerSheetTest(APITestCase):
+    def setUp(self):
+        self.quiz = QuizFactory()
+        self.answers = {}  # (question, position) -> answer
+        for question_position in range(3):
+            question = QuizQuestionFactory(quiz=self.quiz, text="?")
+            for position in range(2):
+                self.answers[question_position, position] = QuizQuestionAnswerFactory(
+                    question=question, text="!", is_correct=(position == 0)
+                )
+        self.submission = QuizSubmissionFactory(quiz=self.quiz)
+        participant = self.submission.participant
+        self.url = (
+            f"/api/participant/{participant.id}/submissions/{self.quiz.id}"
+            "/answers/batch/"
+        )
+        self.client.force_login(user=participant.user)
+
+    def post(self, *keys):
+        data = {"answers": [self.answers[key].id for key in keys]}
+        return self.client.post(self.url, data=data, format="json")
+
+    def test_submit_and_resubmit(self):
+        response = self.post((0, 0), (1, 1))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["score"], "1 / 2")
+        self.assertEqual(response.data["progress"], "2 / 3")
+
+        # change the answer to question 1 and answer question 2
+        response = self.post((0, 0), (1, 0), (2, 0))
+        self.assertEqual(response.data["score"], "3 / 3")
+        self.assertEqual(response.data["progress"], "3 / 3")
+        self.assertEqual(
+            sorted(answer["answer"] for answer in response.data["answers"]),
+            sorted(self.answers[key, 0].id for key in range(3)),
+        )
+
+    def test_validation(self):
+        other_answer = QuizQuestionAnswerFactory(
+            question=QuizQuestionFactory(quiz=QuizFactory(), text="?"),
+            text="!",
+            is_correct=True,
+        )
+        response = self.client.post(
+            self.url, data={"answers": [other_answer.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post((0, 0), (0, 1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(QuizUserAnswer.objects.exists())
+
+    def test_query_count_does_not_grow(self):
+        with self.assertNumQueries(14):
+            self.post((0, 0))
+        with self.assertNumQueries(14):
+            self.post((0, 0), (1, 1), (2, 1))
+
+    def test_other_participant(self):
+        self.client.force_login(
+            user=QuizSubmissionFactory(quiz=self.quiz).participant.user
+        )
+        response = self.post((0, 0))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.owner = OwnerFactory()
+        self.quiz = QuizFactory(owner=self.owner)
+        self.question = QuizQuestionFactory(quiz=self.quiz, text="?")
+        self.answer = QuizQuestionAnswerFactory(
+            question=self.question, text="!", is_correct=True
+        )
+        self.submission = QuizSubmissionFactory(quiz=self.quiz)
+        self.participant = self.submission.participant
+
+    def assertRevalidates(self, url, change, queries):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+
+        # a polling client costs auth, permission checks and one aggregate query
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        # deletions leave no trace in `modified`: dates alone never revalidate
+        tomorrow = http_date((timezone.now() + timedelta(days=1)).timestamp())
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=tomorrow)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_quiz_detail(self):
+        self.client.force_login(user=self.owner.user)
+        url = f"/api/quizzes/{self.quiz.id}/"
+        self.assertRevalidates(url, self.answer.delete, 5)
+        self.assertRevalidates(
+            url,
+            lambda: QuizUserAnswerFactory(
+                submission=self.submission,
+                answer=QuizQuestionAnswerFactory(
+                    question=self.question, text="?", is_correct=False
+                ),
+            ),
+            5,
+        )
+
+    def test_quiz_detail_not_visible(self):
+        self.client.force_login(user=OwnerFactory().user)
+        response = self.client.get(f"/api/quizzes/{self.quiz.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", response)
+
+    def test_participant_submissions(self):
+        self.client.force_login(user=self.participant.user)
+        url = f"/api/participant/{self.participant.id}/submissions/"
+        self.assertRevalidates(
+            url,
+            lambda: QuizUserAnswerFactory(
+                submission=self.submission, answer=self.answer
+            ),
+            4,
+        )
+        self.assertRevalidates(
+            f"{url}{self.quiz.id}/",
+            lambda: QuizQuestionFactory(quiz=self.quiz, text="?"),
+            4,
+        )
+        self.assertRevalidates(
+            url,
+            QuizSubmissionFactory(
+                participant=self.participant, quiz=QuizFactory()
+            ).delete,
+            4,
+        )
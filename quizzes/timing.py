@@ -0,0 +1,113 @@
+"""
+Where the time of a request goes: database queries, serializers and the view
+as a whole, reported in a `Server-Timing` header and a log line per request.
+
+Enabled with the QUIZ_SERVER_TIMING setting. The cost is a few `perf_counter()`
+calls per query and per top-level serializer call, so it can stay on in
+production. Queries run by serializers count towards both `db` and
+`serializer`; streamed responses are timed until their headers are ready.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from rest_framework.fields import empty
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+current = ContextVar("quizzes_timing", default=None)
+
+
+class Timings:
+    __slots__ = ("queries", "db", "serializer", "depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.depth = 0  # of nested serializer calls
+
+    def record_query(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def serializing():
+    """
+    Time the outermost serializer call: nested serializers and the items of a
+    list serializer are part of it.
+    """
+    timings = current.get()
+    if timings is None:
+        yield
+        return
+    timings.depth += 1
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings.depth -= 1
+        if not timings.depth:
+            timings.serializer += perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """
+    Count the time spent rendering and validating towards `serializer`.
+    """
+
+    def to_representation(self, instance):
+        with serializing():
+            return super().to_representation(instance)
+
+    def run_validation(self, data=empty):
+        with serializing():
+            return super().run_validation(data)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        if not settings.QUIZ_SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = Timings()
+        token = current.set(timings)
+        start = perf_counter()
+        try:
+            with connection.execute_wrapper(timings.record_query):
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        view = perf_counter() - start
+
+        response["Server-Timing"] = (
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+            f"serializer;dur={timings.serializer * 1000:.2f}, "
+            f"view;dur={view * 1000:.2f}"
+        )
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "db_ms": round(timings.db * 1000, 2),
+            "serializer_ms": round(timings.serializer * 1000, 2),
+            "view_ms": round(view * 1000, 2),
+        }
+        logger.info(
+            "request " + " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"timing": fields},
+        )
+        return response
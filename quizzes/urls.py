@@ -3,17 +3,38 @@ from django.urls import path
 from quizzes.views import (
     ParticipantSubmissionsDetailAPIView,
     ParticipantSubmissionsListAPIView,
+    QuizAnswerDistributionAPIView,
+    QuizAnswerSheetAPIView,
+    QuizBulkInviteAPIView,
     QuizDetailAPIView,
     QuizInviteAPIView,
+    QuizItemAnalysisAPIView,
+    QuizLeaderboardAPIView,
     QuizListCreateAPIView,
     QuizQuestionAnswerCreateAPIView,
     QuizQuestionCreateAPIView,
     QuizUserAnswerCreateAPIView,
+    UsageReportAPIView,
 )
 
 urlpatterns = [
     path("quizzes/", QuizListCreateAPIView.as_view(), name="quiz-list-create"),
     path("quizzes/<int:quiz_id>/", QuizDetailAPIView.as_view(), name="quiz-detail"),
+    path(
+        "quizzes/<int:quiz_id>/answers/distribution/",
+        QuizAnswerDistributionAPIView.as_view(),
+        name="quiz-answer-distribution",
+    ),
+    path(
+        "quizzes/<int:quiz_id>/items/",
+        QuizItemAnalysisAPIView.as_view(),
+        name="quiz-item-analysis",
+    ),
+    path(
+        "quizzes/<int:quiz_id>/leaderboard/",
+        QuizLeaderboardAPIView.as_view(),
+        name="quiz-leaderboard",
+    ),
     path(
         "quizzes/<int:quiz_id>/questions/",
         QuizQuestionCreateAPIView.as_view(),
@@ -29,6 +50,11 @@ urlpatterns = [
         QuizInviteAPIView.as_view(),
         name="quiz-submissions-list-create",
     ),
+    path(
+        "quizzes/<int:quiz_id>/invite/bulk/",
+        QuizBulkInviteAPIView.as_view(),
+        name="quiz-submissions-bulk-create",
+    ),
     path(
         "participant/<int:participant_id>/submissions/",
         ParticipantSubmissionsListAPIView.as_view(),
@@ -44,4 +70,14 @@ urlpatterns = [
         QuizUserAnswerCreateAPIView.as_view(),
         name="participant-answers-list-create",
     ),
+    path(
+        "participant/<int:participant_id>/submissions/<int:quiz_id>/answers/batch/",
+        QuizAnswerSheetAPIView.as_view(),
+        name="participant-answers-batch",
+    ),
+    path(
+        "reports/usage.<str:export_format>",
+        UsageReportAPIView.as_view(),
+        name="usage-report",
+    ),
 ]
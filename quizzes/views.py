@@ -1,20 +1,58 @@
+from collections import Counter
+from datetime import date, timedelta
+
 from django_filters import rest_framework as filters
 from rest_framework import generics, status, views
-from rest_framework.filters import SearchFilter
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from quizzes.models import Participant, Quiz, QuizSubmission
+from quizzes.analytics import answer_distribution
+from quizzes.cache import audience
+from quizzes.conditional import ConditionalGetMixin, freshness
+from quizzes.fieldsets import ALL_FIELDS, quiz_fieldset
+from quizzes.invites import INVITED, bulk_invite, read_csv_invites
+from quizzes.items import item_analysis
+from quizzes.leaderboard import (
+    rank_of,
+    ranked_submissions,
+    score_histogram,
+    summarize,
+    top_submissions,
+)
+from quizzes.metrics import INVITES
+from quizzes.models import (
+    Participant,
+    Quiz,
+    QuizQuestion,
+    QuizQuestionAnswer,
+    QuizSubmission,
+    QuizUserAnswer,
+)
+from quizzes.outbox import invite_email
+from quizzes.pagination import QuizPagination, QuizSubmissionPagination
 from quizzes.permissions import (
     IsOwnerPermission,
     IsParticipantPermission,
+    IsSuperuserPermission,
     QuizPermission,
 )
+from quizzes.rendering import (
+    QUIZ_COLUMNS,
+    SUBMISSION_COLUMNS,
+    render_quiz,
+    render_user_submissions,
+)
+from quizzes.reports import DEFAULT_DAYS, FORMATS, usage_rows
+from quizzes.search import QuizSearchFilter
 from quizzes.serializers import (
+    QuizAnswerSheetSerializer,
     QuizInviteSerializer,
     QuizQuestionAnswerSerializer,
     QuizQuestionSerializer,
@@ -32,40 +70,193 @@ class QuizFilter(filters.FilterSet):
         fields = ["name"]
 
 
-class QuizListCreateAPIView(generics.ListCreateAPIView):
+def visible_quizzes(user, queryset):
+    if user.is_superuser:
+        return queryset
+    if hasattr(user, "owner"):
+        queryset = queryset.filter(owner=user.owner)
+    if hasattr(user, "participant"):
+        quiz_id_list = user.participant.quizsubmission_set.values_list(
+            "quiz_id", flat=True
+        )
+        queryset = queryset.filter(id__in=quiz_id_list)
+    return queryset
+
+
+def can_see_submissions(user):
+    # mirrors QuizSerializer.get_field_names
+    return user.is_superuser or hasattr(user, "owner")
+
+
+class QuizFieldsetMixin:
+    """
+    Reads `?fields=` and `?expand=` (see quizzes.fieldsets) of safe requests
+    into `self.fieldset`, before the queryset is built. Other requests render
+    every field.
+    """
+
+    expand_by_default = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.fieldset = ALL_FIELDS
+        if request.method in SAFE_METHODS:
+            self.fieldset = quiz_fieldset(request, self.expand_by_default)
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "fieldset": self.fieldset}
+
+
+class QuizListCreateAPIView(QuizFieldsetMixin, generics.ListCreateAPIView):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated, QuizPermission]
-    filter_backends = [SearchFilter, filters.DjangoFilterBackend]
+    filter_backends = [QuizSearchFilter, filters.DjangoFilterBackend]
     filterset_class = QuizFilter
-    search_fields = ["name"]
+    pagination_class = QuizPagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = queryset.with_tree(
+                submissions=can_see_submissions(self.request.user)
+                and self.fieldset.includes("submissions")
+            )
         if hasattr(self.request.user, "owner"):
             queryset = queryset.filter(owner=self.request.user.owner)
         return queryset
 
 
-class QuizDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class QuizDetailAPIView(
+    QuizFieldsetMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = Quiz.objects.all()
     permission_classes = [IsAuthenticated, QuizPermission]
     serializer_class = QuizSerializer
     lookup_url_kwarg = "quiz_id"
+    expand_by_default = True
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.is_superuser:
-            return queryset
-        if hasattr(self.request.user, "owner"):
-            queryset = queryset.filter(owner=self.request.user.owner)
-        if hasattr(self.request.user, "participant"):
-            participant = self.request.user.participant
-            quiz_id_list = participant.quizsubmission_set.values_list(
-                "quiz_id", flat=True
+        return visible_quizzes(self.request.user, super().get_queryset())
+
+    def retrieve(self, request, *args, **kwargs):
+        # read-only, hence rendered from rows rather than through the serializer
+        quiz = get_object_or_404(
+            self.get_queryset().values(*QUIZ_COLUMNS), id=self.kwargs["quiz_id"]
+        )
+        self.check_object_permissions(request, quiz)
+        return Response(render_quiz(quiz, audience(request.user), self.fieldset))
+
+    def get_validators(self):
+        quiz_id = self.kwargs["quiz_id"]
+        parts = {
+            "questions": QuizQuestion.objects.filter(quiz_id=quiz_id),
+            "answers": QuizQuestionAnswer.objects.filter(question__quiz_id=quiz_id),
+        }
+        if can_see_submissions(self.request.user):
+            parts["submissions"] = QuizSubmission.objects.filter(quiz_id=quiz_id)
+            parts["user_answers"] = QuizUserAnswer.objects.filter(
+                submission__quiz_id=quiz_id
             )
-            queryset = queryset.filter(id__in=quiz_id_list)
-        return queryset
+        return (
+            self.get_queryset()
+            .filter(id=quiz_id)
+            .annotate(**freshness(**parts))
+            .values("modified", *freshness(**parts))
+            .first()
+        )
+
+
+class QuizLeaderboardAPIView(views.APIView):
+    """
+    Score statistics of a quiz, with the `?top=` best participants for owners
+    and the rank of the requesting participant (or of `?participant=<id>`, for
+    owners) as `me`.
+    """
+
+    permission_classes = [IsAuthenticated]
+    default_top = 10
+    max_top = 100
+
+    def get(self, request, *args, **kwargs):
+        quiz_id = self.kwargs["quiz_id"]
+        get_object_or_404(visible_quizzes(request.user, Quiz.objects.all()), id=quiz_id)
+        histogram = score_histogram(quiz_id)
+        data = {"quiz": quiz_id, "stats": summarize(histogram), "me": None}
+
+        if can_see_submissions(request.user):
+            top = self.get_int("top", self.default_top, maximum=self.max_top)
+            data["top"] = [
+                {
+                    "rank": rank_of(histogram, score),
+                    "participant": participant_id,
+                    "email": email,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "score": score,
+                }
+                for score, participant_id, email, first_name, last_name in (
+                    top_submissions(quiz_id, top)
+                )
+            ]
+            participant_id = self.get_int("participant", None)
+        elif hasattr(request.user, "participant"):
+            participant_id = request.user.participant.id
+        else:
+            participant_id = None
+
+        if participant_id is not None:
+            score = (
+                ranked_submissions(quiz_id)
+                .filter(participant_id=participant_id)
+                .values_list("answers_correct_count", flat=True)
+                .first()
+            )
+            if score is not None:
+                data["me"] = {
+                    "participant": participant_id,
+                    "rank": rank_of(histogram, score),
+                    "score": score,
+                }
+        return Response(data)
+
+    def get_int(self, param, default, maximum=None):
+        if param not in self.request.query_params:
+            return default
+        try:
+            value = int(self.request.query_params[param])
+        except ValueError:
+            value = 0
+        if value < 1:
+            raise ValidationError({param: ["Expected a positive integer."]})
+        return min(value, maximum) if maximum else value
+
+
+class QuizAnswerDistributionAPIView(views.APIView):
+    """
+    For every question of a quiz, how often each answer was picked.
+    """
+
+    permission_classes = [IsAuthenticated, IsOwnerPermission]
+
+    def get(self, request, *args, **kwargs):
+        quiz_id = self.kwargs["quiz_id"]
+        get_object_or_404(visible_quizzes(request.user, Quiz.objects.all()), id=quiz_id)
+        return Response({"quiz": quiz_id, "questions": answer_distribution(quiz_id)})
+
+
+class QuizItemAnalysisAPIView(views.APIView):
+    """
+    Difficulty and discrimination of every question of a quiz, and the quiz's
+    reliability (Cronbach's alpha), see quizzes.items.
+    """
+
+    permission_classes = [IsAuthenticated, IsOwnerPermission]
+
+    def get(self, request, *args, **kwargs):
+        quiz_id = self.kwargs["quiz_id"]
+        get_object_or_404(visible_quizzes(request.user, Quiz.objects.all()), id=quiz_id)
+        return Response(item_analysis(quiz_id))
 
 
 class QuizQuestionCreateAPIView(generics.CreateAPIView):
@@ -85,33 +276,89 @@ class QuizInviteAPIView(views.APIView):
         quiz = get_object_or_404(Quiz, id=self.kwargs["quiz_id"])
         serializer = QuizInviteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = User.objects.create_user(
-            username=serializer.data["email"],
-            email=serializer.data["email"],
-            first_name=serializer.data["first_name"],
-            last_name=serializer.data["last_name"],
-        )
-        participant = Participant.objects.create(user=user)
-        submission = QuizSubmission.objects.create(
-            quiz=quiz,
-            participant=participant,
-        )
-        send_mail(
-            subject="Quiz Invite!",
-            message=f"You've been invited to {quiz.name}.",
-            from_email=quiz.owner.user.email,
-            recipient_list=[participant.user.email],
-        )
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=serializer.data["email"],
+                email=serializer.data["email"],
+                first_name=serializer.data["first_name"],
+                last_name=serializer.data["last_name"],
+            )
+            participant = Participant.objects.create(user=user)
+            submission = QuizSubmission.objects.create(
+                quiz=quiz,
+                participant=participant,
+            )
+            invite_email(quiz, participant.user.email).save()
+            transaction.on_commit(INVITES.inc)
         return Response(
             {"submission_id": submission.id}, status=status.HTTP_201_CREATED
         )
 
 
+class QuizBulkInviteAPIView(views.APIView):
+    """
+    Invite many participants at once, from a JSON array of
+    `{"first_name", "last_name", "email"}` objects or from a CSV `file` upload
+    with the same columns.
+    """
+
+    permission_classes = [IsAuthenticated, IsOwnerPermission]
+    max_rows = 10000
+
+    def post(self, request, *args, **kwargs):
+        quizzes = Quiz.objects.select_related("owner__user")
+        if hasattr(request.user, "owner"):
+            quizzes = quizzes.filter(owner=request.user.owner)
+        quiz = get_object_or_404(quizzes, id=self.kwargs["quiz_id"])
+        if "file" in request.FILES:
+            try:
+                rows = read_csv_invites(request.FILES["file"])
+            except ValueError as e:
+                raise ValidationError({"file": [str(e)]})
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            raise ValidationError(
+                {"non_field_errors": ["Expected a list of invites or a CSV file."]}
+            )
+        if len(rows) > self.max_rows:
+            raise ValidationError(
+                {"non_field_errors": [f"At most {self.max_rows} invites per request."]}
+            )
+        report = bulk_invite(quiz, rows)
+        summary = Counter(entry["status"] for entry in report)
+        return Response(
+            {"summary": summary, "results": report},
+            status=status.HTTP_201_CREATED if summary[INVITED] else status.HTTP_200_OK,
+        )
+
+
 class QuizUserAnswerCreateAPIView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated, IsParticipantPermission]
     serializer_class = QuizUserAnswerSerializer
 
 
+class QuizAnswerSheetAPIView(views.APIView):
+    permission_classes = [IsAuthenticated, IsParticipantPermission]
+
+    def post(self, request, *args, **kwargs):
+        submissions = QuizSubmission.objects.select_related("quiz")
+        if not request.user.is_superuser:
+            submissions = submissions.filter(participant=request.user.participant)
+        submission = get_object_or_404(
+            submissions,
+            participant_id=self.kwargs["participant_id"],
+            quiz_id=self.kwargs["quiz_id"],
+        )
+        serializer = QuizAnswerSheetSerializer(
+            data=request.data, context={"submission": submission}
+        )
+        serializer.is_valid(raise_exception=True)
+        submission = serializer.save()
+        context = {"request": request, "view": self}
+        return Response(QuizSubmissionSerializer(submission, context=context).data)
+
+
 class ParticipantSubmissionFilter(filters.FilterSet):
     quiz_name = filters.CharFilter(field_name="quiz__name", lookup_expr="iexact")
     owner_email = filters.CharFilter(
@@ -123,25 +370,122 @@ class ParticipantSubmissionFilter(filters.FilterSet):
         fields = ["quiz_name"]
 
 
-class ParticipantSubmissionsListAPIView(generics.ListAPIView):
+def participant_freshness(**filters):
+    """
+    Validators for the submissions of a participant matching `filters`: the
+    submissions, their answers, and the quizzes they point to (progress and
+    score depend on their questions and answer keys).
+    """
+    return freshness(
+        submissions=QuizSubmission.objects.filter(**filters),
+        user_answers=QuizUserAnswer.objects.filter(
+            **{f"submission__{key}": value for key, value in filters.items()}
+        ),
+        quizzes=Quiz.objects.filter(
+            **{f"quizsubmission__{key}": value for key, value in filters.items()}
+        ),
+        questions=QuizQuestion.objects.filter(
+            **{f"quiz__quizsubmission__{key}": value for key, value in filters.items()}
+        ),
+        answers=QuizQuestionAnswer.objects.filter(
+            **{
+                f"question__quiz__quizsubmission__{key}": value
+                for key, value in filters.items()
+            }
+        ),
+    )
+
+
+class ParticipantSubmissionsListAPIView(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsParticipantPermission]
     serializer_class = QuizSubmissionSerializer
-    filter_backends = [SearchFilter, filters.DjangoFilterBackend]
+    filter_backends = [QuizSearchFilter, filters.DjangoFilterBackend]
     filterset_class = ParticipantSubmissionFilter
-    search_fields = ["quiz__name", "quiz__owner__user__email"]
+    search_quiz_field = "quiz_id"
+    pagination_class = QuizSubmissionPagination
 
     def get_queryset(self):
         return QuizSubmission.objects.filter(
             participant_id=self.kwargs["participant_id"],
+        ).with_questions_count()
+
+    def list(self, request, *args, **kwargs):
+        # read-only, hence rendered from rows rather than through the serializer
+        queryset = self.filter_queryset(self.get_queryset())
+        # annotations are kept for rendering and ordering (e.g. search_rank)
+        rows = queryset.values(*SUBMISSION_COLUMNS, *queryset.query.annotations)
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(render_user_submissions(page))
+
+    def get_validators(self):
+        annotations = participant_freshness(
+            participant_id=self.kwargs["participant_id"]
+        )
+        return (
+            Participant.objects.filter(id=self.kwargs["participant_id"])
+            .annotate(**annotations)
+            .values(*annotations)
+            .first()
         )
 
 
-class ParticipantSubmissionsDetailAPIView(generics.RetrieveAPIView):
+class ParticipantSubmissionsDetailAPIView(
+    ConditionalGetMixin, generics.RetrieveAPIView
+):
     permission_classes = [IsAuthenticated, IsParticipantPermission]
     serializer_class = QuizSubmissionSerializer
 
-    def get_object(self):
-        return QuizSubmission.objects.get(
+    def retrieve(self, request, *args, **kwargs):
+        # read-only, hence rendered from rows rather than through the serializer
+        submission = get_object_or_404(
+            QuizSubmission.objects.with_questions_count().values(
+                *SUBMISSION_COLUMNS, "questions_count"
+            ),
             participant_id=self.kwargs["participant_id"],
             quiz_id=self.kwargs["quiz_id"],
         )
+        return Response(render_user_submissions([submission])[0])
+
+    def get_validators(self):
+        annotations = participant_freshness(
+            participant_id=self.kwargs["participant_id"],
+            quiz_id=self.kwargs["quiz_id"],
+        )
+        return (
+            Participant.objects.filter(id=self.kwargs["participant_id"])
+            .annotate(**annotations)
+            .values(*annotations)
+            .first()
+        )
+
+
+class UsageReportAPIView(views.APIView):
+    """
+    Download the daily usage report from `?start=` to `?end=` (ISO dates,
+    inclusive; the last 30 days by default) as CSV or JSON Lines.
+    """
+
+    permission_classes = [IsAuthenticated, IsSuperuserPermission]
+
+    def get(self, request, *args, **kwargs):
+        if self.kwargs["export_format"] not in FORMATS:
+            raise Http404
+        render, content_type = FORMATS[self.kwargs["export_format"]]
+        end = self.get_date("end", timezone.localdate())
+        start = self.get_date("start", end - timedelta(days=DEFAULT_DAYS - 1))
+        if start > end:
+            raise ValidationError({"start": ["Must not be after end."]})
+        response = StreamingHttpResponse(
+            render(usage_rows(start, end)), content_type=content_type
+        )
+        filename = f"usage-{start}-{end}.{self.kwargs['export_format']}"
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_date(self, param, default):
+        if param not in self.request.query_params:
+            return default
+        try:
+            return date.fromisoformat(self.request.query_params[param])
+        except ValueError:
+            raise ValidationError({param: ["Expected a date as YYYY-MM-DD."]})